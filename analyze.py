@@ -1,96 +1,73 @@
 # analyze.py
 
 import json
-from datetime import datetime, timedelta
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from statistics import mean, pstdev
 from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from assets import DEFAULT_ASSET, asset_name, asset_path, asset_symbol
+from history_store import get_history_store
+from indicator_state import IndicatorState
+from indicators import compute_indicators, latest as latest_indicator
+from llm_cache import LLMResultCache
+from llm_hedge import get_latency_histograms, hedged_call
+from llm_stream import MODEL, TEMPERATURE, CallStats, stream_chat, stream_responses
+from metrics import get_metrics, incr, span
+from prompt_builder import build_prompt, format_token_report
+from scoring import Scoreboard, get_scoreboard
+from sentiment_score import score_sentiment_context, top_snippets
+
 # Load environment (API key, etc.)
 load_dotenv()
-client = OpenAI()
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
 
 BASE_DIR = Path(__file__).resolve().parent
-DATA_DIR = BASE_DIR / "data"
-HISTORY_FILE = DATA_DIR / "history.json"
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+INDICATOR_STATE_FILE = DATA_DIR / "indicator_state.json"
 
 HISTORY_DAYS = 7
-MAX_HISTORY_DAYS_STORED = 30
-
-DATA_DIR.mkdir(exist_ok=True)
-
-
-def _read_history() -> List[Dict]:
-    if not HISTORY_FILE.exists():
-        return []
-
-    try:
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return []
+STREAM_MODEL_RESPONSES = True
+HEDGE_MODEL_CALLS = True  # streaming only: race Chat against a slow Responses call
+MODEL_CONCURRENCY = 4  # assets analysed in parallel by analyze_markets
+# Highlights passed to the prompt, picked by locally scored sentiment strength
+# (x engagement for Reddit); the rest only count towards the sentiment features.
+TOP_ARTICLE_SNIPPETS = 8
+TOP_REDDIT_SNIPPETS = 3
 
-    if not isinstance(data, list):
-        return []
+DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    cleaned = []
-    for entry in data:
-        if not isinstance(entry, dict):
-            continue
-        date_str = entry.get("date")
-        if not isinstance(date_str, str):
-            continue
-        try:
-            datetime.strptime(date_str, "%Y-%m-%d")
-        except ValueError:
-            continue
-        cleaned.append(entry)
-    return cleaned
 
-
-def load_history(days: int = HISTORY_DAYS) -> List[Dict]:
-    cutoff = datetime.utcnow() - timedelta(days=days)
-    result = []
-    for entry in _read_history():
-        try:
-            entry_date = datetime.strptime(entry["date"], "%Y-%m-%d")
-        except (KeyError, ValueError):
-            continue
-        if entry_date >= cutoff:
-            result.append(entry)
-    return result
-
-
-def _write_history(entries: Sequence[Dict]) -> None:
-    tmp_path = HISTORY_FILE.with_suffix(".tmp")
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(list(entries), f, indent=2, ensure_ascii=False)
-    tmp_path.replace(HISTORY_FILE)
+def get_client() -> OpenAI:
+    """
+    Build the OpenAI client on first use and keep it (and its connection pool)
+    for the life of the process, so a long-running daemon reuses it.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI()
+        return _client
 
 
-def save_history(new_entry: Dict) -> None:
-    history = _read_history()
-    history.append(new_entry)
+def load_history(days: int = HISTORY_DAYS, asset: str = DEFAULT_ASSET) -> List[Dict]:
+    return get_history_store().recent(days, asset)
 
-    cutoff = datetime.utcnow() - timedelta(days=MAX_HISTORY_DAYS_STORED)
-    pruned = []
-    for entry in history:
-        try:
-            entry_date = datetime.strptime(entry["date"], "%Y-%m-%d")
-        except (KeyError, ValueError):
-            continue
-        if entry_date >= cutoff:
-            pruned.append(entry)
 
-    _write_history(pruned)
+def save_history(new_entry: Dict, asset: str = DEFAULT_ASSET) -> None:
+    get_history_store().append(new_entry, asset)
 
 
-def _prepare_price_series(btc_history: Sequence[Dict]) -> List[Tuple[str, float]]:
+def _prepare_price_series(price_history: Sequence[Dict]) -> List[Tuple[str, float]]:
     series: List[Tuple[str, float]] = []
-    for day in btc_history:
+    for day in price_history:
         try:
             date = day["date"]
             price = float(day["price_usd"])
@@ -104,80 +81,87 @@ def _prepare_price_series(btc_history: Sequence[Dict]) -> List[Tuple[str, float]
     return series
 
 
-def _percentage_change(current: float, previous: float) -> Optional[float]:
-    if previous == 0:
-        return None
-    return ((current - previous) / previous) * 100
-
-
-def _rolling_average(values: List[float], window: int) -> Optional[float]:
-    if len(values) < window or window <= 0:
+def _load_indicator_state(series: List[Tuple[str, float]], asset: str = DEFAULT_ASSET) -> Optional[IndicatorState]:
+    """
+    Advance the asset's persisted streaming indicator state to the end of `series`.
+    """
+    if not series:
         return None
-    return mean(values[-window:])
-
-
-def _calculate_rsi(values: List[float], period: int = 14) -> Optional[float]:
-    if len(values) <= period:
+    path = asset_path(INDICATOR_STATE_FILE, asset)
+    state = IndicatorState.load(path)
+    try:
+        state.sync(series)
+        state.save(path)
+    except (OSError, ValueError) as exc:
+        print(f"⚠️ Indicator state unavailable for {asset}, computing from full series: {exc}")
         return None
-    deltas = [values[i] - values[i - 1] for i in range(1, len(values))]
-    recent_deltas = deltas[-period:]
-    gains = [delta for delta in recent_deltas if delta > 0]
-    losses = [-delta for delta in recent_deltas if delta < 0]
+    return state
 
-    if not gains and not losses:
-        return 50.0
 
-    average_gain = mean(gains) if gains else 0.0
-    average_loss = mean(losses) if losses else 0.0
-
-    if average_loss == 0:
-        return 100.0
-    if average_gain == 0:
-        return 0.0
+def _batch_latest_indicators(series_by_asset: Dict[str, List[Tuple[str, float]]]) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Latest indicator values for many assets: series sharing a date axis are
+    stacked into one 2-D array and computed in a single vectorized pass.
+    """
+    groups: Dict[Tuple[str, ...], List[str]] = {}
+    for asset, series in series_by_asset.items():
+        if series:
+            groups.setdefault(tuple(date for date, _ in series), []).append(asset)
 
-    rs = average_gain / average_loss
-    return 100 - (100 / (1 + rs))
+    latest_values: Dict[str, Dict[str, Optional[float]]] = {}
+    for assets in groups.values():
+        closes = np.array([[price for _, price in series_by_asset[asset]] for asset in assets])
+        for name, values in compute_indicators(closes).items():
+            for row, asset in enumerate(assets):
+                latest_values.setdefault(asset, {})[name] = latest_indicator(values[row])
+    return latest_values
 
 
-def _calculate_volatility(values: List[float], window: int = 30) -> Optional[float]:
-    if len(values) <= window:
-        return None
-    recent = values[-window:]
-    returns = []
-    for i in range(1, len(recent)):
-        if recent[i - 1] == 0:
-            continue
-        returns.append((recent[i] - recent[i - 1]) / recent[i - 1])
-    if len(returns) < 2:
-        return None
-    return pstdev(returns) * (252 ** 0.5)  # annualized volatility approximation
-
+def _build_price_metrics_batch(series_by_asset: Dict[str, List[Tuple[str, float]]]) -> Dict[str, Dict]:
+    """
+    Price metrics for every asset. Assets whose streaming state is in sync
+    read it directly; the rest are computed together in one batch.
+    """
+    with span("indicators"):
+        return _price_metrics_batch(series_by_asset)
+
+
+def _price_metrics_batch(series_by_asset: Dict[str, List[Tuple[str, float]]]) -> Dict[str, Dict]:
+    latest_values: Dict[str, Dict[str, Optional[float]]] = {}
+    cold: Dict[str, List[Tuple[str, float]]] = {}
+    for asset, series in series_by_asset.items():
+        state = _load_indicator_state(series, asset)
+        if state is not None and state.last_date == series[-1][0]:
+            latest_values[asset] = state.values()
+        elif series:
+            cold[asset] = series
+    latest_values.update(_batch_latest_indicators(cold))
+
+    return {
+        asset: _format_price_metrics(series, latest_values[asset]) if series else {}
+        for asset, series in series_by_asset.items()
+    }
 
-def _build_price_metrics(series: List[Tuple[str, float]]) -> Dict:
-    if not series:
-        return {}
 
+def _format_price_metrics(series: List[Tuple[str, float]], latest_values: Dict[str, Optional[float]]) -> Dict:
     dates = [d for d, _ in series]
     closes = [p for _, p in series]
     latest_price = closes[-1]
 
-    def change_over(days: int) -> Optional[float]:
-        if len(closes) <= days:
-            return None
-        past_price = closes[-(days + 1)]
-        return _percentage_change(latest_price, past_price)
+    def latest_of(name: str) -> Optional[float]:
+        return _round_optional(latest_values[name])
 
     metrics = {
         "latest_date": dates[-1],
         "latest_price": round(latest_price, 2),
-        "change_7d_pct": _round_optional(change_over(7)),
-        "change_30d_pct": _round_optional(change_over(30)),
-        "change_90d_pct": _round_optional(change_over(90)),
-        "ma_7": _round_optional(_rolling_average(closes, 7)),
-        "ma_30": _round_optional(_rolling_average(closes, 30)),
-        "ma_90": _round_optional(_rolling_average(closes, 90)),
-        "rsi_14": _round_optional(_calculate_rsi(closes, 14)),
-        "volatility_30d": _round_optional(_calculate_volatility(closes, 30)),
+        "change_7d_pct": latest_of("change_7d_pct"),
+        "change_30d_pct": latest_of("change_30d_pct"),
+        "change_90d_pct": latest_of("change_90d_pct"),
+        "ma_7": latest_of("ma_7"),
+        "ma_30": latest_of("ma_30"),
+        "ma_90": latest_of("ma_90"),
+        "rsi_14": latest_of("rsi_14"),
+        "volatility_30d": latest_of("volatility_30d"),
         "recent_prices": [
             {"date": dates[i], "price": round(closes[i], 2)}
             for i in range(max(0, len(closes) - 14), len(closes))
@@ -193,91 +177,168 @@ def _round_optional(value: Optional[float], ndigits: int = 2) -> Optional[float]
     return round(value, ndigits)
 
 
+def _story_flags(item: Dict) -> Dict:
+    """
+    Dedupe markers worth the prompt tokens: only present when set.
+    """
+    flags = {}
+    if item.get("coverage"):
+        flags["coverage"] = item["coverage"]
+    if item.get("seen_before"):
+        flags["seen_before"] = True
+    return flags
+
+
 def _summarize_articles(articles: Sequence[Dict]) -> List[Dict]:
+    valid = [article for article in articles if article.get("title") and isinstance(article.get("title"), str)]
     highlights = []
-    for article in articles:
-        title = article.get("title")
-        content = article.get("content", "")
-        if not title or not isinstance(title, str):
-            continue
-        summary = content.strip()[:400]
+    for article in top_snippets(valid, TOP_ARTICLE_SNIPPETS, keep_order=True):
         highlights.append({
-            "title": title.strip(),
-            "summary": summary,
+            "title": article["title"].strip(),
+            "summary": article.get("content", "").strip()[:400],
             "published": article.get("published", ""),
+            "sentiment": article.get("sentiment"),
+            **_story_flags(article),
         })
     return highlights
 
 
 def _summarize_reddit(posts: Sequence[Dict]) -> List[Dict]:
-    sorted_posts = sorted(
-        (
-            post for post in posts
-            if isinstance(post.get("title"), str)
-        ),
-        key=lambda item: item.get("upvotes", 0),
-        reverse=True,
-    )
-
+    valid = [post for post in posts if isinstance(post.get("title"), str)]
     highlights = []
-    for post in sorted_posts[:5]:
+    for post in top_snippets(valid, TOP_REDDIT_SNIPPETS):
         highlights.append({
             "title": post["title"].strip(),
             "body": post.get("body", "")[:400],
             "upvotes": post.get("upvotes", 0),
             "comments": post.get("comments", 0),
+            "sentiment": post.get("sentiment"),
+            **_story_flags(post),
         })
     return highlights
 
 
-def _build_history_summary(entries: Sequence[Dict]) -> List[Dict]:
+def _scored_context(sentiment_context: Dict) -> Dict:
+    """
+    The pipeline scores sentiment in its own stage; direct callers get it here.
+    """
+    if "features" in sentiment_context:
+        return sentiment_context
+    return score_sentiment_context(
+        sentiment_context.get("coindesk_articles", []),
+        sentiment_context.get("reddit_posts", []),
+    )
+
+
+def _build_history_summary(entries: Sequence[Dict], scoreboard: Optional[Scoreboard] = None) -> List[Dict]:
     summary = []
     for entry in entries:
         recommendation = entry.get("recommendation")
         confidence = entry.get("confidence")
         if not isinstance(recommendation, str):
             continue
-        summary.append({
+        item = {
             "date": entry.get("date", ""),
             "recommendation": recommendation.upper(),
             "confidence": confidence,
-        })
+        }
+        outcome = scoreboard.outcome(item["date"]) if scoreboard is not None else {}
+        if outcome:
+            item["realized"] = outcome
+        summary.append(item)
     return summary
 
 
-def _invoke_model(prompt: str) -> str:
+def _record_call(stats: CallStats) -> None:
+    print(stats.summary())
+    incr("model_calls", path=stats.path)
+    if stats.output_tokens is not None:
+        incr("model_output_tokens", stats.output_tokens, path=stats.path)
+    if stats.time_to_first_token is not None:
+        get_metrics().observe("model_first_token", stats.time_to_first_token, path=stats.path)
+
+
+def _streamed_path(stream_fn, messages: List[Dict]):
+    def call(cancel):
+        result_text, stats = stream_fn(get_client(), messages, cancel)
+        _record_call(stats)
+        return result_text, stats
+
+    return call
+
+
+def _invoke_model(
+    prompt: str,
+    stream: bool = STREAM_MODEL_RESPONSES,
+    hedge: bool = HEDGE_MODEL_CALLS,
+    asset: str = DEFAULT_ASSET,
+) -> str:
     """
     Prefer the Responses API for structured JSON, fall back to Chat if needed.
+    When streaming, each call logs time-to-first-token, total latency and
+    tokens/sec, and is abandoned as soon as the output stops being JSON.
+    With hedging, Chat starts once Responses exceeds its p95 latency instead of
+    waiting for it to fail, and whichever returns valid JSON first wins.
     """
-    try:
-        response = client.responses.create(
-            model="gpt-4.1",
-            input=[
-                {"role": "system", "content": "You are a Bitcoin financial analyst bot. Return compact JSON only."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-            top_p=0.9,
-            response_format={"type": "json_object"},
+    analyst = f"You are a {asset_name(asset)} financial analyst bot."
+    responses_messages = [
+        {"role": "system", "content": f"{analyst} Return compact JSON only."},
+        {"role": "user", "content": prompt},
+    ]
+    chat_messages = [
+        {"role": "system", "content": f"{analyst} Respond only in JSON."},
+        {"role": "user", "content": prompt},
+    ]
+
+    if stream and hedge:
+        result_text, winner = hedged_call(
+            ("responses", _streamed_path(stream_responses, responses_messages)),
+            ("chat", _streamed_path(stream_chat, chat_messages)),
+            get_latency_histograms(),
         )
-        result_text = response.output_text.strip()
+        incr("model_hedge_wins", path=winner)
+        return result_text
+
+    try:
+        if stream:
+            result_text, stats = stream_responses(get_client(), responses_messages)
+            _record_call(stats)
+        else:
+            response = get_client().responses.create(
+                model=MODEL,
+                input=responses_messages,
+                temperature=TEMPERATURE,
+                top_p=0.9,
+                text={"format": {"type": "json_object"}},
+            )
+            result_text = response.output_text.strip()
+            incr("model_calls", path="responses")
+            usage = getattr(response, "usage", None)
+            if getattr(usage, "output_tokens", None) is not None:
+                incr("model_output_tokens", usage.output_tokens, path="responses")
         if result_text:
             return result_text
     except Exception as primary_error:
+        print(f"⚠️ Responses API call failed, falling back to Chat: {primary_error}")
         fallback_error = primary_error
     else:
         fallback_error = None
 
     # Fallback for clients without Responses support.
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {"role": "system", "content": "You are a Bitcoin financial analyst bot. Respond only in JSON."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
+        if stream:
+            result_text, stats = stream_chat(get_client(), chat_messages)
+            _record_call(stats)
+            return result_text
+        response = get_client().chat.completions.create(
+            model=MODEL,
+            messages=chat_messages,
+            temperature=TEMPERATURE,
         )
+        incr("model_calls", path="chat")
+        usage = getattr(response, "usage", None)
+        if getattr(usage, "completion_tokens", None) is not None:
+            incr("model_output_tokens", usage.completion_tokens, path="chat")
         return response.choices[0].message.content.strip()
     except Exception as chat_error:
         if fallback_error:
@@ -285,41 +346,54 @@ def _invoke_model(prompt: str) -> str:
         raise
 
 
-def analyze_market(btc_history: Sequence[Dict], sentiment_context: Dict) -> str:
-    price_series = _prepare_price_series(btc_history)
-    price_metrics = _build_price_metrics(price_series)
-    history_entries = load_history()
-    history_summary = _build_history_summary(history_entries)
-
-    macro_highlights = _summarize_articles(sentiment_context.get("coindesk_articles", []))
-    reddit_highlights = _summarize_reddit(sentiment_context.get("reddit_posts", []))
+def _analyze_asset(
+    asset: str,
+    price_series: List[Tuple[str, float]],
+    price_metrics: Dict,
+    sentiment_features: Dict,
+    macro_highlights: List[Dict],
+    reddit_highlights: List[Dict],
+    llm_cache: LLMResultCache,
+) -> str:
+    history_entries = load_history(asset=asset)
+    scoreboard = get_scoreboard(asset)
+    newly_scored = scoreboard.update(get_history_store(), price_series)
+    if newly_scored:
+        scoreboard.save()
+        print(f"🎯 Scored {newly_scored} newly matured {asset_symbol(asset)} recommendation outcomes")
+    history_summary = _build_history_summary(history_entries, scoreboard)
 
     structured_payload = {
+        "asset": asset_symbol(asset),
         "price_metrics": price_metrics,
-        "recent_price_points": price_metrics.get("recent_prices", []),
         "recent_recommendations": history_summary,
+        "track_record": scoreboard.summary(),
+        "sentiment": sentiment_features,
         "macro_highlights": macro_highlights,
         "reddit_highlights": reddit_highlights,
     }
 
-    prompt = (
-        "Evaluate the following structured Bitcoin market data and produce a JSON decision.\n"
-        "Your output must include:\n"
-        '  - "recommendation": one of ["buy", "hold", "avoid"]\n'
-        '  - "confidence": integer 0-100 expressing conviction\n'
-        '  - "reasoning": array of 3-5 concise bullet strings culminating in a summary item\n'
-        "Rules:\n"
-        "- Tie your reasoning to quantitative signals (trend, momentum, volatility) and sentiment cues provided.\n"
-        "- Reference continuation or change relative to recent recommendations when applicable.\n"
-        "- Be explicit about conflicting data or uncertainties.\n"
-        "- Keep reasoning items under 160 characters each.\n"
-        "\n"
-        "Structured data:\n"
-        f"{json.dumps(structured_payload, ensure_ascii=False, indent=2)}"
-    )
+    with span("prompt_build", asset=asset):
+        prompt, prompt_tokens = build_prompt(structured_payload, asset_name=asset_name(asset))
+    print(format_token_report(prompt_tokens))
+    incr("prompt_tokens_estimated", prompt_tokens["total"], asset=asset)
 
-    result_text = _invoke_model(prompt)
-    print("\n✅ GPT Analysis Result:\n")
+    cached = llm_cache.get(structured_payload)
+    if cached is not None:
+        result_text, match = cached
+        incr("llm_cache", result=match)
+        print(f"♻️ Reusing cached {asset_symbol(asset)} model decision ({match} payload match).")
+    else:
+        incr("llm_cache", result="miss")
+        with span("model_call", asset=asset):
+            result_text = _invoke_model(prompt, asset=asset)
+        try:
+            json.loads(result_text)
+        except json.JSONDecodeError:
+            pass
+        else:
+            llm_cache.put(structured_payload, result_text)
+    print(f"\n✅ GPT Analysis Result ({asset_symbol(asset)}):\n")
     print(result_text)
 
     # Save to history
@@ -347,13 +421,63 @@ def analyze_market(btc_history: Sequence[Dict], sentiment_context: Dict) -> str:
             "recommendation": parsed.get("recommendation", ""),
             "confidence": confidence_value,
             "reasoning": reasoning,
-        })
+        }, asset=asset)
     except Exception as exc:
         print("⚠️ Could not parse/save history:", exc)
 
     return result_text
 
 
+def analyze_markets(
+    price_histories: Dict[str, Sequence[Dict]],
+    sentiment_context: Dict,
+    max_workers: int = MODEL_CONCURRENCY,
+) -> Dict[str, str]:
+    """
+    Analyse several assets in one pass: indicators are computed together,
+    sentiment is summarised once, and the per-asset model calls run
+    concurrently. Returns {coin_id: result_text}; assets whose analysis fails
+    are logged and left out.
+    """
+    series_by_asset = {asset: _prepare_price_series(history) for asset, history in price_histories.items()}
+    metrics = _build_price_metrics_batch(series_by_asset)
+    scored = _scored_context(sentiment_context)
+    macro_highlights = _summarize_articles(scored["coindesk_articles"])
+    reddit_highlights = _summarize_reddit(scored["reddit_posts"])
+    llm_cache = LLMResultCache()
+
+    results: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(series_by_asset)))) as executor:
+        futures = {
+            asset: executor.submit(
+                _analyze_asset, asset, series, metrics[asset], scored["features"],
+                macro_highlights, reddit_highlights, llm_cache,
+            )
+            for asset, series in series_by_asset.items()
+        }
+        for asset, future in futures.items():
+            try:
+                results[asset] = future.result()
+            except Exception as exc:
+                print(f"⚠️ Analysis failed for {asset}: {exc}")
+    return results
+
+
+def analyze_market(price_history: Sequence[Dict], sentiment_context: Dict, asset: str = DEFAULT_ASSET) -> str:
+    price_series = _prepare_price_series(price_history)
+    price_metrics = _build_price_metrics_batch({asset: price_series})[asset]
+    scored = _scored_context(sentiment_context)
+    return _analyze_asset(
+        asset,
+        price_series,
+        price_metrics,
+        scored["features"],
+        _summarize_articles(scored["coindesk_articles"]),
+        _summarize_reddit(scored["reddit_posts"]),
+        LLMResultCache(),
+    )
+
+
 if __name__ == "__main__":
     from trend_scraper import get_btc_historical
     from sentiment_scraper import get_sentiment_context
@@ -0,0 +1,193 @@
+# article_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+ARTICLE_CACHE_FILE = DATA_DIR / "article_cache.json"
+
+MAX_CACHED_ARTICLES = 500
+MAX_ARTICLE_AGE = 7 * 24 * 3600  # seconds since last use before a text is dropped
+URL_RECHECK_AFTER = 6 * 3600  # seconds a URL is trusted without refetching the page
+
+# Off (RESPONSE_CACHES=off, set by replay.py) means every article is fetched and parsed.
+RESPONSE_CACHES = os.getenv("RESPONSE_CACHES", "on").lower() != "off"
+
+_TRACKING_PARAMS = ("utm_", "outputtype", "fbclid", "gclid")
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalise an article URL so tracking parameters, fragments, case and
+    trailing slashes don't split one article into several cache entries.
+    """
+    parts = urlsplit(url.strip())
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PARAMS)
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class ArticleCache:
+    """
+    Persistent cache of extracted article text. URLs map to the hash of the
+    page they last served, and texts are stored once per content hash, so a
+    recently seen URL skips the fetch and an unchanged page skips the parse.
+    """
+
+    def __init__(
+        self,
+        path: Path = ARTICLE_CACHE_FILE,
+        max_entries: int = MAX_CACHED_ARTICLES,
+        max_age: float = MAX_ARTICLE_AGE,
+        url_recheck_after: float = URL_RECHECK_AFTER,
+        enabled: bool = RESPONSE_CACHES,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.url_recheck_after = url_recheck_after
+        self.enabled = enabled
+        self.urls: Dict[str, Dict] = {}
+        self.texts: "OrderedDict[str, Dict]" = OrderedDict()
+        self.hits = {"url": 0, "content": 0}
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict):
+            return
+        urls = data.get("urls", {})
+        texts = data.get("texts", {})
+        if isinstance(urls, dict) and isinstance(texts, dict):
+            self.urls = urls
+            ordered = sorted(texts.items(), key=lambda item: item[1].get("last_used", 0))
+            self.texts = OrderedDict(ordered)
+
+    def lookup_url(self, url: str) -> Optional[str]:
+        """
+        Text for a URL checked recently enough to skip the network entirely.
+        """
+        if not self.enabled:
+            return None
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            entry = self.urls.get(key)
+            if not entry or now - entry.get("checked_at", 0) > self.url_recheck_after:
+                return None
+            text = self._touch(entry["hash"], now)
+            if text is not None:
+                self.hits["url"] += 1
+            return text
+
+    def lookup_content(self, url: str, body_hash: str) -> Optional[str]:
+        """
+        Text for a freshly fetched page whose content was already extracted.
+        """
+        now = time.time()
+        with self._lock:
+            text = self._touch(body_hash, now) if self.enabled else None
+            if text is None:
+                self.misses += 1
+                return None
+            self.hits["content"] += 1
+            self.urls[canonical_url(url)] = {"hash": body_hash, "checked_at": now}
+            self._dirty = True
+            return text
+
+    def store(self, url: str, body_hash: str, text: str) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self.texts[body_hash] = {"text": text, "last_used": now}
+            self.texts.move_to_end(body_hash)
+            self.urls[canonical_url(url)] = {"hash": body_hash, "checked_at": now}
+            self._dirty = True
+
+    def _touch(self, body_hash: str, now: float) -> Optional[str]:
+        entry = self.texts.get(body_hash)
+        if entry is None:
+            return None
+        entry["last_used"] = now
+        self.texts.move_to_end(body_hash)
+        self._dirty = True
+        return entry["text"]
+
+    def evict(self) -> int:
+        """
+        Drop texts unused for longer than max_age, then the least recently
+        used beyond max_entries. Returns how many texts were removed.
+        """
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for body_hash in list(self.texts):
+                if now - self.texts[body_hash].get("last_used", 0) <= self.max_age:
+                    break  # ordered oldest-first, everything after is newer
+                del self.texts[body_hash]
+                removed += 1
+            while len(self.texts) > self.max_entries:
+                self.texts.popitem(last=False)
+                removed += 1
+            if removed:
+                self.urls = {url: entry for url, entry in self.urls.items() if entry.get("hash") in self.texts}
+                self._dirty = True
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "url_hits": self.hits["url"],
+                "content_hits": self.hits["content"],
+                "misses": self.misses,
+                "entries": len(self.texts),
+            }
+
+    def save(self) -> None:
+        self.evict()
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"urls": self.urls, "texts": dict(self.texts)}
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        tmp_path.replace(self.path)
+
+
+_cache: Optional[ArticleCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_article_cache() -> ArticleCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ArticleCache()
+    return _cache
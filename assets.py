@@ -0,0 +1,67 @@
+# assets.py
+
+import os
+from pathlib import Path
+from typing import Tuple
+
+DEFAULT_COIN_IDS = ("bitcoin",)
+DEFAULT_ASSET = "bitcoin"
+
+# Display name and ticker for common CoinGecko ids; anything else falls back to the id.
+KNOWN_ASSETS = {
+    "bitcoin": ("Bitcoin", "BTC"),
+    "ethereum": ("Ethereum", "ETH"),
+    "solana": ("Solana", "SOL"),
+    "binancecoin": ("BNB", "BNB"),
+    "ripple": ("XRP", "XRP"),
+    "cardano": ("Cardano", "ADA"),
+    "dogecoin": ("Dogecoin", "DOGE"),
+    "tron": ("TRON", "TRX"),
+    "avalanche-2": ("Avalanche", "AVAX"),
+    "chainlink": ("Chainlink", "LINK"),
+    "polkadot": ("Polkadot", "DOT"),
+    "the-open-network": ("Toncoin", "TON"),
+    "litecoin": ("Litecoin", "LTC"),
+    "bitcoin-cash": ("Bitcoin Cash", "BCH"),
+    "stellar": ("Stellar", "XLM"),
+    "uniswap": ("Uniswap", "UNI"),
+    "near": ("NEAR Protocol", "NEAR"),
+    "aptos": ("Aptos", "APT"),
+    "cosmos": ("Cosmos Hub", "ATOM"),
+    "monero": ("Monero", "XMR"),
+    "arbitrum": ("Arbitrum", "ARB"),
+    "optimism": ("Optimism", "OP"),
+    "sui": ("Sui", "SUI"),
+}
+
+
+def coin_ids() -> Tuple[str, ...]:
+    """
+    Assets to track, from the comma-separated COIN_IDS environment variable
+    (CoinGecko ids, e.g. "bitcoin,ethereum,solana"); Bitcoin only by default.
+    """
+    raw = os.getenv("COIN_IDS", "")
+    ids = []
+    for coin_id in raw.split(","):
+        coin_id = coin_id.strip().lower()
+        if coin_id and coin_id not in ids:
+            ids.append(coin_id)
+    return tuple(ids) or DEFAULT_COIN_IDS
+
+
+def asset_name(coin_id: str) -> str:
+    return KNOWN_ASSETS.get(coin_id, (coin_id.replace("-", " ").title(), ""))[0]
+
+
+def asset_symbol(coin_id: str) -> str:
+    return KNOWN_ASSETS.get(coin_id, ("", coin_id.upper()))[1]
+
+
+def asset_path(path: Path, coin_id: str) -> Path:
+    """
+    Per-asset variant of a state file; Bitcoin keeps the original name so
+    existing single-asset state carries over.
+    """
+    if coin_id == DEFAULT_ASSET:
+        return path
+    return path.with_name(f"{path.stem}_{coin_id}{path.suffix}")
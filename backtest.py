@@ -0,0 +1,253 @@
+# backtest.py
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from indicators import rsi, sma, volatility
+
+DAYS_PER_YEAR = 365  # crypto trades every day
+RECOMMENDATION_POSITIONS = {"buy": 1.0, "avoid": 0.0}
+
+
+@dataclass
+class BacktestResult:
+    name: str
+    params: Dict = field(default_factory=dict)
+    days: int = 0
+    total_return_pct: float = 0.0
+    annualized_return_pct: float = 0.0
+    benchmark_return_pct: float = 0.0
+    max_drawdown_pct: float = 0.0
+    hit_rate_pct: Optional[float] = None
+    exposure_pct: float = 0.0
+    trades: int = 0
+
+    def summary(self) -> str:
+        params = ", ".join(f"{k}={v}" for k, v in self.params.items())
+        hit_rate = "n/a" if self.hit_rate_pct is None else f"{self.hit_rate_pct:.1f}%"
+        return (
+            f"{self.name}({params}): return {self.total_return_pct:+.2f}% "
+            f"(buy&hold {self.benchmark_return_pct:+.2f}%), "
+            f"max DD {self.max_drawdown_pct:.2f}%, hit rate {hit_rate}, "
+            f"exposure {self.exposure_pct:.0f}%, trades {self.trades}"
+        )
+
+
+def run_backtest(closes, positions, name: str = "strategy", params: Optional[Dict] = None) -> BacktestResult:
+    """
+    Replay daily closes against target positions (0 = flat, 1 = long).
+    positions[t] is decided on the close of day t and earns day t+1's return;
+    NaN positions mark days with no view and are excluded from the stats.
+    """
+    closes = np.asarray(closes, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    result = BacktestResult(name=name, params=dict(params or {}))
+    if closes.size < 2:
+        return result
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_returns = np.diff(closes) / closes[:-1]
+    held = positions[:-1]
+    active = ~np.isnan(held) & np.isfinite(daily_returns)
+    if not active.any():
+        return result
+
+    strategy_returns = np.where(active, np.nan_to_num(held) * daily_returns, 0.0)
+    equity = np.cumprod(1 + strategy_returns[active])
+    benchmark = np.prod(1 + daily_returns[active])
+    drawdowns = equity / np.maximum.accumulate(equity) - 1
+
+    active_positions = held[active]
+    active_returns = daily_returns[active]
+    hits = ((active_positions > 0) & (active_returns > 0)) | ((active_positions == 0) & (active_returns <= 0))
+    days = int(active.sum())
+
+    result.days = days
+    result.total_return_pct = float(equity[-1] - 1) * 100
+    result.annualized_return_pct = float(equity[-1] ** (DAYS_PER_YEAR / days) - 1) * 100
+    result.benchmark_return_pct = float(benchmark - 1) * 100
+    result.max_drawdown_pct = float(drawdowns.min()) * 100
+    result.hit_rate_pct = float(hits.mean()) * 100
+    result.exposure_pct = float((active_positions > 0).mean()) * 100
+    result.trades = int(np.count_nonzero(np.diff(active_positions)))
+    return result
+
+
+def positions_from_history(dates: Sequence[str], entries: Iterable[Dict], hold_default: float = 1.0) -> np.ndarray:
+    """
+    Turn stored buy/hold/avoid decisions into a daily position series aligned
+    with `dates`. "hold" keeps the previous position (long if there is none);
+    days before the first decision carry no view.
+    """
+    index = {date: i for i, date in enumerate(dates)}
+    decisions = np.full(len(dates), np.nan)
+    for entry in sorted(entries, key=lambda item: str(item.get("date", ""))):
+        position = index.get(entry.get("date"))
+        recommendation = str(entry.get("recommendation", "")).lower()
+        if position is None or recommendation not in ("buy", "hold", "avoid"):
+            continue
+        decisions[position] = RECOMMENDATION_POSITIONS.get(recommendation, -1.0)
+
+    positions = _forward_fill(decisions)
+    # Resolve "hold" markers (-1) to whatever position preceded them.
+    holds = positions == -1.0
+    if holds.any():
+        resolved = np.where(holds, np.nan, positions)
+        started = ~np.isnan(positions)
+        resolved = _forward_fill(resolved)
+        positions = np.where(started & np.isnan(resolved), hold_default, resolved)
+    return positions
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    last_valid = np.where(valid, np.arange(values.size), 0)
+    np.maximum.accumulate(last_valid, out=last_valid)
+    filled = values[last_valid]
+    filled[: np.argmax(valid) if valid.any() else values.size] = np.nan
+    return filled
+
+
+# --------------------------------------------------------------- strategies
+# Each strategy maps closes (+ params) to a position series using the same
+# indicator definitions that feed the analysis prompt.
+
+def _series(indicator: Callable[[np.ndarray, int], np.ndarray], closes: np.ndarray, window: int) -> np.ndarray:
+    """
+    indicator(closes, window), computed once per sweep worker: a grid repeats
+    the same few windows across thousands of configs. Other callers get a
+    fresh series.
+    """
+    if closes is not _worker_closes:
+        return indicator(closes, window)
+    key = (indicator.__name__, window)
+    values = _worker_series.get(key)
+    if values is None:
+        values = _worker_series[key] = indicator(closes, window)
+    return values
+
+
+def ma_crossover(closes: np.ndarray, fast: int = 7, slow: int = 30) -> np.ndarray:
+    fast_ma, slow_ma = _series(sma, closes, fast), _series(sma, closes, slow)
+    positions = (fast_ma > slow_ma).astype(float)
+    positions[np.isnan(fast_ma) | np.isnan(slow_ma)] = np.nan
+    return positions
+
+
+def rsi_reversion(closes: np.ndarray, period: int = 14, oversold: float = 30, overbought: float = 70) -> np.ndarray:
+    values = _series(rsi, closes, period)
+    signals = np.full(values.shape, np.nan)
+    signals[values < oversold] = 1.0
+    signals[values > overbought] = 0.0
+    positions = _forward_fill(signals)
+    positions[~np.isnan(values) & np.isnan(positions)] = 0.0
+    return positions
+
+
+def trend_volatility_filter(closes: np.ndarray, window: int = 90, max_volatility: float = 0.8) -> np.ndarray:
+    trend, vol = _series(sma, closes, window), _series(volatility, closes, 30)
+    positions = ((closes > trend) & (vol < max_volatility)).astype(float)
+    positions[np.isnan(trend) | np.isnan(vol)] = np.nan
+    return positions
+
+
+STRATEGIES: Dict[str, Callable[..., np.ndarray]] = {
+    "ma_crossover": ma_crossover,
+    "rsi_reversion": rsi_reversion,
+    "trend_volatility_filter": trend_volatility_filter,
+}
+
+
+def run_strategy(closes, strategy: str, **params) -> BacktestResult:
+    closes = np.asarray(closes, dtype=float)
+    positions = STRATEGIES[strategy](closes, **params)
+    return run_backtest(closes, positions, name=strategy, params=params)
+
+
+# ----------------------------------------------------------- parameter sweep
+
+_worker_closes: Optional[np.ndarray] = None
+_worker_series: Dict[Tuple[str, int], np.ndarray] = {}
+
+
+def _init_worker(closes: Optional[np.ndarray]) -> None:
+    # Ship the price array once per worker instead of once per config.
+    global _worker_closes
+    _worker_closes = closes
+    _worker_series.clear()
+
+
+def _run_config(config: Tuple[str, Dict]) -> BacktestResult:
+    strategy, params = config
+    return run_strategy(_worker_closes, strategy, **params)
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def sweep(
+    closes,
+    strategy: str,
+    grid: Dict[str, Sequence],
+    workers: Optional[int] = None,
+    valid: Optional[Callable[[Dict], bool]] = None,
+) -> List[BacktestResult]:
+    """
+    Backtest every parameter combination in `grid` across a process pool and
+    return the results sorted by total return (best first).
+    """
+    closes = np.asarray(closes, dtype=float)
+    configs = [(strategy, params) for params in expand_grid(grid) if valid is None or valid(params)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or len(configs) < 2 * workers:
+        _init_worker(closes)
+        try:
+            results = [_run_config(config) for config in configs]
+        finally:
+            _init_worker(None)
+    else:
+        chunksize = max(1, len(configs) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(closes,)) as pool:
+            results = list(pool.map(_run_config, configs, chunksize=chunksize))
+
+    results.sort(key=lambda result: result.total_return_pct, reverse=True)
+    return results
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    from history_store import get_history_store
+    from price_store import PriceStore
+
+    series = PriceStore("bitcoin").series()
+    if not series:
+        raise SystemExit("Price store is empty; run the pipeline once to populate data/prices_bitcoin.bin.")
+    dates = [date for date, _ in series]
+    closes = np.array([price for _, price in series])
+    print(f"📊 Backtesting over {len(closes)} days ({dates[0]} → {dates[-1]})")
+
+    history = get_history_store().range(start=dates[0], end=dates[-1])
+    recommendations = run_backtest(closes, positions_from_history(dates, history), name="recommendations")
+    print(recommendations.summary())
+
+    started = time.perf_counter()
+    results = sweep(
+        closes,
+        "ma_crossover",
+        {"fast": range(3, 60), "slow": range(10, 200, 2)},
+        valid=lambda params: params["fast"] < params["slow"],
+    )
+    print(f"\n🔁 Swept {len(results)} ma_crossover configs in {time.perf_counter() - started:.2f}s; top 5:")
+    for result in results[:5]:
+        print(" ", result.summary())
+    print(json.dumps(asdict(results[0]), indent=2))
@@ -0,0 +1,86 @@
+# benchmarks/bench_dedupe.py
+#
+# Near-duplicate detection on synthetic headlines: MinHash signatures,
+# in-run LSH clustering and lookups against a populated seen-story index,
+# from a normal run's ~60 items up to 5k.
+#
+#   python benchmarks/bench_dedupe.py [--sizes 60,1000,5000] [--repeat 5]
+
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from harness import measure, print_table, result
+
+import dedupe  # noqa: E402
+
+GROUP = "dedupe"
+DEFAULT_SIZES = (60, 1_000, 5_000)
+QUICK_SIZES = (60, 1_000)
+
+_VOCABULARY = (
+    "bitcoin ether solana etf miners halving fed rates inflows outflows whales exchange hack rally crash "
+    "stablecoin treasury yields options futures funding hashrate regulators sec lawsuit approval staking "
+    "liquidations leverage custody bank wallet layer upgrade fork mempool fees tether reserves audit "
+    "macro inflation cpi jobs dollar gold equities nasdaq volatility record low high support resistance"
+).split()
+HEADLINE_WORDS = 8
+
+
+def synthetic_headlines(count: int, duplicate_share: float = 0.2, seed: int = 7) -> List[str]:
+    """
+    Random headlines from a market vocabulary, a share of them reworded
+    repeats (one word dropped), roughly how one story shows up across feeds.
+    """
+    rng = random.Random(seed)
+    headlines: List[str] = []
+    for _ in range(count):
+        if headlines and rng.random() < duplicate_share:
+            words = rng.choice(headlines).split()
+            words.pop(rng.randrange(len(words)))
+            headlines.append(" ".join(words))
+        else:
+            headlines.append(" ".join(rng.sample(_VOCABULARY, HEADLINE_WORDS)))
+    return headlines
+
+
+def run(repeat: int = 5, quick: bool = False, sizes: Sequence[int] = ()) -> List[Dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # A full index of earlier stories for the lookups to search.
+        index_path = Path(tmp) / "seen.json"
+        index = dedupe.SeenIndex(path=index_path)
+        seen = synthetic_headlines(dedupe.MAX_SEEN_ENTRIES, seed=11)
+        for signature, title in zip(dedupe.signatures(seen), seen):
+            index.record(signature, title)
+        index.save()
+        results.append(result(
+            GROUP, "load_index", measure(lambda: dedupe.SeenIndex(path=index_path), repeat, number=1), index=len(index),
+        ))
+
+        for n in sizes or (QUICK_SIZES if quick else DEFAULT_SIZES):
+            headlines = synthetic_headlines(n)
+            results.append(result(GROUP, "signatures", measure(lambda: dedupe.signatures(headlines), repeat), n=n))
+            sigs = dedupe.signatures(headlines)
+            results.append(result(GROUP, "cluster", measure(lambda: dedupe.cluster(sigs), repeat), n=n))
+            results.append(result(
+                GROUP, "seen_match", measure(lambda: [index.match(signature) for signature in sigs], repeat),
+                n=n, index=len(index),
+            ))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate detection.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print_table(run(args.repeat, sizes=[int(size) for size in args.sizes.split(",")]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
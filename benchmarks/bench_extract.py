@@ -0,0 +1,84 @@
+# benchmarks/bench_extract.py
+#
+# Compare the lxml streaming extractor against the original BeautifulSoup
+# implementation of fetch_article_body on the fixture pages.
+#
+#   python benchmarks/bench_extract.py [--repeat 50]
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from article_extract import extract_article_text  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def reference_extract(html: str) -> str:
+    """
+    The html.parser + three-walk extraction fetch_article_body used before.
+    """
+    page = BeautifulSoup(html, "html.parser")
+
+    article_block = page.find("article")
+    if article_block:
+        paragraphs = [p.get_text(strip=True) for p in article_block.find_all("p")]
+        if paragraphs:
+            return " ".join(paragraphs)
+
+    hero_block = page.find("div", class_="article-hero-content")
+    if hero_block:
+        paragraphs = [p.get_text(strip=True) for p in hero_block.find_all("p")]
+        if paragraphs:
+            return " ".join(paragraphs)
+
+    paragraphs = [p.get_text(strip=True) for p in page.find_all("p")]
+    if paragraphs:
+        return " ".join(paragraphs)
+
+    return "No article content found."
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark article text extraction.")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    fixtures = sorted(FIXTURES_DIR.glob("coindesk_*.html"))
+    if not fixtures:
+        print(f"No fixtures found in {FIXTURES_DIR}")
+        return 1
+
+    mismatches = 0
+    total_reference = total_fast = 0.0
+    print(f"{'fixture':<32} {'KB':>6} {'bs4 ms':>9} {'lxml ms':>9} {'speedup':>8}")
+    for path in fixtures:
+        html = path.read_text(encoding="utf-8")
+        expected = reference_extract(html)
+        actual = extract_article_text(html)
+        if actual != expected:
+            mismatches += 1
+            print(f"❌ {path.name}: output differs from the reference implementation")
+            continue
+
+        reference_ms = timeit.timeit(lambda: reference_extract(html), number=args.repeat) / args.repeat * 1000
+        fast_ms = timeit.timeit(lambda: extract_article_text(html), number=args.repeat) / args.repeat * 1000
+        total_reference += reference_ms
+        total_fast += fast_ms
+        print(
+            f"{path.name:<32} {len(html) / 1024:6.1f} {reference_ms:9.2f} {fast_ms:9.2f} "
+            f"{reference_ms / fast_ms:7.1f}x"
+        )
+
+    if total_fast:
+        print(f"{'total':<32} {'':>6} {total_reference:9.2f} {total_fast:9.2f} {total_reference / total_fast:7.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# benchmarks/bench_history.py
+#
+# Decision history load/save on a temporary SQLite store holding 30 up to
+# 100k entries.
+#
+#   python benchmarks/bench_history.py [--sizes 30,1000,10000,100000] [--repeat 5]
+
+import argparse
+import itertools
+import json
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from harness import measure, print_table, result
+
+from history_store import HistoryStore  # noqa: E402
+
+GROUP = "history"
+DEFAULT_SIZES = (30, 1_000, 10_000, 100_000)
+QUICK_SIZES = (30, 10_000)
+
+
+def _entry(day: date, n: int) -> Dict:
+    return {
+        "date": day.isoformat(),
+        "recommendation": ("buy", "hold", "avoid")[n % 3],
+        "confidence": 50 + n % 40,
+        "reasoning": [
+            "Price holds above the 30-day average while momentum cools.",
+            "Headlines are mixed between ETF flows and macro caution.",
+        ],
+    }
+
+
+def _populate(path: Path, entries: int) -> None:
+    # Bulk insert for setup speed; append() is what gets timed.
+    store = HistoryStore(path, retention_days=None, legacy_path=None)
+    today = date.today()
+    rows = [
+        ("bitcoin", day.isoformat(), time.time(), json.dumps(_entry(day, n)))
+        for n, day in enumerate(today - timedelta(days=offset) for offset in range(entries))
+    ]
+    with store._conn:
+        store._conn.executemany("INSERT INTO decisions (asset, date, recorded_at, entry) VALUES (?, ?, ?, ?)", rows)
+    store.close()
+
+
+def run(repeat: int = 5, quick: bool = False, sizes: Sequence[int] = ()) -> List[Dict]:
+    results = []
+    for n in sizes or (QUICK_SIZES if quick else DEFAULT_SIZES):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "history.db"
+            _populate(path, n)
+
+            def open_store():
+                HistoryStore(path, retention_days=None, legacy_path=None).close()
+
+            results.append(result(GROUP, "open", measure(open_store, repeat), n=n))
+
+            store = HistoryStore(path, retention_days=None, legacy_path=None)
+
+            def recent_uncached():
+                store._recent_cache.clear()
+                store.recent(7)
+
+            results.append(result(GROUP, "recent_7d", measure(recent_uncached, repeat), n=n, cache="cold"))
+            store.recent(7)
+            results.append(result(GROUP, "recent_7d", measure(lambda: store.recent(7), repeat), n=n, cache="warm"))
+            results.append(result(GROUP, "range_all", measure(lambda: store.range(), repeat, number=1 if n >= 10_000 else None), n=n))
+
+            # Each append adds a row older than the populated range; the few
+            # thousand timed calls barely change n.
+            days = (date.today() - timedelta(days=n + k) for k in itertools.count())
+            results.append(result(
+                GROUP, "append", measure(lambda: store.append(_entry(next(days), n)), repeat), n=n,
+            ))
+            store.close()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark decision history load/save.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print_table(run(args.repeat, sizes=[int(size) for size in args.sizes.split(",")]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
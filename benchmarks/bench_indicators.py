@@ -0,0 +1,99 @@
+# benchmarks/bench_indicators.py
+#
+# Price series preparation and indicator metrics on synthetic daily series
+# from a normal 350-day window up to 100k points, plus the backtest
+# parameter sweep over the same indicators.
+#
+#   python benchmarks/bench_indicators.py [--sizes 350,1000,10000,100000] [--repeat 5]
+
+import argparse
+import math
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from harness import measure, print_table, result
+
+import analyze  # noqa: E402
+import backtest  # noqa: E402
+
+GROUP = "indicators"
+DEFAULT_SIZES = (350, 1_000, 10_000, 100_000)
+QUICK_SIZES = (350, 10_000)
+SWEEP_CLOSES = 3_000
+# The grid backtest.py sweeps by default: 4,765 valid configs.
+SWEEP_GRID = {"fast": range(3, 60), "slow": range(10, 200, 2)}
+
+
+def synthetic_history(points: int, seed: int = 7) -> List[Dict]:
+    """
+    Geometric random walk of daily closes ending today, in the shape
+    get_coins_historical returns.
+    """
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=points - 1)
+    price = 30_000.0
+    history = []
+    for offset in range(points):
+        price *= math.exp(rng.gauss(0.0003, 0.03))
+        history.append({"date": (start + timedelta(days=offset)).isoformat(), "price_usd": round(price, 2)})
+    return history
+
+
+def run(repeat: int = 5, quick: bool = False, sizes: Sequence[int] = ()) -> List[Dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = Path(tmp) / "indicator_state.json"
+        original_state_file = analyze.INDICATOR_STATE_FILE
+        analyze.INDICATOR_STATE_FILE = state_file
+        try:
+            for n in sizes or (QUICK_SIZES if quick else DEFAULT_SIZES):
+                history = synthetic_history(n)
+                results.append(result(GROUP, "prepare_price_series", measure(lambda: analyze._prepare_price_series(history), repeat), n=n))
+                series = analyze._prepare_price_series(history)
+
+                # No persisted state: full streaming sync, then state save.
+                def cold():
+                    state_file.unlink(missing_ok=True)
+                    analyze._build_price_metrics_batch({"bitcoin": series})
+
+                results.append(result(GROUP, "build_price_metrics", measure(cold, repeat), n=n, state="cold"))
+
+                # State already at the last close: load + check only.
+                analyze._build_price_metrics_batch({"bitcoin": series})
+                warm = measure(lambda: analyze._build_price_metrics_batch({"bitcoin": series}), repeat)
+                results.append(result(GROUP, "build_price_metrics", warm, n=n, state="in_sync"))
+
+                # The vectorized path used when there is no usable state.
+                def vectorized():
+                    latest = analyze._batch_latest_indicators({"bitcoin": series})["bitcoin"]
+                    analyze._format_price_metrics(series, latest)
+
+                results.append(result(GROUP, "build_price_metrics", measure(vectorized, repeat), n=n, state="vectorized"))
+
+            # In-process, so the figure is the per-config indicator cost rather than pool startup.
+            closes = [point["price_usd"] for point in synthetic_history(SWEEP_CLOSES)]
+
+            def sweep():
+                backtest.sweep(closes, "ma_crossover", SWEEP_GRID, workers=1, valid=lambda params: params["fast"] < params["slow"])
+
+            results.append(result(GROUP, "backtest_sweep", measure(sweep, repeat, number=1), n=SWEEP_CLOSES, strategy="ma_crossover"))
+        finally:
+            analyze.INDICATOR_STATE_FILE = original_state_file
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark price series preparation and indicators.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print_table(run(args.repeat, sizes=[int(size) for size in args.sizes.split(",")]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# benchmarks/bench_parsing.py
+#
+# Parsing hot paths against the fixture payloads in benchmarks/fixtures/:
+# the CoinGecko market_chart point loop, CoinDesk RSS + article pages
+# through fetch_article_body, and the Reddit hot listing. The fixtures are
+# hand-built to mirror each upstream's response shape; they are not
+# captured traffic, so real pages (scripts, ads, odd markup) may parse at a
+# different speed. The network layer is replaced by the fixture bytes so
+# only our own code is timed.
+#
+#   python benchmarks/bench_parsing.py [--repeat 5]
+
+import argparse
+import itertools
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+from unittest import mock
+
+from harness import FIXTURES_DIR, measure, print_table, result
+
+import sentiment_scraper  # noqa: E402
+from article_cache import ArticleCache  # noqa: E402
+from trend_scraper import _parse_price_points  # noqa: E402
+
+GROUP = "parsing"
+
+
+class _FixtureResponse:
+    def __init__(self, body: bytes):
+        self.content = body
+        self.text = body.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def _bench_coingecko(repeat: int) -> List[Dict]:
+    raw = (FIXTURES_DIR / "coingecko_market_chart.json").read_bytes()
+    prices = json.loads(raw)["prices"]
+    return [
+        result(GROUP, "coingecko_parse_price_points", measure(lambda: _parse_price_points(prices), repeat), points=len(prices)),
+        result(
+            GROUP, "coingecko_decode_and_parse",
+            measure(lambda: _parse_price_points(json.loads(raw)["prices"]), repeat),
+            points=len(prices),
+        ),
+    ]
+
+
+def _bench_coindesk(repeat: int) -> List[Dict]:
+    rss = (FIXTURES_DIR / "coindesk_rss.xml").read_text(encoding="utf-8")
+    results = [
+        result(GROUP, "coindesk_parse_rss", measure(lambda: sentiment_scraper._parse_rss_items(rss), repeat),
+               items=len(sentiment_scraper._parse_rss_items(rss))),
+    ]
+
+    page = _FixtureResponse((FIXTURES_DIR / "coindesk_article.html").read_bytes())
+    urls = (f"https://www.coindesk.com/markets/bench-{n}" for n in itertools.count())
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.object(sentiment_scraper, "_request_with_retries", lambda url, **kw: page):
+        cache_path = Path(tmp) / "article_cache.json"
+
+        # Every call is a first sighting: fetch + hash + extract.
+        with mock.patch.object(sentiment_scraper, "get_article_cache", lambda: ArticleCache(path=cache_path)):
+            timing = measure(lambda: sentiment_scraper.fetch_article_body(next(urls)), repeat)
+        results.append(result(GROUP, "fetch_article_body", timing, cache="miss", kb=len(page.content) // 1024))
+
+        shared = ArticleCache(path=cache_path)
+        with mock.patch.object(sentiment_scraper, "get_article_cache", lambda: shared):
+            sentiment_scraper.fetch_article_body("https://www.coindesk.com/markets/seen")
+            # New URL, unchanged page: fetch + hash, no parse.
+            timing = measure(lambda: sentiment_scraper.fetch_article_body(next(urls)), repeat)
+            results.append(result(GROUP, "fetch_article_body", timing, cache="content_hit", kb=len(page.content) // 1024))
+            # Recently seen URL: no fetch at all.
+            timing = measure(lambda: sentiment_scraper.fetch_article_body("https://www.coindesk.com/markets/seen"), repeat)
+            results.append(result(GROUP, "fetch_article_body", timing, cache="url_hit", kb=len(page.content) // 1024))
+    return results
+
+
+def _bench_reddit(repeat: int) -> List[Dict]:
+    raw = (FIXTURES_DIR / "reddit_hot.json").read_bytes()
+    listing = json.loads(raw)
+    posts = len(listing["data"]["children"])
+    response = _FixtureResponse(raw)
+    with mock.patch.object(sentiment_scraper, "_request_with_retries", lambda url, **kw: response):
+        full = measure(lambda: sentiment_scraper.get_reddit_bitcoin_posts(limit=posts), repeat)
+    return [
+        result(GROUP, "reddit_parse_listing", measure(lambda: sentiment_scraper._parse_reddit_listing(listing), repeat), posts=posts),
+        result(GROUP, "get_reddit_bitcoin_posts", full, posts=posts),
+    ]
+
+
+def run(repeat: int = 5, quick: bool = False) -> List[Dict]:
+    return _bench_coingecko(repeat) + _bench_coindesk(repeat) + _bench_reddit(repeat)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark upstream payload parsing.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print_table(run(args.repeat))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
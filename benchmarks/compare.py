@@ -0,0 +1,59 @@
+# benchmarks/compare.py
+#
+# Compare two run_all.py result files benchmark by benchmark (min per-call
+# time). Exits non-zero when --fail-on-regression is set and any benchmark got
+# slower than the threshold.
+#
+#   python benchmarks/compare.py base.json head.json [--threshold 10] [--fail-on-regression]
+
+import argparse
+import json
+import sys
+
+from harness import result_key
+
+
+def _load(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data, {result_key(entry): entry for entry in data["results"]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change treated as significant")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    base_meta, base = _load(args.base)
+    head_meta, head = _load(args.head)
+    print(f"base {base_meta['label']} ({base_meta['python']}, {base_meta['machine']})")
+    print(f"head {head_meta['label']} ({head_meta['python']}, {head_meta['machine']})")
+
+    keys = [key for key in base if key in head]
+    width = max((len(key) for key in keys), default=10)
+    print(f"{'benchmark':<{width}} {'base ms':>12} {'head ms':>12} {'change':>9}")
+    regressions = improvements = 0
+    for key in keys:
+        before, after = base[key]["min_ms"], head[key]["min_ms"]
+        change = (after / before - 1) * 100 if before else 0.0
+        marker = ""
+        if change > args.threshold:
+            marker = " ❌ slower"
+            regressions += 1
+        elif change < -args.threshold:
+            marker = " ✅ faster"
+            improvements += 1
+        print(f"{key:<{width}} {before:12.4f} {after:12.4f} {change:+8.1f}%{marker}")
+
+    for label, only in (("base", [key for key in base if key not in head]), ("head", [key for key in head if key not in base])):
+        if only:
+            print(f"Only in {label}: {', '.join(only)}")
+    print(f"{improvements} faster, {regressions} slower beyond ±{args.threshold:g}%")
+    return 1 if args.fail_on_regression and regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# benchmarks/harness.py
+#
+# Shared timing and result helpers for the benchmark scripts.
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+DEFAULT_REPEAT = 5
+MIN_BATCH_SECONDS = 0.2  # each repeat loops the call until it takes at least this long
+
+
+def measure(fn: Callable[[], object], repeat: int = DEFAULT_REPEAT, number: Optional[int] = None) -> Dict:
+    """
+    Per-call timings in milliseconds. `number` calls are batched per repeat
+    (auto-ranged when omitted) and the min is the figure to compare; median
+    shows the noise.
+    """
+    timer = timeit.Timer(fn)
+    if number is None:
+        number, elapsed = timer.autorange()
+        while elapsed < MIN_BATCH_SECONDS and number < 1_000_000:
+            number *= 2
+            elapsed = timer.timeit(number)
+    per_call = [elapsed / number * 1000 for elapsed in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_ms": round(min(per_call), 6),
+        "median_ms": round(statistics.median(per_call), 6),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def result(group: str, name: str, timing: Dict, **params) -> Dict:
+    return {"group": group, "name": name, "params": params, **timing}
+
+
+def result_key(entry: Dict) -> str:
+    params = ",".join(f"{key}={value}" for key, value in sorted(entry.get("params", {}).items()))
+    return f"{entry['group']}/{entry['name']}" + (f"[{params}]" if params else "")
+
+
+def print_table(results: List[Dict]) -> None:
+    width = max((len(result_key(entry)) for entry in results), default=10)
+    print(f"{'benchmark':<{width}} {'min ms':>12} {'median ms':>12} {'calls':>9}")
+    for entry in results:
+        print(f"{result_key(entry):<{width}} {entry['min_ms']:12.4f} {entry['median_ms']:12.4f} {entry['number']:9d}")
+
+
+def git_revision() -> str:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return revision + ("-dirty" if dirty else "")
+
+
+def write_results(results: List[Dict], path: Optional[Path] = None, label: Optional[str] = None) -> Path:
+    revision = git_revision()
+    path = path or RESULTS_DIR / f"{label or revision}.json"
+    payload = {
+        "revision": revision,
+        "label": label or revision,
+        "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return path
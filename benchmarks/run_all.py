@@ -0,0 +1,52 @@
+# benchmarks/run_all.py
+#
+# Run every benchmark group and save the results as JSON, named after the
+# current commit, so two commits can be compared with compare.py.
+#
+#   python benchmarks/run_all.py [--quick] [--groups parsing,indicators,history,dedupe] [--label NAME]
+#   python benchmarks/compare.py benchmarks/results/<base>.json benchmarks/results/<head>.json
+
+import argparse
+import sys
+from pathlib import Path
+
+from harness import print_table, write_results
+
+import bench_dedupe  # noqa: E402
+import bench_history  # noqa: E402
+import bench_indicators  # noqa: E402
+import bench_parsing  # noqa: E402
+
+GROUPS = {
+    "parsing": bench_parsing.run,
+    "indicators": bench_indicators.run,
+    "history": bench_history.run,
+    "dedupe": bench_dedupe.run,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and save JSON results.")
+    parser.add_argument("--groups", default=",".join(GROUPS), help="comma-separated subset of: " + ", ".join(GROUPS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for a fast smoke run")
+    parser.add_argument("--label", help="results file name (default: short commit hash)")
+    parser.add_argument("--output", type=Path, help="explicit results path")
+    args = parser.parse_args()
+
+    results = []
+    for group in args.groups.split(","):
+        if group not in GROUPS:
+            parser.error(f"unknown group {group!r}")
+        print(f"▶️ {group}")
+        group_results = GROUPS[group](repeat=args.repeat, quick=args.quick)
+        print_table(group_results)
+        results.extend(group_results)
+
+    path = write_results(results, args.output, args.label)
+    print(f"💾 Saved {len(results)} result(s) to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
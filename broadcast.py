@@ -0,0 +1,205 @@
+# broadcast.py
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from telegram import Bot
+from telegram.error import BadRequest, ChatMigrated, Forbidden, RetryAfter, TelegramError
+
+# Telegram allows roughly 30 messages/s per bot, 1/s per private chat and
+# 20/min per group; stay a little under each.
+GLOBAL_MESSAGES_PER_SECOND = 25
+GLOBAL_BURST = 25
+PRIVATE_CHAT_INTERVAL = 1.0  # seconds between messages to one private chat
+GROUP_CHAT_INTERVAL = 3.0  # group/channel ids are negative
+SEND_CONCURRENCY = 16  # sends in flight at once
+MAX_SEND_ATTEMPTS = 3  # for timeouts/network errors; RetryAfter does not count
+RETRY_BACKOFF = 1.0  # seconds, doubled per attempt
+# RetryAfter from this many distinct chats within FLOOD_WINDOW seconds means
+# the bot-wide rate is exceeded; fewer is a per-chat (e.g. group) limit.
+GLOBAL_FLOOD_CHATS = 3
+FLOOD_WINDOW = 1.0
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket for one event loop. Like http_client.TokenBucket, callers
+    reserve a token and then sleep until it is due; pause() holds everyone back
+    (a bot-wide RetryAfter).
+    """
+
+    def __init__(self, per_second: float, burst: int):
+        self.rate = per_second
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        wait = max(wait, self.paused_until - now)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+@dataclass
+class DeliveryStats:
+    chats: int = 0
+    messages: int = 0
+    sent: int = 0
+    failed: int = 0
+    rate_limited: int = 0  # RetryAfter responses, each requeued
+    retried: int = 0  # timeouts/network errors retried
+    migrated: int = 0
+    elapsed: float = 0.0
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        rate = self.sent / self.elapsed if self.elapsed else 0.0
+        line = (
+            f"📬 Telegram: {self.sent}/{self.messages} message(s) to {self.chats} chat(s) in {self.elapsed:.2f}s "
+            f"({rate:.1f}/s); {self.failed} failed, {self.rate_limited} rate-limited, {self.retried} retried"
+        )
+        if self.migrated:
+            line += f", {self.migrated} migrated"
+        if self.errors:
+            line += " | " + ", ".join(f"{name}: {count}" for name, count in sorted(self.errors.items()))
+        return line
+
+
+def _retry_after_seconds(exc: RetryAfter) -> float:
+    value = exc.retry_after
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+def _chat_interval(chat_id: str) -> float:
+    return GROUP_CHAT_INTERVAL if str(chat_id).startswith("-") else PRIVATE_CHAT_INTERVAL
+
+
+class Broadcaster:
+    """
+    Fans pre-rendered messages out to many chats through one queue and a fixed
+    pool of send workers. Each chat gets the messages in order; its next
+    message is re-queued once the per-chat interval has passed, so a slow
+    chat never blocks the others. A RetryAfter re-queues only that chat after
+    the wait; the shared limiter is paused for every worker only when several
+    chats are throttled at once, i.e. the bot-wide limit was hit. Wall time
+    grows with chats / rate limit, not chats x latency.
+    """
+
+    def __init__(self, bot: Bot, concurrency: int = SEND_CONCURRENCY):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.limiter = AsyncRateLimiter(GLOBAL_MESSAGES_PER_SECOND, GLOBAL_BURST)
+
+    async def broadcast(
+        self,
+        chat_ids: Sequence[str],
+        messages: Sequence[Tuple[str, Optional[str]]],
+    ) -> DeliveryStats:
+        """
+        Send every (text, parse_mode) in `messages` to every chat.
+        """
+        stats = DeliveryStats(chats=len(chat_ids), messages=len(chat_ids) * len(messages))
+        if not chat_ids or not messages:
+            return stats
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        remaining = len(chat_ids)  # chats with messages still to deliver
+        finished = asyncio.Event()
+        timers: List[asyncio.TimerHandle] = []
+        floods: Dict[str, float] = {}  # chat -> time of its latest RetryAfter
+
+        def throttled(chat_id: str, wait: float) -> None:
+            now = time.monotonic()
+            floods[chat_id] = now
+            for other in [other for other, at in floods.items() if now - at > FLOOD_WINDOW]:
+                del floods[other]
+            if len(floods) >= GLOBAL_FLOOD_CHATS:
+                self.limiter.pause(wait)
+
+        def requeue(job: Tuple[str, int, int], delay: float) -> None:
+            if delay > 0:
+                timers.append(loop.call_later(delay, queue.put_nowait, job))
+            else:
+                queue.put_nowait(job)
+
+        def advance(chat_id: str, index: int) -> None:
+            nonlocal remaining
+            if index + 1 < len(messages):
+                requeue((chat_id, index + 1, 1), _chat_interval(chat_id))
+                return
+            remaining -= 1
+            if remaining == 0:
+                finished.set()
+
+        def give_up(chat_id: str, index: int, exc: Exception) -> None:
+            nonlocal remaining
+            failed = len(messages) - index
+            stats.failed += failed
+            name = type(exc).__name__
+            stats.errors[name] = stats.errors.get(name, 0) + failed
+            remaining -= 1
+            if remaining == 0:
+                finished.set()
+
+        async def worker() -> None:
+            while True:
+                chat_id, index, attempt = await queue.get()
+                text, parse_mode = messages[index]
+                await self.limiter.acquire()
+                try:
+                    await self.bot.send_message(
+                        chat_id=chat_id,
+                        text=text,
+                        parse_mode=parse_mode,
+                        disable_web_page_preview=True,
+                    )
+                except RetryAfter as exc:
+                    stats.rate_limited += 1
+                    wait = _retry_after_seconds(exc)
+                    throttled(chat_id, wait)
+                    requeue((chat_id, index, attempt), wait)
+                except ChatMigrated as exc:
+                    stats.migrated += 1
+                    requeue((str(exc.new_chat_id), index, attempt), 0)
+                except (Forbidden, BadRequest) as exc:
+                    give_up(chat_id, index, exc)
+                except TelegramError as exc:
+                    if attempt >= MAX_SEND_ATTEMPTS:
+                        give_up(chat_id, index, exc)
+                    else:
+                        stats.retried += 1
+                        requeue((chat_id, index, attempt + 1), RETRY_BACKOFF * 2 ** (attempt - 1))
+                except Exception as exc:
+                    # Never let one bad chat kill a worker and hang the broadcast.
+                    give_up(chat_id, index, exc)
+                else:
+                    stats.sent += 1
+                    advance(chat_id, index)
+
+        started = time.perf_counter()
+        for chat_id in chat_ids:
+            queue.put_nowait((chat_id, 0, 1))
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(chat_ids)))]
+        try:
+            await finished.wait()
+        finally:
+            for timer in timers:
+                timer.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        stats.elapsed = time.perf_counter() - started
+        return stats
@@ -0,0 +1,175 @@
+# daemon.py
+
+import asyncio
+import signal
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+import notifier
+from analyze import get_client
+from http_client import get_http_client
+from metrics import get_metrics
+
+if TYPE_CHECKING:
+    from intraday import IntradayMonitor, Trigger
+
+DEFAULT_INTERVAL = 4 * 3600  # seconds between scheduled runs
+
+
+@dataclass
+class RunTiming:
+    run: int
+    started_at: str
+    pipeline: float
+    notify: float
+    reason: str = "scheduled"
+
+    @property
+    def total(self) -> float:
+        return self.pipeline + self.notify
+
+
+class PipelineDaemon:
+    """
+    Runs the pipeline on a fixed interval inside one event loop, keeping the
+    OpenAI client, Telegram bot and HTTP session warm between runs. The
+    blocking pipeline runs in a worker thread; notifications are awaited on the
+    daemon's own loop so the initialised bot stays bound to it.
+    """
+
+    def __init__(
+        self,
+        run_pipeline: Callable[[], Dict[str, str]],
+        interval: float = DEFAULT_INTERVAL,
+        import_seconds: float = 0.0,
+        intraday: Optional["IntradayMonitor"] = None,
+    ):
+        self.run_pipeline = run_pipeline
+        self.interval = interval
+        self.import_seconds = import_seconds
+        self.intraday = intraday
+        self.warm_up_seconds = 0.0
+        self.timings: List[RunTiming] = []
+        self.runs = 0
+        self._stop: Optional[asyncio.Event] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._wake_reason = ""
+
+    def request_stop(self) -> None:
+        if self._stop is not None and not self._stop.is_set():
+            print("🛑 Shutdown requested; finishing the current run first.")
+            self._stop.set()
+            self._wake.set()
+
+    def request_run(self, reason: str) -> None:
+        """
+        Run the pipeline now, off-cycle; the regular schedule is unaffected.
+        """
+        if self._wake is not None and not self._wake.is_set():
+            self._wake_reason = reason
+            self._wake.set()
+
+    async def _on_intraday_trigger(self, trigger: "Trigger") -> None:
+        await notifier.send_alert(trigger.message)
+        if trigger.action == "analyze":
+            self.request_run(f"{trigger.rule} ({trigger.asset})")
+
+    async def warm_up(self) -> None:
+        started = time.perf_counter()
+        get_client()
+        get_http_client()
+        await notifier.warm_up()
+        self.warm_up_seconds = time.perf_counter() - started
+        print(f"🔥 Clients warmed up in {self.warm_up_seconds:.2f}s (imports took {self.import_seconds:.2f}s)")
+
+    async def run_once(self, reason: str = "scheduled") -> None:
+        self.runs += 1
+        started_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        started = time.perf_counter()
+        results = await asyncio.to_thread(self.run_pipeline)
+        pipeline_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await notifier.send_notifications(results)
+        timing = RunTiming(self.runs, started_at, pipeline_seconds, time.perf_counter() - started, reason)
+        self.timings.append(timing)
+        print(self.timing_report(timing))
+        get_metrics().export(extra={"run": timing.run, "reason": reason, "notify_s": round(timing.notify, 3)})
+
+    def timing_report(self, timing: RunTiming) -> str:
+        """
+        Compare a run with what a cold one-shot process pays: imports and client
+        setup every time, plus the cold-connection first run. Interpreter start
+        itself is not measured, so the saving is a lower bound.
+        """
+        startup = self.import_seconds + self.warm_up_seconds
+        line = (
+            f"⏱️ Run {timing.run} ({timing.reason}) at {timing.started_at} UTC: pipeline {timing.pipeline:.2f}s + "
+            f"notify {timing.notify:.2f}s = {timing.total:.2f}s"
+        )
+        cold = self.timings[0]
+        if timing is cold:
+            return line + f" (cold run; startup {startup:.2f}s paid once)"
+        saving = startup + max(0.0, cold.total - timing.total)
+        return line + f" | cold-start equivalent ≈{startup + cold.total:.2f}s, saving ≈{saving:.2f}s"
+
+    async def serve(self, run_immediately: bool = True) -> None:
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                # Not available on this platform/thread; Ctrl+C still raises.
+                pass
+
+        await self.warm_up()
+        monitor_task = None
+        if self.intraday is not None:
+            monitor_task = asyncio.create_task(self.intraday.run(self._stop, self._on_intraday_trigger))
+        next_run = time.monotonic() if run_immediately else time.monotonic() + self.interval
+        print(f"🕒 Daemon started; running every {self.interval / 60:g} min")
+        try:
+            while not self._stop.is_set():
+                delay = next_run - time.monotonic()
+                reason = "scheduled"
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                        reason = self._wake_reason
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    if self._stop.is_set():
+                        break
+
+                try:
+                    await self.run_once(reason)
+                except Exception as exc:
+                    print(f"⚠️ {reason.capitalize()} run failed: {exc}")
+                if reason != "scheduled":
+                    continue
+
+                # Skip slots that a long run overran instead of running back to back.
+                next_run += self.interval
+                now = time.monotonic()
+                if next_run <= now:
+                    next_run = now + self.interval - (now - next_run) % self.interval
+        finally:
+            if monitor_task is not None:
+                self._stop.set()
+                await asyncio.gather(monitor_task, return_exceptions=True)
+            await notifier.close()
+            print("👋 Daemon stopped.")
+
+
+def run_daemon(
+    run_pipeline: Callable[[], Dict[str, str]],
+    interval: float = DEFAULT_INTERVAL,
+    import_seconds: float = 0.0,
+    intraday: Optional["IntradayMonitor"] = None,
+) -> None:
+    asyncio.run(PipelineDaemon(run_pipeline, interval, import_seconds, intraday).serve())
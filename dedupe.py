@@ -0,0 +1,349 @@
+# dedupe.py
+
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from metrics import incr
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+SEEN_INDEX_FILE = DATA_DIR / "seen_stories.json"
+
+NUM_PERM = 64  # MinHash permutations per signature
+LSH_BANDS = 16  # 16 bands of 4 rows: pairs near the threshold share a band with high probability
+DUPLICATE_THRESHOLD = 0.5  # estimated Jaccard similarity of two items' shingle sets
+MINHASH_SEED = 1729  # fixed: persisted signatures must stay comparable across runs
+MAX_SHINGLES_PER_BATCH = 65_536  # bounds the (NUM_PERM x shingles) scratch matrix
+
+MAX_SEEN_ENTRIES = 5000
+MAX_SEEN_AGE = 14 * 24 * 3600  # seconds since a story was last seen before it is forgotten
+SEEN_WEIGHT = 0.35  # weight multiplier for a story already seen in an earlier run
+DROP_SEEN = False  # drop already-seen stories instead of down-weighting them
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "will", "with", "after",
+    "over", "into", "amid", "says", "said", "new", "just", "i", "my", "you", "we", "what", "why", "how",
+})
+
+_MERSENNE = (1 << 31) - 1
+_rng = np.random.default_rng(MINHASH_SEED)
+_PERM_A = _rng.integers(1, _MERSENNE, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _MERSENNE, NUM_PERM, dtype=np.uint64)
+_ROWS = NUM_PERM // LSH_BANDS
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _shingles(text: str) -> Set[int]:
+    """
+    31-bit hashes of the word unigrams and bigrams left after stopwords,
+    with a crude plural strip so "ETF"/"ETFs" agree.
+    """
+    tokens = [
+        token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+        for token in _TOKEN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+    shingles = set(tokens)
+    shingles.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return {zlib.crc32(shingle.encode("utf-8")) & _MERSENNE for shingle in shingles} or {0}
+
+
+def signatures(texts: Sequence[str]) -> np.ndarray:
+    """
+    MinHash signatures, one uint32 row of NUM_PERM values per text. Texts are
+    hashed in batches, with one vectorized permutation pass per batch.
+    """
+    result = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    hashed = [np.fromiter(_shingles(text), dtype=np.uint64) for text in texts]
+    start = 0
+    while start < len(hashed):
+        end, total = start, 0
+        while end < len(hashed) and (end == start or total + len(hashed[end]) <= MAX_SHINGLES_PER_BATCH):
+            total += len(hashed[end])
+            end += 1
+        batch = hashed[start:end]
+        flat = np.concatenate(batch)
+        offsets = np.cumsum([0] + [len(values) for values in batch[:-1]])
+        permuted = (_PERM_A[:, None] * flat[None, :] + _PERM_B[:, None]) % _MERSENNE
+        result[start:end] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = end
+    return result
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """
+    Estimated Jaccard similarity of two signatures.
+    """
+    return float(np.count_nonzero(first == second)) / NUM_PERM
+
+
+def _band_keys(signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+    for band in range(LSH_BANDS):
+        yield band, signature[band * _ROWS:(band + 1) * _ROWS].tobytes()
+
+
+class LshIndex:
+    """
+    Banded LSH over MinHash signatures: two signatures are candidates when
+    all rows of at least one band agree, so a lookup touches only a few
+    buckets instead of every stored signature.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = defaultdict(set)
+
+    def add(self, key: str, signature: np.ndarray) -> None:
+        for band_key in _band_keys(signature):
+            self._buckets[band_key].add(key)
+
+    def remove(self, key: str, signature: np.ndarray) -> None:
+        for band_key in _band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def candidates(self, signature: np.ndarray) -> Set[str]:
+        found: Set[str] = set()
+        for band_key in _band_keys(signature):
+            found.update(self._buckets.get(band_key, ()))
+        return found
+
+
+def cluster(sigs: np.ndarray, threshold: float = DUPLICATE_THRESHOLD) -> List[int]:
+    """
+    Cluster label per signature. Each item joins the earliest cluster whose
+    first member it is a near-duplicate of (LSH candidates, verified against
+    the threshold), or starts its own, so labels are indices of each
+    cluster's first member. Comparing against first members only keeps
+    chains of loosely related items from merging into one cluster.
+    """
+    index = LshIndex()
+    labels: List[int] = []
+    for position, signature in enumerate(sigs):
+        matches = [int(key) for key in index.candidates(signature) if similarity(sigs[int(key)], signature) >= threshold]
+        if matches:
+            labels.append(min(matches))
+        else:
+            labels.append(position)
+            index.add(str(position), signature)
+    return labels
+
+
+class SeenIndex:
+    """
+    Persistent, bounded index of story signatures from earlier runs. Entries
+    are kept least recently seen first; evict() drops stories not seen for
+    max_age and then the oldest beyond max_entries, so the file and the
+    in-memory LSH buckets stay bounded.
+    """
+
+    def __init__(self, path: Path = SEEN_INDEX_FILE, max_entries: int = MAX_SEEN_ENTRIES, max_age: float = MAX_SEEN_AGE):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._lsh = LshIndex()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict) or data.get("num_perm") != NUM_PERM or data.get("seed") != MINHASH_SEED:
+            return  # signatures from other parameters are not comparable
+        stored = data.get("entries", {})
+        if not isinstance(stored, dict):
+            return
+        for key, entry in sorted(stored.items(), key=lambda item: item[1].get("last_seen", 0)):
+            try:
+                signature = np.frombuffer(base64.b64decode(entry["sig"]), dtype=np.uint32)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if signature.shape != (NUM_PERM,):
+                continue
+            self.entries[key] = entry
+            self._signatures[key] = signature
+            self._lsh.add(key, signature)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def match(self, signature: np.ndarray, threshold: float = DUPLICATE_THRESHOLD) -> Optional[Dict]:
+        """
+        The most similar stored story at or above the threshold, if any.
+        """
+        with self._lock:
+            best_key, best = None, threshold
+            for key in self._lsh.candidates(signature):
+                score = similarity(self._signatures[key], signature)
+                if score >= best:
+                    best_key, best = key, score
+            return dict(self.entries[best_key], similarity=round(best, 3)) if best_key else None
+
+    def record(self, signature: np.ndarray, title: str, now: Optional[float] = None) -> None:
+        """
+        Mark a story as seen: refresh its matching entry or add a new one.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            key = next(
+                (key for key in self._lsh.candidates(signature)
+                 if similarity(self._signatures[key], signature) >= DUPLICATE_THRESHOLD),
+                None,
+            )
+            if key is None:
+                key = hashlib.blake2b(signature.tobytes(), digest_size=8).hexdigest()
+                self.entries[key] = {
+                    "sig": base64.b64encode(signature.astype(np.uint32).tobytes()).decode("ascii"),
+                    "title": title[:120],
+                    "first_seen": now,
+                    "runs": 0,
+                }
+                self._signatures[key] = signature.copy()
+                self._lsh.add(key, self._signatures[key])
+            entry = self.entries[key]
+            entry["last_seen"] = now
+            entry["runs"] = entry.get("runs", 0) + 1
+            self.entries.move_to_end(key)
+            self._dirty = True
+
+    def _drop(self, key: str) -> None:
+        del self.entries[key]
+        self._lsh.remove(key, self._signatures.pop(key))
+
+    def evict(self) -> int:
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for key in list(self.entries):
+                if now - self.entries[key].get("last_seen", 0) <= self.max_age:
+                    break  # ordered oldest-first, everything after is newer
+                self._drop(key)
+                removed += 1
+            while len(self.entries) > self.max_entries:
+                self._drop(next(iter(self.entries)))
+                removed += 1
+            if removed:
+                self._dirty = True
+        return removed
+
+    def save(self) -> None:
+        self.evict()
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"num_perm": NUM_PERM, "seed": MINHASH_SEED, "entries": dict(self.entries)}
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        tmp_path.replace(self.path)
+
+
+_index: Optional[SeenIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_seen_index() -> SeenIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SeenIndex()
+    return _index
+
+
+def dedupe_context(
+    articles: Sequence[Dict],
+    posts: Sequence[Dict],
+    index: Optional[SeenIndex] = None,
+    persist: bool = True,
+) -> Dict:
+    """
+    Collapse near-duplicate articles and posts into one item per story
+    (CoinDesk first, then feed order) and mark stories already seen in
+    earlier runs. A kept item that absorbed others gets "coverage" (items in
+    its cluster) and "sources"; a seen story gets "seen_before" and a
+    "novelty" weight of SEEN_WEIGHT, or is dropped with DROP_SEEN. Returns
+    the filtered lists and per-run "stats".
+    """
+    index = index if index is not None else get_seen_index()
+    items = [("coindesk_articles", article) for article in articles]
+    items += [("reddit_posts", post) for post in posts if not post.get("error")]
+    placeholders = [post for post in posts if post.get("error")]
+
+    # Titles only: an article body and a link post's missing one would never
+    # look alike, and the headline is what repeats across sources and runs.
+    sigs = signatures([item.get("title") or "" for _, item in items])
+    labels = cluster(sigs)
+    members: Dict[int, List[int]] = defaultdict(list)
+    for position, label in enumerate(labels):
+        members[label].append(position)
+
+    kept: Dict[str, List[Dict]] = {"coindesk_articles": [], "reddit_posts": list(placeholders)}
+    seen = cross_source = dropped = 0
+    for label in sorted(members):
+        source, item = items[label]
+        item = dict(item)
+        group = members[label]
+        if len(group) > 1:
+            sources = sorted({items[position][0] for position in group})
+            item["coverage"] = len(group)
+            item["sources"] = sources
+            cross_source += len(sources) > 1
+        previous = index.match(sigs[label])
+        if previous is not None:
+            seen += 1
+            item["seen_before"] = True
+            item["novelty"] = SEEN_WEIGHT
+        index.record(sigs[label], item.get("title") or "")
+        if previous is not None and DROP_SEEN:
+            dropped += 1
+            continue
+        kept[source].append(item)
+
+    if persist:
+        index.save()
+    stats = {
+        "items": len(items),
+        "stories": len(members),
+        "in_run_duplicates": len(items) - len(members),
+        "cross_source": cross_source,
+        "seen_before": seen,
+        "dropped": dropped,
+        "index_size": len(index),
+    }
+    incr("dedupe_items", stats["in_run_duplicates"], result="duplicate")
+    incr("dedupe_items", seen, result="seen_before")
+    incr("dedupe_items", len(members) - seen, result="new")
+    return {**kept, "stats": stats}
+
+
+def format_stats(stats: Dict) -> str:
+    line = (
+        f"🧬 Dedupe: {stats['items']} item(s) → {stats['stories']} stories "
+        f"({stats['in_run_duplicates']} near-duplicate(s), {stats['cross_source']} cross-source), "
+        f"{stats['seen_before']} seen in earlier runs"
+    )
+    if stats.get("dropped"):
+        line += f" ({stats['dropped']} dropped)"
+    return line + f"; index {stats['index_size']} stories."
@@ -0,0 +1,201 @@
+# history_store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from assets import DEFAULT_ASSET
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+HISTORY_DB = DATA_DIR / "history.db"
+LEGACY_HISTORY_FILE = DATA_DIR / "history.json"
+
+# Decisions older than this are pruned on write; None keeps everything.
+HISTORY_RETENTION_DAYS: Optional[int] = 5 * 365
+# Import data/history.json the first time the database is opened. The JSON
+# file is left untouched; a marker in the meta table prevents re-importing.
+MIGRATE_LEGACY_JSON = True
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    asset TEXT NOT NULL DEFAULT 'bitcoin',
+    date TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+# Applied after _SCHEMA so databases created before the asset column existed
+# are upgraded in place (their rows are Bitcoin decisions).
+_INDEXES = """
+DROP INDEX IF EXISTS decisions_date;
+CREATE INDEX IF NOT EXISTS decisions_asset_date ON decisions (asset, date);
+"""
+
+
+def _valid_date(value) -> bool:
+    if not isinstance(value, str):
+        return False
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+
+def _days_ago(days: int) -> str:
+    """
+    First date on or after `now - days`, matching the old `entry_date >= cutoff`
+    comparison of midnight-dated entries against a timestamp.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    first = cutoff.date()
+    if cutoff.time() != datetime.min.time():
+        first += timedelta(days=1)
+    return first.strftime("%Y-%m-%d")
+
+
+class HistoryStore:
+    """
+    Append-only decision history in SQLite with an index on the ISO date, so
+    range queries are an index seek instead of a full-file parse. Dates are
+    validated once on write; reads never re-parse them.
+    """
+
+    def __init__(
+        self,
+        path: Path = HISTORY_DB,
+        retention_days: Optional[int] = HISTORY_RETENTION_DAYS,
+        legacy_path: Optional[Path] = LEGACY_HISTORY_FILE if MIGRATE_LEGACY_JSON else None,
+    ):
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._recent_cache: Dict[Tuple[str, int, str], List[Dict]] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(decisions)")}
+        if "asset" not in columns:
+            self._conn.execute(f"ALTER TABLE decisions ADD COLUMN asset TEXT NOT NULL DEFAULT '{DEFAULT_ASSET}'")
+        self._conn.executescript(_INDEXES)
+        if legacy_path is not None:
+            self._migrate_legacy(legacy_path)
+
+    def _migrate_legacy(self, legacy_path: Path) -> None:
+        with self._lock:
+            done = self._conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_migrated'").fetchone()
+        if done:
+            return
+
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            data = []
+        entries = [
+            entry for entry in (data if isinstance(data, list) else [])
+            if isinstance(entry, dict) and _valid_date(entry.get("date"))
+        ]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO decisions (date, recorded_at, entry) VALUES (?, ?, ?)",
+                [(entry["date"], time.time(), json.dumps(entry, ensure_ascii=False)) for entry in entries],
+            )
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('legacy_migrated', ?)",
+                (str(legacy_path),),
+            )
+        if entries:
+            print(f"📦 Migrated {len(entries)} decisions from {legacy_path.name} into {self.path.name}")
+
+    def append(self, entry: Dict, asset: str = DEFAULT_ASSET) -> None:
+        if not _valid_date(entry.get("date")):
+            raise ValueError(f"History entry needs a YYYY-MM-DD date, got {entry.get('date')!r}")
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO decisions (asset, date, recorded_at, entry) VALUES (?, ?, ?, ?)",
+                (asset, entry["date"], time.time(), json.dumps(entry, ensure_ascii=False)),
+            )
+            if self.retention_days is not None:
+                # Scoped to the asset so the (asset, date) index serves it.
+                self._conn.execute(
+                    "DELETE FROM decisions WHERE asset = ? AND date < ?", (asset, _days_ago(self.retention_days)),
+                )
+            # Keep cached windows current instead of dropping them, so the
+            # notification after a save still needs no query.
+            for (cached_asset, _, cutoff), cached in self._recent_cache.items():
+                if cached_asset == asset and entry["date"] >= cutoff:
+                    cached.append(dict(entry))
+                    if len(cached) > 1 and cached[-2]["date"] > entry["date"]:
+                        cached.sort(key=lambda item: item["date"])
+
+    def range(self, start: Optional[str] = None, end: Optional[str] = None, asset: str = DEFAULT_ASSET) -> List[Dict]:
+        """
+        One asset's decisions with start <= date <= end (inclusive ISO dates), oldest first.
+        """
+        query = "SELECT entry FROM decisions"
+        clauses, params = ["asset = ?"], [asset]
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(end)
+        query += " WHERE " + " AND ".join(clauses) + " ORDER BY date, id"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def recent(self, days: int, asset: str = DEFAULT_ASSET) -> List[Dict]:
+        """
+        One asset's decisions from the last `days` days. The result is cached
+        and kept current on append, so analysis and notification in one run
+        share a single read.
+        """
+        cutoff = _days_ago(days)
+        key = (asset, days, cutoff)
+        with self._lock:
+            cached = self._recent_cache.get(key)
+        if cached is None:
+            cached = self.range(start=cutoff, asset=asset)
+            with self._lock:
+                # A new day moves the cutoff; drop the window it replaces so a
+                # long-running daemon keeps one entry per (asset, days).
+                for stale in [other for other in self._recent_cache if other[:2] == key[:2]]:
+                    del self._recent_cache[stale]
+                self._recent_cache[key] = cached
+        return [dict(entry) for entry in cached]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[HistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+        return _store
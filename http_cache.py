@@ -0,0 +1,233 @@
+# http_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.models import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+CACHE_DIR = DATA_DIR / "http_cache"
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+
+# Seconds a stored response is served without contacting the upstream at all.
+# Matched on "host/path" by longest prefix; once stale, the entry is
+# revalidated with If-None-Match / If-Modified-Since.
+SOURCE_TTLS: Dict[str, int] = {
+    "api.coingecko.com": 60,
+    "www.coindesk.com/arc/outboundfeeds": 300,
+    "www.coindesk.com": 6 * 3600,
+    "www.reddit.com": 120,
+}
+DEFAULT_TTL = 0
+
+# RESPONSE_CACHES=off (set by replay.py) turns lookups into misses and stores
+# into no-ops, so every run reaches the upstream. The article and model
+# decision caches honour the same switch.
+RESPONSE_CACHES = os.getenv("RESPONSE_CACHES", "on").lower() != "off"
+
+_STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+
+def full_url(url: str, params: Optional[Dict] = None) -> str:
+    prepared = PreparedRequest()
+    prepared.prepare_url(url, params)
+    return prepared.url
+
+
+def ttl_for(url: str) -> int:
+    parts = urlsplit(url)
+    target = f"{parts.netloc}{parts.path}"
+    matches = [prefix for prefix in SOURCE_TTLS if target.startswith(prefix)]
+    if not matches:
+        return DEFAULT_TTL
+    return SOURCE_TTLS[max(matches, key=len)]
+
+
+class CacheEntry:
+    def __init__(self, key: str, meta: Dict, body_path: Path):
+        self.key = key
+        self.meta = meta
+        self.body_path = body_path
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.meta.get("stored_at", 0)
+
+    def is_fresh(self) -> bool:
+        return self.age < ttl_for(self.meta["url"])
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        stored = self.meta.get("headers", {})
+        if stored.get("ETag"):
+            headers["If-None-Match"] = stored["ETag"]
+        if stored.get("Last-Modified"):
+            headers["If-Modified-Since"] = stored["Last-Modified"]
+        return headers
+
+
+class HttpCache:
+    """
+    On-disk GET cache shared by the scrapers: per-source TTLs, conditional
+    revalidation, and LRU eviction once the cache exceeds `max_bytes`.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES, enabled: bool = RESPONSE_CACHES):
+        self.directory = directory
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self.stats = {"fresh_hits": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+    def _paths(self, key: str):
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        if not self.enabled:
+            return None
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if meta.get("url") != url or not body_path.exists():
+            return None
+        return CacheEntry(key, meta, body_path)
+
+    def to_response(self, entry: CacheEntry) -> Optional[requests.Response]:
+        """
+        Rebuild a requests.Response from disk so callers can't tell the difference.
+        Returns None if the body was evicted since lookup().
+        """
+        try:
+            body = entry.body_path.read_bytes()
+        except OSError:
+            return None
+        response = requests.Response()
+        response._content = body
+        response.status_code = entry.meta.get("status", 200)
+        response.headers = CaseInsensitiveDict(entry.meta.get("headers", {}))
+        response.encoding = entry.meta.get("encoding")
+        response.url = entry.meta["url"]
+        response.from_cache = True
+        try:
+            # Touch the body so eviction treats it as recently used.
+            os.utime(entry.body_path)
+        except OSError:
+            pass
+        return response
+
+    def hit(self, entry: CacheEntry) -> Optional[requests.Response]:
+        """
+        Serve a still-fresh entry without touching the network (None if its
+        body has gone).
+        """
+        response = self.to_response(entry)
+        if response is not None:
+            with self._lock:
+                self.stats["fresh_hits"] += 1
+        return response
+
+    def revalidated(self, entry: CacheEntry, not_modified: requests.Response) -> Optional[requests.Response]:
+        """
+        Handle a 304: keep the stored body, refresh validators and the TTL clock.
+        Returns None if the body was evicted meanwhile; the caller must refetch.
+        """
+        headers = entry.meta.setdefault("headers", {})
+        for name in ("ETag", "Last-Modified", "Cache-Control"):
+            if not_modified.headers.get(name):
+                headers[name] = not_modified.headers[name]
+        entry.meta["stored_at"] = time.time()
+        response = self.to_response(entry)
+        if response is None:
+            return None
+        meta_path, _ = self._paths(entry.key)
+        self._write_meta(meta_path, entry.meta)
+        with self._lock:
+            self.stats["revalidated"] += 1
+        return response
+
+    def store(self, url: str, response: requests.Response) -> None:
+        if not self.enabled or "no-store" in response.headers.get("Cache-Control", ""):
+            return
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        body = response.content
+        meta = {
+            "url": url,
+            "status": response.status_code,
+            "encoding": response.encoding,
+            "headers": {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers},
+            "stored_at": time.time(),
+            "size": len(body),
+        }
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            total = self._current_total()
+            previous_size = body_path.stat().st_size if body_path.exists() else 0
+            tmp_path = body_path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(body)
+            tmp_path.replace(body_path)
+            self._write_meta(meta_path, meta)
+            self.stats["stored"] += 1
+            self._total_bytes = total + len(body) - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    @staticmethod
+    def _write_meta(meta_path: Path, meta: Dict) -> None:
+        tmp_path = meta_path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        tmp_path.replace(meta_path)
+
+    def _current_total(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(path.stat().st_size for path in self.directory.glob("*.body"))
+        return self._total_bytes
+
+    def _evict(self) -> None:
+        """
+        Drop least-recently-used bodies until the cache is back under 90% of max.
+        """
+        bodies = sorted(self.directory.glob("*.body"), key=lambda path: path.stat().st_mtime)
+        target = int(self.max_bytes * 0.9)
+        total = self._total_bytes or 0
+        for body_path in bodies:
+            if total <= target:
+                break
+            size = body_path.stat().st_size
+            body_path.unlink(missing_ok=True)
+            body_path.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
+            self.stats["evicted"] += 1
+        self._total_bytes = total
+
+
+_cache: Optional[HttpCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+    return _cache
@@ -0,0 +1,353 @@
+# http_client.py
+
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import full_url, get_http_cache
+from metrics import get_metrics
+
+DEFAULT_TIMEOUT = 10  # seconds
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0  # seconds; attempt n sleeps uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**n))
+BACKOFF_CAP = 30.0
+MAX_RETRY_AFTER = 60.0  # a longer Retry-After fails the call instead of stalling the stage
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+POOL_MAXSIZE = 8  # keep-alive connections per host
+
+# Per-host token buckets as (requests per minute, burst). The public CoinGecko
+# API allows roughly 30/min; everything else just gets a politeness cap.
+COINGECKO_CALLS_PER_MINUTE = 25
+HOST_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "api.coingecko.com": (COINGECKO_CALLS_PER_MINUTE, 5),
+    "www.reddit.com": (30, 3),
+    "www.coindesk.com": (240, 8),
+}
+DEFAULT_RATE_LIMIT = (600, 10)
+
+# Consecutive failed attempts (network errors, 5xx) that open a host's
+# breaker, and how long it stays open before a single probe is let through.
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_AFTER = 60.0
+
+# Set (e.g. by replay.py) to send every GET through a local record/replay
+# proxy as <UPSTREAM_PROXY>/<host><path>. Hosts keep their own buckets,
+# breakers and metrics; UPSTREAM_RATE_LIMITS=off skips the buckets so a
+# replayed run goes at full speed.
+UPSTREAM_PROXY = os.getenv("UPSTREAM_PROXY", "").rstrip("/")
+UPSTREAM_RATE_LIMITS = os.getenv("UPSTREAM_RATE_LIMITS", "on").lower() != "off"
+
+METRIC_NAMES = ("requests", "cache_hits", "revalidated", "throttled", "throttle_wait", "retried", "short_circuited", "failed")
+
+
+def _proxied(url: str) -> str:
+    if not UPSTREAM_PROXY:
+        return url
+    parts = urlsplit(url)
+    return f"{UPSTREAM_PROXY}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without touching the network while a host's breaker is open."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Callers reserve a token and sleep until it is
+    due, so waiters are served in arrival order. pause() blocks the whole
+    host, e.g. for a Retry-After.
+    """
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping if necessary; returns the seconds waited.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            wait = max(wait, self.paused_until - now)
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failures; open -> half-open
+    after `reset_after` seconds, when one probe request decides whether it
+    closes again or reopens.
+    """
+
+    def __init__(self, threshold: int = BREAKER_FAILURE_THRESHOLD, reset_after: float = BREAKER_RESET_AFTER):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at < self.reset_after:
+                return "open"
+            return "half-open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_after or self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class HttpClient:
+    """
+    The one GET path for every scraper: shared keep-alive session, on-disk
+    HTTP cache, per-host rate limiting, jittered retries that honour
+    Retry-After, and a per-host circuit breaker.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._metrics: Dict[str, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(METRIC_NAMES, 0))
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(*HOST_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT))
+            return self._buckets[host]
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker()
+            return self._breakers[host]
+
+    def _count(self, host: str, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._metrics[host][name] += amount
+        get_metrics().incr(f"http_{name}", amount, host=host)
+
+    def get(
+        self,
+        url: str,
+        *,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        expect_json: bool = False,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        use_cache: bool = True,
+    ) -> requests.Response:
+        """
+        GET with caching, rate limiting, retries and circuit breaking.
+        Pass use_cache=False for polls that must always hit the network.
+        Raises RuntimeError (CircuitOpenError while the host is marked down).
+        """
+        host = urlsplit(url).netloc
+        with get_metrics().span("http_get", host=host):
+            return self._get(host, url, params, headers, expect_json, timeout, max_retries, use_cache)
+
+    def _get(
+        self,
+        host: str,
+        url: str,
+        params: Optional[Dict],
+        headers: Optional[Dict],
+        expect_json: bool,
+        timeout: float,
+        max_retries: int,
+        use_cache: bool,
+    ) -> requests.Response:
+        request_headers = dict(headers or {})
+        headers = dict(request_headers)
+        self._count(host, "requests")
+
+        cache = get_http_cache()
+        cache_url = full_url(url, params)
+        cached = cache.lookup(cache_url) if use_cache else None
+        if cached is not None and cached.is_fresh():
+            response = cache.hit(cached)
+            if response is not None:
+                self._count(host, "cache_hits")
+                return response
+            cached = None  # evicted since lookup(); fetch as a miss
+        if cached is not None:
+            headers.update(cached.conditional_headers())
+
+        breaker = self.breaker(host)
+        bucket = self._bucket(host)
+        request_url = _proxied(url)
+        last_error: Optional[Exception] = None
+        for attempt in range(1, max_retries + 1):
+            if not breaker.allow():
+                self._count(host, "short_circuited")
+                raise CircuitOpenError(f"Circuit open for {host}; skipping {url}") from last_error
+
+            waited = bucket.acquire() if UPSTREAM_RATE_LIMITS else 0
+            if waited > 0:
+                self._count(host, "throttled")
+                self._count(host, "throttle_wait", waited)
+
+            retry_after = None
+            try:
+                response = self.session.get(request_url, params=params, headers=headers, timeout=timeout)
+            except requests.RequestException as exc:
+                breaker.record_failure()
+                last_error = exc
+            else:
+                get_metrics().incr("http_bytes", len(response.content), host=host)
+                if response.status_code == 304 and cached is not None:
+                    breaker.record_success()
+                    revalidated = cache.revalidated(cached, response)
+                    if revalidated is not None:
+                        self._count(host, "revalidated")
+                        return revalidated
+                    # The stored body was evicted after lookup(): the 304 is
+                    # useless, so spend the next attempt asking unconditionally.
+                    cached = None
+                    headers = dict(request_headers)
+                    last_error = requests.HTTPError(f"Cached body for {url} was evicted before its 304")
+                    continue
+
+                if response.ok:
+                    breaker.record_success()
+                    try:
+                        if expect_json:
+                            # Touch response.json() so JSON decoding errors surface here.
+                            response.json()
+                    except ValueError as exc:
+                        last_error = exc
+                    else:
+                        if use_cache:
+                            cache.store(cache_url, response)
+                        return response
+                else:
+                    last_error = requests.HTTPError(f"Failed request {url}: {response.status_code}")
+                    if response.status_code == 429:
+                        # Throttling means the host is up; don't count it against the breaker.
+                        breaker.record_success()
+                    elif response.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    if response.status_code not in RETRY_STATUSES:
+                        break
+                    retry_after = _retry_after_seconds(response)
+
+            if attempt == max_retries:
+                break
+            if retry_after is not None:
+                if retry_after > MAX_RETRY_AFTER:
+                    last_error = requests.HTTPError(f"{host} asked to retry after {retry_after:.0f}s")
+                    break
+                # Everyone else heading to this host waits too.
+                bucket.pause(retry_after)
+                delay = retry_after
+            else:
+                delay = _backoff(attempt)
+            self._count(host, "retried")
+            time.sleep(delay)
+
+        self._count(host, "failed")
+        raise RuntimeError(f"Unable to fetch {url} after {attempt} attempt(s)") from last_error
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {host: dict(values) for host, values in self._metrics.items()}
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    def format_metrics(self) -> str:
+        lines = ["🌐 HTTP by host:"]
+        for host, values in sorted(self.metrics().items()):
+            lines.append(
+                f"  {host}: {values['requests']:.0f} req, {values['cache_hits']:.0f} cached, "
+                f"{values['revalidated']:.0f} revalidated, {values['throttled']:.0f} throttled "
+                f"({values['throttle_wait']:.1f}s), {values['retried']:.0f} retried, "
+                f"{values['short_circuited']:.0f} short-circuited, {values['failed']:.0f} failed "
+                f"[breaker {self.breaker(host).state}]"
+            )
+        return "\n".join(lines)
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
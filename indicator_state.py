@@ -0,0 +1,368 @@
+# indicator_state.py
+
+import json
+import math
+from bisect import bisect_left
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from indicators import TRADING_DAYS_PER_YEAR
+
+STATE_VERSION = 1
+RESYNC_EVERY = 1000  # pushes between exact re-summations to cancel float drift
+
+
+class IndicatorState:
+    """
+    Streaming counterpart of indicators.compute_indicators: every new close is
+    folded in with O(1) work and only the bounded windows are kept in memory,
+    so the cost per update does not depend on history length.
+    """
+
+    def __init__(
+        self,
+        ma_windows: Iterable[int] = (7, 30, 90),
+        change_periods: Iterable[int] = (7, 30, 90),
+        rsi_period: int = 14,
+        volatility_window: int = 30,
+        ema_spans: Iterable[int] = (12, 26),
+    ):
+        self.ma_windows = tuple(ma_windows)
+        self.change_periods = tuple(change_periods)
+        self.rsi_period = rsi_period
+        self.volatility_window = volatility_window
+        self.ema_spans = tuple(ema_spans)
+
+        history_needed = max(
+            max(self.ma_windows, default=1),
+            max(self.change_periods, default=0) + 1,
+            volatility_window + 1,
+            rsi_period + 1,
+        )
+        self.closes: deque = deque(maxlen=history_needed)
+        self.count = 0
+        self.last_date: Optional[str] = None
+        self.pushes_since_resync = 0
+
+        self.ma_sums: Dict[int, float] = {window: 0.0 for window in self.ma_windows}
+
+        # Simple RSI: trailing deltas with separate gain/loss sums and counts.
+        self.deltas: deque = deque(maxlen=rsi_period)
+        self.gain_sum = self.loss_sum = 0.0
+        self.gain_count = self.loss_count = 0
+
+        # Wilder RSI: seeded with the mean of the first `rsi_period` deltas.
+        self.wilder_gain: Optional[float] = None
+        self.wilder_loss: Optional[float] = None
+        self.wilder_seed_gain = self.wilder_seed_loss = 0.0
+        self.delta_count = 0
+
+        # EMAs: seeded with the SMA of the first `span` closes.
+        self.ema_values: Dict[int, Optional[float]] = {span: None for span in self.ema_spans}
+        self.ema_seed_sums: Dict[int, float] = {span: 0.0 for span in self.ema_spans}
+
+        # Volatility: windowed Welford over the trailing window - 1 returns.
+        self.returns: deque = deque(maxlen=max(1, volatility_window - 1))
+        self.return_count = 0
+        self.return_mean = 0.0
+        self.return_m2 = 0.0
+
+        self._previous: Optional[Dict] = None
+
+    # ------------------------------------------------------------------ updates
+
+    def _push(self, close: float) -> None:
+        closes = self.closes
+        previous = closes[-1] if closes else None
+
+        for window in self.ma_windows:
+            self.ma_sums[window] += close
+            if len(closes) >= window:
+                self.ma_sums[window] -= closes[-window]
+
+        for span in self.ema_spans:
+            current = self.ema_values[span]
+            if current is not None:
+                self.ema_values[span] = current + (2.0 / (span + 1)) * (close - current)
+            elif self.count < span:
+                self.ema_seed_sums[span] += close
+                if self.count + 1 == span:
+                    self.ema_values[span] = self.ema_seed_sums[span] / span
+
+        if previous is not None:
+            self._push_delta(close - previous)
+            self._push_return(None if previous == 0 else (close - previous) / previous)
+
+        closes.append(close)
+        self.count += 1
+        self.pushes_since_resync += 1
+        if self.pushes_since_resync >= RESYNC_EVERY:
+            self._resync()
+
+    def _push_delta(self, delta: float) -> None:
+        if len(self.deltas) == self.deltas.maxlen:
+            dropped = self.deltas[0]
+            if dropped > 0:
+                self.gain_sum -= dropped
+                self.gain_count -= 1
+            elif dropped < 0:
+                self.loss_sum += dropped
+                self.loss_count -= 1
+        self.deltas.append(delta)
+        if delta > 0:
+            self.gain_sum += delta
+            self.gain_count += 1
+        elif delta < 0:
+            self.loss_sum -= delta
+            self.loss_count += 1
+
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        period = self.rsi_period
+        self.delta_count += 1
+        if self.wilder_gain is None:
+            self.wilder_seed_gain += gain
+            self.wilder_seed_loss += loss
+            if self.delta_count == period:
+                self.wilder_gain = self.wilder_seed_gain / period
+                self.wilder_loss = self.wilder_seed_loss / period
+        else:
+            self.wilder_gain += (gain - self.wilder_gain) / period
+            self.wilder_loss += (loss - self.wilder_loss) / period
+
+    def _push_return(self, value: Optional[float]) -> None:
+        if len(self.returns) == self.returns.maxlen:
+            dropped = self.returns[0]
+            if dropped is not None:
+                self.return_count -= 1
+                if self.return_count == 0:
+                    self.return_mean = self.return_m2 = 0.0
+                else:
+                    delta = dropped - self.return_mean
+                    self.return_mean -= delta / self.return_count
+                    self.return_m2 -= delta * (dropped - self.return_mean)
+        self.returns.append(value)
+        if value is not None:
+            self.return_count += 1
+            delta = value - self.return_mean
+            self.return_mean += delta / self.return_count
+            self.return_m2 += delta * (value - self.return_mean)
+
+    def _resync(self) -> None:
+        """
+        Recompute the windowed sums exactly from the buffers (O(window)).
+        """
+        closes = list(self.closes)
+        for window in self.ma_windows:
+            self.ma_sums[window] = math.fsum(closes[-window:])
+        self.gain_sum = math.fsum(d for d in self.deltas if d > 0)
+        self.loss_sum = math.fsum(-d for d in self.deltas if d < 0)
+        valid = [r for r in self.returns if r is not None]
+        self.return_count = len(valid)
+        self.return_mean = math.fsum(valid) / len(valid) if valid else 0.0
+        self.return_m2 = math.fsum((r - self.return_mean) ** 2 for r in valid)
+        self.pushes_since_resync = 0
+
+    def advance(self, date: str, close: float) -> None:
+        """
+        Fold in the close for `date`. Re-sending the latest date replaces its
+        close (CoinGecko's latest daily point is a live intraday price).
+        """
+        close = float(close)
+        if self.last_date is not None and date < self.last_date:
+            raise ValueError(f"Cannot rewind indicator state from {self.last_date} to {date}")
+        if date == self.last_date:
+            if self.closes and self.closes[-1] == close:
+                return
+            if self._previous is None:
+                raise ValueError(f"No checkpoint to revise {date}")
+            self._restore(self._previous)
+        self._previous = self.to_dict(include_previous=False)
+        self._push(close)
+        self.last_date = date
+
+    def sync(self, series: Sequence[Tuple[str, float]]) -> int:
+        """
+        Bring the state up to date with a full (date, close) series, oldest first.
+        Only points after the stored date are folded in; if the buffered tail no
+        longer matches the series (healed gaps, revised closes), rebuild once.
+        Returns the number of points processed.
+        """
+        if not series:
+            return 0
+        if self.last_date is not None:
+            index = bisect_left(series, self.last_date, key=lambda item: item[0])
+            buffered = list(self.closes)[:-1]
+            start = index - len(buffered)
+            if (
+                index < len(series)
+                and series[index][0] == self.last_date
+                and start >= 0
+                and [close for _, close in series[start:index]] == buffered
+            ):
+                pending = series[index:]
+                self._fold(pending)
+                return len(pending)
+
+        self.reset()
+        self._fold(series)
+        return len(series)
+
+    def _fold(self, points: Sequence[Tuple[str, float]]) -> None:
+        # Only the final point needs a revision checkpoint.
+        for date, close in points[:-1]:
+            if date == self.last_date:
+                self.advance(date, close)
+                continue
+            if self.last_date is not None and date < self.last_date:
+                raise ValueError(f"Cannot rewind indicator state from {self.last_date} to {date}")
+            self._push(float(close))
+            self.last_date = date
+        date, close = points[-1]
+        self.advance(date, close)
+
+    def reset(self) -> None:
+        self._restore(IndicatorState(**self._config()).to_dict())
+
+    # ----------------------------------------------------------------- readouts
+
+    def values(self) -> Dict[str, Optional[float]]:
+        """
+        Latest indicator values, keyed like indicators.compute_indicators.
+        """
+        closes = self.closes
+        latest = closes[-1] if closes else None
+        result: Dict[str, Optional[float]] = {}
+
+        for days in self.change_periods:
+            value = None
+            if latest is not None and self.count > days:
+                past = closes[-(days + 1)]
+                value = None if past == 0 else (latest - past) / past * 100
+            result[f"change_{days}d_pct"] = value
+
+        for window in self.ma_windows:
+            result[f"ma_{window}"] = self.ma_sums[window] / window if self.count >= window else None
+
+        for span in self.ema_spans:
+            result[f"ema_{span}"] = self.ema_values[span]
+
+        result[f"rsi_{self.rsi_period}"] = self._simple_rsi()
+        result[f"rsi_{self.rsi_period}_wilder"] = self._wilder_rsi()
+
+        volatility = None
+        if self.count > self.volatility_window and self.return_count >= 2:
+            variance = max(self.return_m2 / self.return_count, 0.0)
+            volatility = math.sqrt(variance) * TRADING_DAYS_PER_YEAR ** 0.5
+        result[f"volatility_{self.volatility_window}d"] = volatility
+        return result
+
+    def _simple_rsi(self) -> Optional[float]:
+        if self.count <= self.rsi_period:
+            return None
+        if not self.gain_count and not self.loss_count:
+            return 50.0
+        average_gain = self.gain_sum / self.gain_count if self.gain_count else 0.0
+        average_loss = self.loss_sum / self.loss_count if self.loss_count else 0.0
+        if average_loss == 0:
+            return 100.0
+        if average_gain == 0:
+            return 0.0
+        return 100 - (100 / (1 + average_gain / average_loss))
+
+    def _wilder_rsi(self) -> Optional[float]:
+        if self.wilder_gain is None or self.wilder_loss is None:
+            return None
+        if self.wilder_gain == 0 and self.wilder_loss == 0:
+            return 50.0
+        if self.wilder_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + self.wilder_gain / self.wilder_loss))
+
+    # -------------------------------------------------------------- persistence
+
+    def _config(self) -> Dict:
+        return {
+            "ma_windows": list(self.ma_windows),
+            "change_periods": list(self.change_periods),
+            "rsi_period": self.rsi_period,
+            "volatility_window": self.volatility_window,
+            "ema_spans": list(self.ema_spans),
+        }
+
+    def to_dict(self, include_previous: bool = True) -> Dict:
+        data = {
+            "version": STATE_VERSION,
+            "config": self._config(),
+            "last_date": self.last_date,
+            "count": self.count,
+            "pushes_since_resync": self.pushes_since_resync,
+            "closes": list(self.closes),
+            "ma_sums": {str(k): v for k, v in self.ma_sums.items()},
+            "deltas": list(self.deltas),
+            "gain": [self.gain_sum, self.gain_count],
+            "loss": [self.loss_sum, self.loss_count],
+            "wilder": [self.wilder_gain, self.wilder_loss, self.wilder_seed_gain, self.wilder_seed_loss, self.delta_count],
+            "ema_values": {str(k): v for k, v in self.ema_values.items()},
+            "ema_seed_sums": {str(k): v for k, v in self.ema_seed_sums.items()},
+            "returns": list(self.returns),
+            "welford": [self.return_count, self.return_mean, self.return_m2],
+        }
+        if include_previous:
+            data["previous"] = self._previous
+        return data
+
+    def _restore(self, data: Dict) -> None:
+        self.last_date = data["last_date"]
+        self.count = data["count"]
+        self.pushes_since_resync = data["pushes_since_resync"]
+        self.closes = deque(data["closes"], maxlen=self.closes.maxlen)
+        self.ma_sums = {int(k): v for k, v in data["ma_sums"].items()}
+        self.deltas = deque(data["deltas"], maxlen=self.deltas.maxlen)
+        self.gain_sum, self.gain_count = data["gain"]
+        self.loss_sum, self.loss_count = data["loss"]
+        (
+            self.wilder_gain,
+            self.wilder_loss,
+            self.wilder_seed_gain,
+            self.wilder_seed_loss,
+            self.delta_count,
+        ) = data["wilder"]
+        self.ema_values = {int(k): v for k, v in data["ema_values"].items()}
+        self.ema_seed_sums = {int(k): v for k, v in data["ema_seed_sums"].items()}
+        self.returns = deque(data["returns"], maxlen=self.returns.maxlen)
+        self.return_count, self.return_mean, self.return_m2 = data["welford"]
+        self._previous = data.get("previous")
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IndicatorState":
+        state = cls(**data["config"])
+        state._restore(data)
+        return state
+
+    @classmethod
+    def load(cls, path: Path, **config) -> "IndicatorState":
+        """
+        Load persisted state, starting fresh if the file is missing, corrupt or
+        was written for a different indicator configuration.
+        """
+        fresh = cls(**config)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return fresh
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            return fresh
+        if data.get("config") != fresh._config():
+            return fresh
+        try:
+            return cls.from_dict(data)
+        except (KeyError, TypeError, ValueError):
+            return fresh
+
+    def save(self, path: Path) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        tmp_path.replace(path)
@@ -0,0 +1,292 @@
+# indicators.py
+
+from statistics import mean, pstdev
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+
+# All series functions take a 1-D array (one asset) or a 2-D array with one
+# asset per row, compute along the last axis, and return float arrays of the
+# same shape with NaN wherever the window does not have enough data.
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def _window_sums(values: np.ndarray, window: int):
+    """
+    Trailing-window sums and valid-point counts along the last axis.
+    NaNs count as missing rather than poisoning the running total.
+    """
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    sums = np.pad(np.cumsum(filled, axis=-1), pad)
+    counts = np.pad(np.cumsum(valid, axis=-1), pad)
+    window_sums = sums[..., window:] - sums[..., :-window]
+    window_counts = counts[..., window:] - counts[..., :-window]
+    return window_sums, window_counts
+
+
+def _left_pad(values: np.ndarray, length: int) -> np.ndarray:
+    pad = [(0, 0)] * (values.ndim - 1) + [(length - values.shape[-1], 0)]
+    return np.pad(values.astype(float), pad, constant_values=np.nan)
+
+
+def sma(values, window: int) -> np.ndarray:
+    """
+    Simple moving average over `window` closes.
+    """
+    values = _as_array(values)
+    if window <= 0 or values.shape[-1] < window:
+        return np.full(values.shape, np.nan)
+    sums, counts = _window_sums(values, window)
+    averages = np.where(counts == window, sums / window, np.nan)
+    return _left_pad(averages, values.shape[-1])
+
+
+def pct_change(values, periods: int) -> np.ndarray:
+    """
+    Percentage change versus the close `periods` steps earlier.
+    """
+    values = _as_array(values)
+    result = np.full(values.shape, np.nan)
+    if periods <= 0 or values.shape[-1] <= periods:
+        return result
+    previous = values[..., :-periods]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (values[..., periods:] - previous) / previous * 100
+    result[..., periods:] = np.where(previous == 0, np.nan, change)
+    return result
+
+
+def _deltas(values: np.ndarray) -> np.ndarray:
+    deltas = np.full(values.shape, np.nan)
+    deltas[..., 1:] = np.diff(values, axis=-1)
+    return deltas
+
+
+def rsi(values, period: int = 14) -> np.ndarray:
+    """
+    RSI over the trailing `period` deltas, where the average gain (loss) is the
+    mean of the positive (negative) deltas only. This is the definition the
+    analysis has always reported, so the latest point matches historic output.
+    """
+    values = _as_array(values)
+    result = np.full(values.shape, np.nan)
+    if period <= 0 or values.shape[-1] <= period:
+        return result
+
+    deltas = _deltas(values)[..., 1:]
+    gains = np.where(deltas > 0, deltas, np.where(np.isnan(deltas), np.nan, 0.0))
+    losses = np.where(deltas < 0, -deltas, np.where(np.isnan(deltas), np.nan, 0.0))
+    gain_sums, valid = _window_sums(gains, period)
+    loss_sums, _ = _window_sums(losses, period)
+    gain_counts, _ = _window_sums(np.where(np.isnan(deltas), np.nan, deltas > 0), period)
+    loss_counts, _ = _window_sums(np.where(np.isnan(deltas), np.nan, deltas < 0), period)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        average_gain = np.where(gain_counts > 0, gain_sums / gain_counts, 0.0)
+        average_loss = np.where(loss_counts > 0, loss_sums / loss_counts, 0.0)
+        strength = 100 - 100 / (1 + average_gain / average_loss)
+
+    window_rsi = np.select(
+        [
+            (gain_counts == 0) & (loss_counts == 0),
+            average_loss == 0,
+            average_gain == 0,
+        ],
+        [50.0, 100.0, 0.0],
+        default=strength,
+    )
+    result[..., period:] = np.where(valid == period, window_rsi, np.nan)
+    return result
+
+
+def _recursive_smooth(values: np.ndarray, alpha: float, seed_window: int) -> np.ndarray:
+    """
+    out[t] = out[t-1] + alpha * (x[t] - out[t-1]), seeded with the simple mean
+    of the first `seed_window` valid points of each row.
+    """
+    rows = np.atleast_2d(values)
+    out = np.full(rows.shape, np.nan)
+    for row_index, row in enumerate(rows):
+        valid_positions = np.flatnonzero(~np.isnan(row))
+        if valid_positions.size < seed_window:
+            continue
+        first = valid_positions[0]
+        seed_end = first + seed_window
+        if np.isnan(row[first:seed_end]).any():
+            continue
+        current = row[first:seed_end].mean()
+        out[row_index, seed_end - 1] = current
+        for t in range(seed_end, row.shape[0]):
+            x = row[t]
+            if not np.isnan(x):
+                current += alpha * (x - current)
+            out[row_index, t] = current
+    return out.reshape(values.shape)
+
+
+def ema(values, span: int) -> np.ndarray:
+    """
+    Exponential moving average with alpha = 2 / (span + 1), SMA-seeded.
+    """
+    values = _as_array(values)
+    if span <= 0:
+        return np.full(values.shape, np.nan)
+    return _recursive_smooth(values, 2.0 / (span + 1), span)
+
+
+def wilder_rsi(values, period: int = 14) -> np.ndarray:
+    """
+    Classic Wilder-smoothed RSI (alpha = 1 / period).
+    """
+    values = _as_array(values)
+    result = np.full(values.shape, np.nan)
+    if period <= 0 or values.shape[-1] <= period:
+        return result
+
+    deltas = _deltas(values)[..., 1:]
+    gains = np.where(np.isnan(deltas), np.nan, np.clip(deltas, 0, None))
+    losses = np.where(np.isnan(deltas), np.nan, np.clip(-deltas, 0, None))
+    average_gain = _recursive_smooth(gains, 1.0 / period, period)
+    average_loss = _recursive_smooth(losses, 1.0 / period, period)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        strength = 100 - 100 / (1 + average_gain / average_loss)
+    smoothed = np.select(
+        [
+            (average_gain == 0) & (average_loss == 0),
+            average_loss == 0,
+        ],
+        [50.0, 100.0],
+        default=strength,
+    )
+    result[..., 1:] = np.where(np.isnan(average_gain), np.nan, smoothed)
+    return result
+
+
+def volatility(values, window: int = 30, periods_per_year: int = TRADING_DAYS_PER_YEAR) -> np.ndarray:
+    """
+    Annualized population standard deviation of the simple returns inside the
+    trailing `window` closes (window - 1 returns). Returns off a zero close are
+    skipped; fewer than two usable returns yields NaN.
+    """
+    values = _as_array(values)
+    result = np.full(values.shape, np.nan)
+    returns_per_window = window - 1
+    if returns_per_window < 1 or values.shape[-1] <= window:
+        return result
+
+    previous = values[..., :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(values, axis=-1) / previous
+    returns = np.where(previous == 0, np.nan, returns)
+
+    sums, counts = _window_sums(returns, returns_per_window)
+    squares, _ = _window_sums(returns ** 2, returns_per_window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = np.maximum(squares / counts - (sums / counts) ** 2, 0.0)
+    annualized = np.where(counts >= 2, np.sqrt(variance) * periods_per_year ** 0.5, np.nan)
+
+    # annualized[..., k] covers returns k..k+window-2, i.e. closes ending at k+window-1.
+    result[..., window - 1:] = annualized
+    # Historic behaviour requires strictly more than `window` closes.
+    result[..., window - 1] = np.nan
+    return result
+
+
+# Exact final-window values. The cumsum series above can differ from
+# statistics.mean/pstdev in the last bit, enough to flip a 2-dp rounding of
+# the reported point, so compute_indicators recomputes that one point the way
+# the original list-based analysis did.
+
+
+def _last_sma(row: np.ndarray, window: int) -> float:
+    return mean(row[-window:].tolist())
+
+
+def _last_rsi(row: np.ndarray, period: int) -> float:
+    recent = row[-(period + 1):].tolist()
+    deltas = [recent[i] - recent[i - 1] for i in range(1, len(recent))]
+    gains = [delta for delta in deltas if delta > 0]
+    losses = [-delta for delta in deltas if delta < 0]
+    if not gains and not losses:
+        return 50.0
+    average_gain = mean(gains) if gains else 0.0
+    average_loss = mean(losses) if losses else 0.0
+    if average_loss == 0:
+        return 100.0
+    if average_gain == 0:
+        return 0.0
+    return 100 - 100 / (1 + average_gain / average_loss)
+
+
+def _last_volatility(row: np.ndarray, window: int, periods_per_year: int = TRADING_DAYS_PER_YEAR) -> float:
+    recent = row[-window:].tolist()
+    returns = [
+        (recent[i] - recent[i - 1]) / recent[i - 1]
+        for i in range(1, len(recent))
+        if recent[i - 1] != 0
+    ]
+    return pstdev(returns) * periods_per_year ** 0.5
+
+
+def _refine_last(series: np.ndarray, closes: np.ndarray, exact: Callable[[np.ndarray], float]) -> None:
+    """
+    Replace each row's final point, where the series has one, with `exact(row)`.
+    """
+    rows, closes_rows = np.atleast_2d(series), np.atleast_2d(closes)
+    for row_index in np.flatnonzero(~np.isnan(rows[:, -1])):
+        rows[row_index, -1] = exact(closes_rows[row_index])
+
+
+def compute_indicators(
+    closes,
+    ma_windows: Iterable[int] = (7, 30, 90),
+    change_periods: Iterable[int] = (7, 30, 90),
+    rsi_period: int = 14,
+    volatility_window: int = 30,
+    ema_spans: Iterable[int] = (12, 26),
+    exact_latest: bool = True,
+) -> Dict[str, np.ndarray]:
+    """
+    Compute every indicator series in one batch over the whole close array.
+    With `exact_latest`, the final SMA, RSI and volatility points are
+    bit-identical to statistics.mean/pstdev over their window; the rest of
+    each series is the vectorized float result.
+    """
+    closes = _as_array(closes)
+    ma_windows = tuple(ma_windows)
+    series: Dict[str, np.ndarray] = {}
+    for days in change_periods:
+        series[f"change_{days}d_pct"] = pct_change(closes, days)
+    for window in ma_windows:
+        series[f"ma_{window}"] = sma(closes, window)
+    for span in ema_spans:
+        series[f"ema_{span}"] = ema(closes, span)
+    series[f"rsi_{rsi_period}"] = rsi(closes, rsi_period)
+    series[f"rsi_{rsi_period}_wilder"] = wilder_rsi(closes, rsi_period)
+    series[f"volatility_{volatility_window}d"] = volatility(closes, volatility_window)
+    if exact_latest and closes.shape[-1]:
+        for window in ma_windows:
+            _refine_last(series[f"ma_{window}"], closes, lambda row: _last_sma(row, window))
+        _refine_last(series[f"rsi_{rsi_period}"], closes, lambda row: _last_rsi(row, rsi_period))
+        _refine_last(
+            series[f"volatility_{volatility_window}d"], closes, lambda row: _last_volatility(row, volatility_window),
+        )
+    return series
+
+
+def latest(series: np.ndarray) -> Optional[float]:
+    """
+    Last value of a 1-D indicator series as a plain float, or None if missing.
+    """
+    if series.size == 0:
+        return None
+    value = float(series[-1])
+    return None if np.isnan(value) else value
@@ -0,0 +1,314 @@
+# intraday.py
+
+import asyncio
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from assets import asset_symbol
+
+POLL_SECONDS = 60  # one batched /simple/price call per poll covers every asset
+RING_CAPACITY = 24 * 60  # samples kept per asset: a day of minute polls
+RSI_PERIOD = 14  # in samples, not days
+ALERT_COOLDOWN = 30 * 60  # seconds before the same rule may fire again for an asset
+OFF_CYCLE_COOLDOWN = 2 * 3600  # minimum gap between triggered full analyses
+SEED_FROM_MARKET_CHART = True  # prefill the ring with CoinGecko's 24h 5-minute series
+
+
+class PriceRing:
+    """
+    Fixed-capacity ring of (timestamp, price) samples in two preallocated
+    double arrays. Memory never grows after construction; the oldest sample is
+    overwritten once the ring is full.
+    """
+
+    def __init__(self, capacity: int = RING_CAPACITY):
+        self.capacity = capacity
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.prices = array("d", bytes(8 * capacity))
+        self.start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _slot(self, index: int) -> int:
+        return (self.start + index) % self.capacity
+
+    def append(self, ts: float, price: float) -> None:
+        if self.size < self.capacity:
+            slot = self._slot(self.size)
+            self.size += 1
+        else:
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.timestamps[slot] = ts
+        self.prices[slot] = price
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        if not self.size:
+            return None
+        slot = self._slot(self.size - 1)
+        return self.timestamps[slot], self.prices[slot]
+
+    def at_or_before(self, ts: float) -> Optional[Tuple[float, float]]:
+        """
+        Newest sample taken at or before `ts` (binary search, O(log n)).
+        """
+        low, high = 0, self.size
+        while low < high:
+            mid = (low + high) // 2
+            if self.timestamps[self._slot(mid)] <= ts:
+                low = mid + 1
+            else:
+                high = mid
+        if low == 0:
+            return None
+        slot = self._slot(low - 1)
+        return self.timestamps[slot], self.prices[slot]
+
+
+class IntradayIndicators:
+    """
+    Wilder RSI over sample-to-sample deltas, updated in O(1) per price and
+    seeded with the mean of the first `period` deltas, as in IndicatorState.
+    """
+
+    def __init__(self, period: int = RSI_PERIOD):
+        self.period = period
+        self.last_price: Optional[float] = None
+        self.delta_count = 0
+        self.seed_gain = self.seed_loss = 0.0
+        self.avg_gain: Optional[float] = None
+        self.avg_loss: Optional[float] = None
+        self.rsi: Optional[float] = None
+        self.previous_rsi: Optional[float] = None
+
+    def update(self, price: float) -> None:
+        previous, self.last_price = self.last_price, price
+        if previous is None:
+            return
+        delta = price - previous
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        self.delta_count += 1
+        if self.avg_gain is None:
+            self.seed_gain += gain
+            self.seed_loss += loss
+            if self.delta_count < self.period:
+                return
+            self.avg_gain = self.seed_gain / self.period
+            self.avg_loss = self.seed_loss / self.period
+        else:
+            self.avg_gain += (gain - self.avg_gain) / self.period
+            self.avg_loss += (loss - self.avg_loss) / self.period
+
+        self.previous_rsi = self.rsi
+        if self.avg_loss == 0:
+            self.rsi = 100.0 if self.avg_gain > 0 else 50.0
+        else:
+            self.rsi = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+
+@dataclass
+class AssetTrack:
+    ring: PriceRing
+    indicators: IntradayIndicators
+
+
+@dataclass(frozen=True)
+class MoveRule:
+    """
+    Fires when the price moved by `threshold_pct` (negative for drops) versus
+    the last sample at least `window_seconds` old.
+    """
+
+    name: str
+    window_seconds: float
+    threshold_pct: float
+    action: str = "alert"  # "alert" or "analyze"
+
+    def check(self, track: AssetTrack) -> Optional[str]:
+        latest = track.ring.latest()
+        if latest is None:
+            return None
+        reference = track.ring.at_or_before(latest[0] - self.window_seconds)
+        if reference is None or not reference[1]:
+            return None
+        change_pct = (latest[1] / reference[1] - 1) * 100
+        if self.threshold_pct < 0 and change_pct > self.threshold_pct:
+            return None
+        if self.threshold_pct >= 0 and change_pct < self.threshold_pct:
+            return None
+        return f"{change_pct:+.2f}% in {self.window_seconds / 60:g} min (now ${latest[1]:,.2f})"
+
+
+@dataclass(frozen=True)
+class RsiCrossRule:
+    """
+    Fires on the sample where RSI crosses `level` in `direction` ("above"/"below").
+    """
+
+    name: str
+    level: float
+    direction: str
+    action: str = "alert"
+
+    def check(self, track: AssetTrack) -> Optional[str]:
+        current, previous = track.indicators.rsi, track.indicators.previous_rsi
+        if current is None or previous is None:
+            return None
+        if self.direction == "above" and not (previous <= self.level < current):
+            return None
+        if self.direction == "below" and not (previous >= self.level > current):
+            return None
+        return f"RSI({track.indicators.period}) crossed {self.direction} {self.level:g} ({previous:.1f} → {current:.1f})"
+
+
+DEFAULT_RULES = (
+    MoveRule("crash_1h", 3600, -5.0, action="analyze"),
+    MoveRule("surge_1h", 3600, 5.0, action="analyze"),
+    MoveRule("drop_15m", 900, -2.5),
+    MoveRule("jump_15m", 900, 2.5),
+    RsiCrossRule("rsi_overbought", 70, "above"),
+    RsiCrossRule("rsi_oversold", 30, "below"),
+)
+
+
+@dataclass
+class Trigger:
+    asset: str
+    rule: str
+    action: str
+    detail: str
+    at: float
+
+    @property
+    def message(self) -> str:
+        stamp = datetime.utcfromtimestamp(self.at).strftime("%H:%M")
+        suffix = " Running an off-cycle analysis." if self.action == "analyze" else ""
+        return f"🚨 {asset_symbol(self.asset)} {self.detail} [{self.rule}, {stamp} UTC].{suffix}"
+
+
+class IntradayMonitor:
+    """
+    Polls live prices into per-asset rings and evaluates deterministic rules
+    on every sample. There is no LLM call on this path; "analyze" triggers are
+    handed back to the caller (the daemon), which runs the full pipeline.
+    Per-sample work is O(rules * log capacity) and memory is fixed, so it can
+    run for days.
+    """
+
+    def __init__(
+        self,
+        coin_ids: Sequence[str],
+        rules: Sequence = DEFAULT_RULES,
+        capacity: int = RING_CAPACITY,
+        poll_seconds: float = POLL_SECONDS,
+    ):
+        self.coin_ids = tuple(coin_ids)
+        self.rules = tuple(rules)
+        self.poll_seconds = poll_seconds
+        self.tracks: Dict[str, AssetTrack] = {
+            coin_id: AssetTrack(PriceRing(capacity), IntradayIndicators()) for coin_id in self.coin_ids
+        }
+        self._last_fired: Dict[Tuple[str, str], float] = {}
+        self._last_off_cycle = float("-inf")
+
+    def seed(self) -> None:
+        from trend_scraper import get_intraday_prices
+
+        for coin_id in self.coin_ids:
+            try:
+                points = get_intraday_prices(coin_id)
+            except (RuntimeError, ValueError) as exc:
+                print(f"⚠️ Could not seed intraday prices for {coin_id}: {exc}")
+                continue
+            for ts, price in points:
+                self.ingest(coin_id, ts, price, evaluate=False)
+            print(f"📡 Seeded {len(self.tracks[coin_id].ring)} intraday sample(s) for {coin_id}.")
+
+    def ingest(self, coin_id: str, ts: float, price: float, evaluate: bool = True) -> List[Trigger]:
+        track = self.tracks[coin_id]
+        latest = track.ring.latest()
+        if latest is not None and ts <= latest[0]:
+            return []  # duplicate or out-of-order quote
+        track.ring.append(ts, price)
+        track.indicators.update(price)
+        if not evaluate:
+            return []
+
+        triggers = []
+        for rule in self.rules:
+            key = (coin_id, rule.name)
+            if ts - self._last_fired.get(key, float("-inf")) < ALERT_COOLDOWN:
+                continue
+            detail = rule.check(track)
+            if detail is None:
+                continue
+            self._last_fired[key] = ts
+            action = rule.action
+            if action == "analyze":
+                if ts - self._last_off_cycle < OFF_CYCLE_COOLDOWN:
+                    action = "alert"
+                else:
+                    self._last_off_cycle = ts
+            triggers.append(Trigger(coin_id, rule.name, action, detail, ts))
+        return triggers
+
+    def poll(self) -> List[Trigger]:
+        from trend_scraper import get_latest_prices
+
+        try:
+            prices = get_latest_prices(self.coin_ids, use_cache=False)
+        except (RuntimeError, ValueError) as exc:
+            print(f"⚠️ Intraday poll failed: {exc}")
+            return []
+        now = time.time()
+        triggers = []
+        for coin_id, price in prices.items():
+            triggers.extend(self.ingest(coin_id, now, price))
+        return triggers
+
+    async def run(self, stop: asyncio.Event, on_trigger: Callable[[Trigger], Awaitable[None]]) -> None:
+        if SEED_FROM_MARKET_CHART:
+            await asyncio.to_thread(self.seed)
+        print(f"📡 Intraday monitor polling every {self.poll_seconds:g}s for {', '.join(self.coin_ids)}")
+        while not stop.is_set():
+            started = time.monotonic()
+            for trigger in await asyncio.to_thread(self.poll):
+                print(trigger.message)
+                try:
+                    await on_trigger(trigger)
+                except Exception as exc:
+                    print(f"⚠️ Intraday trigger handling failed: {exc}")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=max(0.0, self.poll_seconds - (time.monotonic() - started)))
+            except asyncio.TimeoutError:
+                pass
+
+
+async def _alert_only(trigger: Trigger) -> None:
+    import notifier
+
+    await notifier.send_alert(trigger.message)
+
+
+if __name__ == "__main__":
+    from assets import coin_ids
+
+    # Standalone: alerts only. Use `main.py --intraday` to also run off-cycle analyses.
+    async def _main() -> None:
+        stop = asyncio.Event()
+        try:
+            await IntradayMonitor(coin_ids()).run(stop, _alert_only)
+        finally:
+            import notifier
+
+            await notifier.close()
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,164 @@
+# llm_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+LLM_CACHE_FILE = DATA_DIR / "llm_cache.json"
+
+LLM_CACHE_TTL = 6 * 3600  # seconds a stored decision may be reused
+LLM_CACHE_MAX_ENTRIES = 50
+
+# Optional "material change" threshold in percent. When set, a decision is also
+# reused if the headlines match and every metric below moved less than this
+# much since it was made. None disables the near-match path.
+MATERIAL_CHANGE_PCT: Optional[float] = None
+MATERIAL_METRICS = ("latest_price", "ma_7", "ma_30", "ma_90", "rsi_14", "volatility_30d")
+
+# Off (RESPONSE_CACHES=off, set by replay.py) means every decision goes to the model.
+RESPONSE_CACHES = os.getenv("RESPONSE_CACHES", "on").lower() != "off"
+
+
+def _digest(value) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _headline_fingerprint(payload: Dict) -> List[str]:
+    """
+    Titles only: upvote/comment counts and our own recent recommendations
+    change every run without changing what the model is being asked.
+    """
+    titles = [item.get("title", "") for item in payload.get("macro_highlights", [])]
+    titles += [item.get("title", "") for item in payload.get("reddit_highlights", [])]
+    return sorted(title.strip().lower() for title in titles if title)
+
+
+def _price_fingerprint(payload: Dict) -> Dict:
+    metrics = dict(payload.get("price_metrics", {}))
+    metrics.pop("recent_prices", None)
+    return metrics
+
+
+def payload_keys(payload: Dict) -> Tuple[str, str]:
+    """
+    (exact key, headline key) for a structured payload.
+    """
+    headlines = _headline_fingerprint(payload)
+    headline_key = _digest(headlines)
+    exact = {"asset": payload.get("asset"), "prices": _price_fingerprint(payload), "headlines": headline_key}
+    return _digest(exact), headline_key
+
+
+def _within_threshold(previous: Dict, current: Dict, threshold_pct: float) -> bool:
+    for name in MATERIAL_METRICS:
+        old, new = previous.get(name), current.get(name)
+        if old is None and new is None:
+            continue
+        if old is None or new is None:
+            return False
+        if old == 0:
+            if new != 0:
+                return False
+            continue
+        if abs(new - old) / abs(old) * 100 >= threshold_pct:
+            return False
+    return True
+
+
+class LLMResultCache:
+    """
+    Persistent memo of model decisions keyed on a normalized payload hash.
+    """
+
+    def __init__(
+        self,
+        path: Path = LLM_CACHE_FILE,
+        ttl: float = LLM_CACHE_TTL,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        material_change_pct: Optional[float] = MATERIAL_CHANGE_PCT,
+        enabled: bool = RESPONSE_CACHES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.material_change_pct = material_change_pct
+        self.enabled = enabled
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(data, dict):
+            self.entries = {key: entry for key, entry in data.items() if isinstance(entry, dict)}
+
+    def _live(self, now: float) -> List[Tuple[str, Dict]]:
+        return [
+            (key, entry)
+            for key, entry in self.entries.items()
+            if now - entry.get("created_at", 0) < self.ttl
+        ]
+
+    def get(self, payload: Dict) -> Optional[Tuple[str, str]]:
+        """
+        Return (result_text, "exact" | "near") for a reusable decision, or None.
+        """
+        if not self.enabled:
+            return None
+        exact_key, headline_key = payload_keys(payload)
+        now = time.time()
+        with self._lock:
+            live = self._live(now)
+            for key, entry in live:
+                if key == exact_key:
+                    return entry["result"], "exact"
+
+            if self.material_change_pct is None:
+                return None
+            current = _price_fingerprint(payload)
+            candidates = sorted(
+                (
+                    entry for _, entry in live
+                    if entry.get("headline_key") == headline_key and entry.get("asset") == payload.get("asset")
+                ),
+                key=lambda entry: entry.get("created_at", 0),
+                reverse=True,
+            )
+            for entry in candidates:
+                if _within_threshold(entry.get("metrics", {}), current, self.material_change_pct):
+                    return entry["result"], "near"
+        return None
+
+    def put(self, payload: Dict, result_text: str) -> None:
+        if not self.enabled:
+            return
+        exact_key, headline_key = payload_keys(payload)
+        now = time.time()
+        with self._lock:
+            self.entries[exact_key] = {
+                "asset": payload.get("asset"),
+                "created_at": now,
+                "headline_key": headline_key,
+                "metrics": _price_fingerprint(payload),
+                "result": result_text,
+            }
+            live = sorted(self._live(now), key=lambda item: item[1]["created_at"], reverse=True)
+            self.entries = dict(live[: self.max_entries])
+
+            # Written under the lock: concurrent asset analyses share one tmp path.
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            tmp_path.replace(self.path)
@@ -0,0 +1,213 @@
+# llm_hedge.py
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from llm_stream import CallStats, CancelToken
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+LATENCY_FILE = DATA_DIR / "model_latency.json"
+
+# Upper bounds (seconds) of the latency histogram buckets; the last one catches everything.
+LATENCY_BUCKETS = (0.5, 1, 1.5, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30, 45, 60, 90, 120, float("inf"))
+HISTOGRAM_DECAY = 0.98  # weight kept by older samples on each new one, so the p95 follows drift
+
+HEDGE_QUANTILE = 0.95
+MIN_HEDGE_SAMPLES = 5  # below this the default delay is used
+DEFAULT_HEDGE_DELAY = 8.0
+MIN_HEDGE_DELAY = 1.0
+MAX_HEDGE_DELAY = 30.0
+
+ModelPath = Callable[[CancelToken], Tuple[str, CallStats]]
+
+
+class LatencyHistograms:
+    """
+    Decayed per-path histograms of successful call latency, persisted as JSON.
+    """
+
+    def __init__(self, path: Path = LATENCY_FILE):
+        self.path = path
+        self.counts: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        for name, counts in (data.get("paths") or {}).items():
+            if isinstance(counts, list) and len(counts) == len(LATENCY_BUCKETS):
+                self.counts[name] = [float(count) for count in counts]
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            counts = self.counts.setdefault(name, [0.0] * len(LATENCY_BUCKETS))
+            for index in range(len(counts)):
+                counts[index] *= HISTOGRAM_DECAY
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    counts[index] += 1.0
+                    break
+
+    def samples(self, name: str) -> float:
+        return sum(self.counts.get(name, ()))
+
+    def quantile(self, name: str, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-quantile, or None without data.
+        """
+        counts = self.counts.get(name)
+        total = sum(counts) if counts else 0.0
+        if not total:
+            return None
+        running = 0.0
+        for bound, count in zip(LATENCY_BUCKETS, counts):
+            running += count
+            if running >= q * total:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+    def hedge_delay(self, name: str) -> float:
+        if self.samples(name) < MIN_HEDGE_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        p95 = self.quantile(name, HEDGE_QUANTILE)
+        return min(max(p95, MIN_HEDGE_DELAY), MAX_HEDGE_DELAY)
+
+    def save(self) -> None:
+        # Written under the lock: concurrent asset analyses share one tmp path.
+        with self._lock:
+            snapshot = {
+                "buckets": [bound if bound != float("inf") else None for bound in LATENCY_BUCKETS],
+                "paths": {name: [round(count, 4) for count in counts] for name, counts in self.counts.items()},
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            tmp_path.replace(self.path)
+
+
+_histograms: Optional[LatencyHistograms] = None
+_histograms_lock = threading.Lock()
+
+
+def get_latency_histograms() -> LatencyHistograms:
+    global _histograms
+    with _histograms_lock:
+        if _histograms is None:
+            _histograms = LatencyHistograms()
+        return _histograms
+
+
+def _record_losers(
+    histograms: LatencyHistograms,
+    outcomes: "queue.Queue",
+    started: Dict[str, float],
+    finished: set,
+) -> None:
+    """
+    Record latency for the paths that lost the race. Outcomes already queued
+    count with their real latency; paths still in flight get a censored sample
+    of their elapsed time (a lower bound on what they would have taken).
+    """
+    while True:
+        try:
+            name, outcome, _error = outcomes.get_nowait()
+        except queue.Empty:
+            break
+        finished.add(name)
+        latency = outcome[1].total_latency if outcome is not None else None
+        if latency is not None:
+            histograms.record(name, latency)
+    now = time.monotonic()
+    for name, started_at in started.items():
+        if name not in finished:
+            histograms.record(name, now - started_at)
+
+
+def hedged_call(
+    primary: Tuple[str, ModelPath],
+    secondary: Tuple[str, ModelPath],
+    histograms: LatencyHistograms,
+    delay: Optional[float] = None,
+) -> Tuple[str, str]:
+    """
+    Run the primary path; if it has not produced valid JSON after `delay`
+    seconds (default: the primary's p95), or fails sooner, start the secondary
+    too. The first valid JSON wins and the other stream is cancelled.
+    Returns (result_text, winning path name).
+
+    A loser that already finished contributes its real latency; one that is
+    still running is recorded as censored at its elapsed time, so a slow
+    primary keeps pulling its p95 (and the hedge delay) up.
+    """
+    delay = histograms.hedge_delay(primary[0]) if delay is None else delay
+    tokens = {primary[0]: CancelToken(), secondary[0]: CancelToken()}
+    outcomes: "queue.Queue[Tuple[str, Optional[Tuple[str, CallStats]], Optional[Exception]]]" = queue.Queue()
+    started: Dict[str, float] = {}
+    finished: set = set()
+
+    def run(name: str, call: ModelPath) -> None:
+        try:
+            outcomes.put((name, call(tokens[name]), None))
+        except Exception as exc:
+            outcomes.put((name, None, exc))
+
+    def start(path: Tuple[str, ModelPath]) -> None:
+        # Daemon threads rather than an executor: a loser stuck before response
+        # headers cannot be closed, and must not hold up interpreter exit.
+        started[path[0]] = time.monotonic()
+        threading.Thread(target=run, args=path, name=f"model-{path[0]}", daemon=True).start()
+
+    start(primary)
+    hedge_deadline = time.monotonic() + delay
+    running, hedged = 1, False
+    errors: Dict[str, Exception] = {}
+    try:
+        while True:
+            timeout = None if hedged else max(0.0, hedge_deadline - time.monotonic())
+            try:
+                name, outcome, error = outcomes.get(timeout=timeout)
+            except queue.Empty:
+                print(f"🪝 {primary[0]} still running after {delay:.1f}s hedge delay; starting {secondary[0]}")
+                start(secondary)
+                running, hedged = running + 1, True
+                continue
+
+            running -= 1
+            finished.add(name)
+            if outcome is not None:
+                result_text, stats = outcome
+                try:
+                    json.loads(result_text)
+                except json.JSONDecodeError as exc:
+                    error = exc
+                else:
+                    histograms.record(name, stats.total_latency)
+                    _record_losers(histograms, outcomes, started, finished)
+                    for other, token in tokens.items():
+                        if other != name:
+                            token.cancel()
+                    return result_text, name
+
+            errors[name] = error
+            print(f"⚠️ {name} model call failed: {error}")
+            if not hedged:
+                print(f"🪝 {primary[0]} failed before the hedge delay; starting {secondary[0]}")
+                start(secondary)
+                running, hedged = running + 1, True
+            elif not running:
+                raise RuntimeError(
+                    "Model call failed for both Responses and Chat APIs"
+                ) from errors.get(secondary[0]) or errors.get(primary[0])
+    finally:
+        histograms.save()
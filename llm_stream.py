@@ -0,0 +1,242 @@
+# llm_stream.py
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+MODEL = "gpt-4.1"
+TEMPERATURE = 0.2
+
+_JSON_VALUE_CHARS = set("0123456789-+.eEtruefalsn")
+
+
+class InvalidJSONStream(ValueError):
+    """Raised as soon as a streamed completion can no longer be valid JSON."""
+
+
+class JsonPrefixValidator:
+    """
+    Incremental structural check of a JSON object arriving in chunks. It does
+    not validate number/literal spelling, only what can be decided early:
+    the first token must open an object, brackets must match, and nothing but
+    whitespace may follow the closing brace.
+    """
+
+    def __init__(self):
+        self.stack: List[str] = []
+        self.started = False
+        self.finished = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> None:
+        for char in chunk:
+            self._feed_char(char)
+
+    def _feed_char(self, char: str) -> None:
+        if self.in_string:
+            if self.escaped:
+                self.escaped = False
+            elif char == "\\":
+                self.escaped = True
+            elif char == '"':
+                self.in_string = False
+            elif char in "\n\r":
+                raise InvalidJSONStream("Unescaped newline inside a JSON string")
+            return
+
+        if char.isspace():
+            return
+        if self.finished:
+            raise InvalidJSONStream(f"Unexpected {char!r} after the JSON object closed")
+        if not self.started:
+            if char != "{":
+                raise InvalidJSONStream(f"Completion starts with {char!r}, not a JSON object")
+            self.started = True
+            self.stack.append("}")
+            return
+
+        if char == '"':
+            self.in_string = True
+        elif char in "{[":
+            self.stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not self.stack or self.stack.pop() != char:
+                raise InvalidJSONStream(f"Mismatched {char!r}")
+            if not self.stack:
+                self.finished = True
+        elif char not in ",:" and char not in _JSON_VALUE_CHARS:
+            raise InvalidJSONStream(f"Unexpected {char!r} outside a JSON string")
+
+
+class CancelToken:
+    """
+    Lets another thread stop a stream: cancel() closes the underlying HTTP
+    response, which also unblocks a read that is waiting on a hung server.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._close: Optional[Callable[[], None]] = None
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def bind(self, close: Callable[[], None]) -> None:
+        with self._lock:
+            self._close = close
+            cancelled = self._event.is_set()
+        if cancelled:
+            close()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._event.set()
+            close = self._close
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                # The stream may already be closed or mid-read; either way it is done.
+                pass
+
+
+@dataclass
+class CallStats:
+    path: str
+    started: float
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    chunks: int = 0
+    output_tokens: Optional[int] = None
+    aborted: bool = False
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def total_latency(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        tokens = self.output_tokens if self.output_tokens is not None else self.chunks
+        if self.first_token_at is None or self.finished_at is None:
+            return None
+        generation_time = self.finished_at - self.first_token_at
+        return tokens / generation_time if generation_time > 0 else None
+
+    def summary(self) -> str:
+        def fmt(value: Optional[float], unit: str) -> str:
+            return "n/a" if value is None else f"{value:.2f}{unit}"
+
+        status = " (aborted)" if self.aborted else ""
+        return (
+            f"⏱️ {self.path}{status}: first token {fmt(self.time_to_first_token, 's')}, "
+            f"total {fmt(self.total_latency, 's')}, {fmt(self.tokens_per_second, ' tok/s')}"
+        )
+
+
+def _collect(
+    deltas: Iterable[Tuple[str, Optional[int]]],
+    stats: CallStats,
+    close: Callable[[], None],
+    cancel: Optional[CancelToken] = None,
+) -> str:
+    """
+    Assemble (text_delta, usage_tokens) pairs into the completion text,
+    validating the JSON prefix as it grows and closing the stream on abort.
+    """
+    validator = JsonPrefixValidator()
+    parts: List[str] = []
+    try:
+        for delta, usage_tokens in deltas:
+            if cancel is not None and cancel.is_set():
+                stats.aborted = True
+                raise InvalidJSONStream(f"{stats.path} stream cancelled")
+            if usage_tokens is not None:
+                stats.output_tokens = usage_tokens
+            if not delta:
+                continue
+            if stats.first_token_at is None:
+                stats.first_token_at = time.perf_counter()
+            stats.chunks += 1
+            try:
+                validator.feed(delta)
+            except InvalidJSONStream:
+                stats.aborted = True
+                raise
+            parts.append(delta)
+    except InvalidJSONStream:
+        raise
+    except Exception:
+        if cancel is not None and cancel.is_set():
+            stats.aborted = True
+            raise InvalidJSONStream(f"{stats.path} stream cancelled")
+        raise
+    finally:
+        stats.finished_at = time.perf_counter()
+        if stats.aborted:
+            close()
+
+    if not validator.finished:
+        raise InvalidJSONStream(f"{stats.path} stream ended before the JSON object closed")
+    return "".join(parts).strip()
+
+
+def stream_responses(client, messages: List[Dict], cancel: Optional[CancelToken] = None) -> Tuple[str, CallStats]:
+    stats = CallStats(path="responses", started=time.perf_counter())
+    stream = client.responses.create(
+        model=MODEL,
+        input=messages,
+        temperature=TEMPERATURE,
+        top_p=0.9,
+        text={"format": {"type": "json_object"}},
+        stream=True,
+    )
+    if cancel is not None:
+        cancel.bind(stream.close)
+
+    def deltas():
+        for event in stream:
+            event_type = getattr(event, "type", "")
+            if event_type == "response.output_text.delta":
+                yield event.delta, None
+            elif event_type == "response.completed":
+                usage = getattr(event.response, "usage", None)
+                yield "", getattr(usage, "output_tokens", None)
+            elif event_type in ("response.failed", "error"):
+                raise RuntimeError(f"Responses stream failed: {event}")
+
+    return _collect(deltas(), stats, stream.close, cancel), stats
+
+
+def stream_chat(client, messages: List[Dict], cancel: Optional[CancelToken] = None) -> Tuple[str, CallStats]:
+    stats = CallStats(path="chat", started=time.perf_counter())
+    stream = client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        temperature=TEMPERATURE,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    if cancel is not None:
+        cancel.bind(stream.close)
+
+    def deltas():
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None)
+            usage_tokens = getattr(usage, "completion_tokens", None)
+            text = ""
+            if chunk.choices:
+                text = chunk.choices[0].delta.content or ""
+            yield text, usage_tokens
+
+    return _collect(deltas(), stats, stream.close, cancel), stats
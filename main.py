@@ -1,23 +1,137 @@
 # main.py
 
-from trend_scraper import get_btc_historical
-from sentiment_scraper import get_sentiment_context
-from analyze import analyze_market
-from notifier import send_notification
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse
 import asyncio
+import math
+from typing import Dict
+
+from assets import coin_ids
+from http_client import COINGECKO_CALLS_PER_MINUTE, get_http_client
+from metrics import get_metrics
+from trend_scraper import get_coins_historical
+from sentiment_scraper import (
+    ARTICLE_STAGE_DEADLINE,
+    get_coindesk_articles,
+    get_reddit_bitcoin_posts,
+)
+from dedupe import dedupe_context, format_stats as format_dedupe_stats
+from sentiment_score import format_features, score_sentiment_context
+from analyze import MODEL_CONCURRENCY, analyze_markets
+from notifier import send_notifications
+from pipeline import Stage, run_pipeline
+
+# Module imports (openai, telegram, bs4, lxml, numpy) are a fixed cost of every
+# cold start; daemon mode pays it once and reports it against each warm run.
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+COINS = coin_ids()
+
+PRICE_STAGE_TIMEOUT = 60  # seconds, plus the rate-budget wait for a cold fetch of every asset
+COINDESK_STAGE_TIMEOUT = ARTICLE_STAGE_DEADLINE + 30
+REDDIT_STAGE_TIMEOUT = 45
+ANALYSIS_STAGE_TIMEOUT = 180  # per wave of MODEL_CONCURRENCY assets
+
+
+def _fetch_prices():
+    return get_coins_historical(COINS, days=350)
+
+
+def _score_sentiment(coindesk_articles, reddit_posts):
+    metrics = get_metrics()
+    with metrics.span("dedupe"):
+        deduped = dedupe_context(coindesk_articles, reddit_posts)
+    print(format_dedupe_stats(deduped["stats"]))
+    scored = score_sentiment_context(deduped["coindesk_articles"], deduped["reddit_posts"])
+    print(format_features(scored["features"]))
+    metrics.annotate(sentiment=scored["features"], dedupe=deduped["stats"])
+    return scored
+
+
+def _analyze(price_histories, sentiment):
+    return analyze_markets(price_histories, sentiment)
+
+
+def build_pipeline_stages():
+    """
+    Price and sentiment sources are independent; once both feeds are in,
+    near-duplicate stories are collapsed and sentiment is scored locally, and
+    analysis waits on prices and the scores.
+    """
+    price_timeout = PRICE_STAGE_TIMEOUT + 60 * len(COINS) / COINGECKO_CALLS_PER_MINUTE
+    analysis_timeout = ANALYSIS_STAGE_TIMEOUT * math.ceil(len(COINS) / MODEL_CONCURRENCY)
+    return [
+        Stage("price_histories", _fetch_prices, timeout=price_timeout),
+        Stage("coindesk_articles", get_coindesk_articles, timeout=COINDESK_STAGE_TIMEOUT, fallback=list),
+        Stage("reddit_posts", get_reddit_bitcoin_posts, timeout=REDDIT_STAGE_TIMEOUT, fallback=list),
+        Stage("sentiment", _score_sentiment, deps=("coindesk_articles", "reddit_posts")),
+        Stage(
+            "analysis",
+            _analyze,
+            deps=("price_histories", "sentiment"),
+            timeout=analysis_timeout,
+        ),
+    ]
+
+
+def run_analysis() -> Dict[str, str]:
+    """
+    Run the fetch + analysis stages and return the raw LLM JSON per asset.
+    """
+    metrics = get_metrics()
+    metrics.begin_run()
+    report = run_pipeline(build_pipeline_stages())
+    print(report.summary())
+    for name, timing in report.timings.items():
+        metrics.observe("stage", timing.duration, timing.status != "ok", stage=name)
+    metrics.annotate(
+        assets=list(COINS),
+        pipeline_wall_s=round(report.wall_time, 3),
+        critical_path=report.critical_path,
+    )
+    http_client = get_http_client()
+    print(http_client.format_metrics())
+    # Counters are per run; breaker state carries over in daemon mode.
+    http_client.reset_metrics()
+    return report.results["analysis"]
+
 
 def run_btc_analysis_pipeline():
     """
-    Orchestrate the entire BTC trend + sentiment + analysis + notify pipeline.
+    Orchestrate the entire trend + sentiment + analysis + notify pipeline
+    for every tracked asset.
     """
-    btc_history = get_btc_historical(days=350)
-    sentiment = get_sentiment_context()
-    result_text = analyze_market(btc_history, sentiment)
+    results = run_analysis()
 
     # Send raw LLM JSON to notifier
-    asyncio.run(send_notification(result_text))
+    asyncio.run(send_notifications(results))
+    get_metrics().export()
+
 
 if __name__ == "__main__":
-    print("🧩 Running BTC analysis pipeline...")
-    run_btc_analysis_pipeline()
-    print("✅ Done!")
+    from daemon import DEFAULT_INTERVAL, run_daemon
+
+    parser = argparse.ArgumentParser(description="BTC trend + sentiment analysis pipeline.")
+    parser.add_argument("--daemon", action="store_true", help="stay running and analyse on a fixed interval")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between daemon runs")
+    parser.add_argument(
+        "--intraday",
+        action="store_true",
+        help="daemon mode plus minute price polling with threshold alerts and off-cycle analyses",
+    )
+    args = parser.parse_args()
+
+    if args.daemon or args.intraday:
+        intraday = None
+        if args.intraday:
+            from intraday import IntradayMonitor
+
+            intraday = IntradayMonitor(COINS)
+        run_daemon(run_analysis, interval=args.interval, import_seconds=IMPORT_SECONDS, intraday=intraday)
+    else:
+        print(f"🧩 Running analysis pipeline for {', '.join(COINS)}...")
+        run_btc_analysis_pipeline()
+        print("✅ Done!")
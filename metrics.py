@@ -0,0 +1,211 @@
+# metrics.py
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+METRICS_PROM_FILE = DATA_DIR / "metrics.prom"
+RUN_REPORT_FILE = DATA_DIR / "run_report.json"
+METRIC_PREFIX = "btc_bot"
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> LabelKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _label_text(labels: Tuple[Tuple[str, str], ...], **extra: str) -> str:
+    pairs = list(labels) + sorted(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        label + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for label, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class _SpanStats:
+    __slots__ = ("count", "total", "max", "errors")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def add(self, seconds: float, error: bool) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.errors += int(error)
+
+    def as_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 4),
+            "mean_s": round(self.total / self.count, 4) if self.count else 0.0,
+            "max_s": round(self.max, 4),
+            "errors": self.errors,
+        }
+
+
+class Metrics:
+    """
+    Thread-safe counters and timing spans. Everything is aggregated in place
+    (count/sum/max per name+labels), so memory does not grow with the number
+    of calls. Totals accumulate for the life of the process, which is what a
+    Prometheus counter expects; a second set is reset by begin_run() and feeds
+    the per-run JSON report.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = {}
+        self._spans: Dict[LabelKey, _SpanStats] = {}
+        self._run_counters: Dict[LabelKey, float] = {}
+        self._run_spans: Dict[LabelKey, _SpanStats] = {}
+        self._run_info: Dict = {}
+        self.run_started = time.time()
+
+    def begin_run(self) -> None:
+        with self._lock:
+            self._run_counters = {}
+            self._run_spans = {}
+            self._run_info = {}
+            self.run_started = time.time()
+
+    def annotate(self, **info) -> None:
+        """
+        Attach free-form fields (critical path, run reason, ...) to the run report.
+        """
+        with self._lock:
+            self._run_info.update(info)
+
+    def incr(self, name: str, amount: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self._run_counters[key] = self._run_counters.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, error: bool = False, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            for spans in (self._spans, self._run_spans):
+                if key not in spans:
+                    spans[key] = _SpanStats()
+                spans[key].add(seconds, error)
+
+    @contextmanager
+    def span(self, name: str, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, error, **labels)
+
+    # ------------------------------------------------------------------ export
+
+    def run_report(self, extra: Optional[Dict] = None) -> Dict:
+        def flatten(key: LabelKey) -> str:
+            name, labels = key
+            return name + "".join(f"[{label}={value}]" for label, value in labels)
+
+        with self._lock:
+            spans = {flatten(key): stats.as_dict() for key, stats in self._run_spans.items()}
+            counters = {flatten(key): value for key, value in self._run_counters.items()}
+            info = dict(self._run_info)
+        report = {
+            "started_at": datetime.fromtimestamp(self.run_started, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_s": round(time.time() - self.run_started, 3),
+            "spans": dict(sorted(spans.items(), key=lambda item: -item[1]["total_s"])),
+            "counters": dict(sorted(counters.items())),
+            **info,
+        }
+        if extra:
+            report.update(extra)
+        return report
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            spans = sorted(self._spans.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{_label_text(labels)} {value:g}")
+
+        if spans:
+            base = f"{METRIC_PREFIX}_span_seconds"
+            lines.append(f"# TYPE {base} summary")
+            for (name, labels), stats in spans:
+                label_text = _label_text(labels, span=name)
+                lines.append(f"{base}_sum{label_text} {stats.total:.6f}")
+                lines.append(f"{base}_count{label_text} {stats.count}")
+            lines.append(f"# TYPE {base}_max gauge")
+            for (name, labels), stats in spans:
+                lines.append(f"{base}_max{_label_text(labels, span=name)} {stats.max:.6f}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_span_errors_total counter")
+            for (name, labels), stats in spans:
+                lines.append(f"{METRIC_PREFIX}_span_errors_total{_label_text(labels, span=name)} {stats.errors}")
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_last_run_timestamp_seconds {self.run_started:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def export(
+        self,
+        prom_path: Path = METRICS_PROM_FILE,
+        report_path: Path = RUN_REPORT_FILE,
+        extra: Optional[Dict] = None,
+    ) -> None:
+        """
+        Write the Prometheus textfile (for node_exporter's textfile collector)
+        and the JSON run report, each atomically.
+        """
+        for path, content in (
+            (prom_path, self.prometheus_text()),
+            (report_path, json.dumps(self.run_report(extra), ensure_ascii=False, indent=2)),
+        ):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            tmp_path.replace(path)
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
+
+
+def span(name: str, **labels):
+    return get_metrics().span(name, **labels)
+
+
+def incr(name: str, amount: float = 1, **labels) -> None:
+    get_metrics().incr(name, amount, **labels)
@@ -2,42 +2,119 @@
 
 import json
 import os
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from telegram import Bot
 from telegram.error import TelegramError
 
+from assets import DEFAULT_ASSET, asset_symbol
+from broadcast import Broadcaster, DeliveryStats
+from metrics import incr, span
+
 load_dotenv()
 
 _bot: Optional[Bot] = None
-_chat_id: Optional[str] = None
+_chat_ids: List[str] = []
 
 
-def _ensure_bot() -> Tuple[Optional[Bot], Optional[str]]:
+def _configured_chat_ids() -> List[str]:
+    """
+    Subscriber chats from TELEGRAM_CHAT_IDS (comma/whitespace separated), the
+    file named by TELEGRAM_CHAT_IDS_FILE (one id per line, # comments) and the
+    single legacy TELEGRAM_CHAT_ID, de-duplicated in that order.
+    """
+    raw = [os.getenv("TELEGRAM_CHAT_IDS", "")]
+    path = os.getenv("TELEGRAM_CHAT_IDS_FILE")
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw.extend(line.split("#", 1)[0] for line in f)
+        except OSError as exc:
+            print(f"⚠️ Could not read TELEGRAM_CHAT_IDS_FILE: {exc}")
+    raw.append(os.getenv("TELEGRAM_CHAT_ID", ""))
+
+    chat_ids: List[str] = []
+    for chunk in raw:
+        for chat_id in chunk.replace(",", " ").split():
+            if chat_id not in chat_ids:
+                chat_ids.append(chat_id)
+    return chat_ids
+
+
+def _ensure_bot() -> Tuple[Optional[Bot], List[str]]:
     """
     Lazily instantiate the Telegram bot to surface credential issues gracefully.
     """
-    global _bot, _chat_id
+    global _bot, _chat_ids
 
-    if _bot and _chat_id:
-        return _bot, _chat_id
+    if _bot and _chat_ids:
+        return _bot, _chat_ids
 
     token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
+    chat_ids = _configured_chat_ids()
 
-    if not token or not chat_id:
+    if not token or not chat_ids:
         print("⚠️ Telegram credentials missing. Skipping notification.")
-        return None, None
+        return None, []
 
     try:
-        _bot = Bot(token=token)
+        # TELEGRAM_BASE_URL points the bot at a local stand-in (see replay.py).
+        base_url = os.getenv("TELEGRAM_BASE_URL")
+        _bot = Bot(token=token, base_url=base_url) if base_url else Bot(token=token)
     except TelegramError as exc:
         print(f"⚠️ Failed to initialise Telegram bot: {exc}")
-        return None, None
+        return None, []
+
+    _chat_ids = chat_ids
+    return _bot, _chat_ids
+
+
+async def warm_up() -> bool:
+    """
+    Initialise the bot (and its HTTP connection pool) ahead of the first send.
+    Only useful when the same event loop later sends notifications.
+    """
+    bot, _ = _ensure_bot()
+    if not bot:
+        return False
+    try:
+        await bot.initialize()
+    except TelegramError as exc:
+        print(f"⚠️ Failed to warm up Telegram bot: {exc}")
+        return False
+    return True
+
+
+async def close() -> None:
+    global _bot, _chat_ids
+
+    if _bot is None:
+        return
+    try:
+        await _bot.shutdown()
+    except TelegramError as exc:
+        print(f"⚠️ Failed to shut down Telegram bot cleanly: {exc}")
+    _bot, _chat_ids = None, []
+
 
-    _chat_id = chat_id
-    return _bot, _chat_id
+async def _broadcast(messages: List[Tuple[str, Optional[str]]]) -> Optional[DeliveryStats]:
+    bot, chat_ids = _ensure_bot()
+    if not bot or not chat_ids or not messages:
+        return None
+    with span("telegram_broadcast"):
+        stats = await Broadcaster(bot).broadcast(chat_ids, messages)
+    print(stats.summary())
+    for name in ("sent", "failed", "rate_limited", "retried"):
+        incr(f"telegram_{name}", getattr(stats, name))
+    return stats
+
+
+async def send_alert(text: str) -> Optional[DeliveryStats]:
+    """
+    Plain-text alert (intraday threshold rules) to every subscriber chat.
+    """
+    return await _broadcast([(text, None)])
 
 
 def _format_reasoning(reasoning_field) -> str:
@@ -51,32 +128,45 @@ def _format_reasoning(reasoning_field) -> str:
     return "• No reasoning provided."
 
 
-async def send_notification(result_text: str) -> None:
-    print("🔍 Raw LLM output:", result_text)
+def _format_outcome(outcome: Dict[str, Dict]) -> str:
+    if not outcome:
+        return ""
+    parts = [
+        f"{horizon} {result['change_pct']:+.1f}% {'✅' if result['hit'] else '❌'}"
+        for horizon, result in outcome.items()
+    ]
+    return " → " + ", ".join(parts)
 
-    bot, chat_id = _ensure_bot()
-    if not bot or not chat_id:
-        return
+
+def render_notification(result_text: str, asset: str = DEFAULT_ASSET) -> Tuple[str, Optional[str]]:
+    """
+    Build the Telegram message for one asset as (text, parse_mode). Rendered
+    once per run and reused for every subscriber chat.
+    """
+    print(f"🔍 Raw LLM output ({asset_symbol(asset)}):", result_text)
 
     try:
         parsed = json.loads(result_text)
     except json.JSONDecodeError:
-        await bot.send_message(chat_id=chat_id, text="❌ Failed to parse LLM result.")
-        return
+        return f"❌ Failed to parse {asset_symbol(asset)} LLM result.", None
 
     from analyze import load_history
+    from scoring import get_scoreboard
 
-    history = load_history()
+    history = load_history(asset=asset)
+    scoreboard = get_scoreboard(asset)
     history_lines = "\n".join(
         f"{h['date']}: {h.get('recommendation', 'N/A')} @ {h.get('confidence', 'N/A')}"
+        f"{_format_outcome(scoreboard.outcome(h['date']))}"
         for h in history
     ) or "No prior recommendations recorded."
+    history_lines += f"\n{scoreboard.recap_line()}"
 
     recommendation = str(parsed.get("recommendation", "N/A")).upper()
     confidence = parsed.get("confidence", "N/A")
     reasoning = _format_reasoning(parsed.get("reasoning", []))
 
-    msg = f"""📈 *BTC Market Recommendation*
+    msg = f"""📈 *{asset_symbol(asset)} Market Recommendation*
 
 *Recommendation:* {recommendation}
 *Confidence:* {confidence}%
@@ -86,12 +176,21 @@ async def send_notification(result_text: str) -> None:
 📅 *History:*
 {history_lines}
 """
-    try:
-        await bot.send_message(
-            chat_id=chat_id,
-            text=msg,
-            parse_mode="Markdown",
-            disable_web_page_preview=True,
-        )
-    except TelegramError as exc:
-        print(f"⚠️ Failed to send Telegram message: {exc}")
+    return msg, "Markdown"
+
+
+async def send_notification(result_text: str, asset: str = DEFAULT_ASSET) -> Optional[DeliveryStats]:
+    return await send_notifications({asset: result_text})
+
+
+async def send_notifications(results: Dict[str, str]) -> Optional[DeliveryStats]:
+    """
+    Render one message per asset, then fan all of them out to every
+    subscriber chat through the rate-aware broadcast queue.
+    """
+    if not _ensure_bot()[0]:
+        for asset, result_text in results.items():
+            print(f"🔍 Raw LLM output ({asset_symbol(asset)}):", result_text)
+        return None
+    messages = [render_notification(result_text, asset) for asset, result_text in results.items()]
+    return await _broadcast(messages)
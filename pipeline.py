@@ -0,0 +1,176 @@
+# pipeline.py
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+MAX_PARALLEL_STAGES = 8
+
+
+@dataclass
+class Stage:
+    """
+    A unit of pipeline work. `func` receives the results of `deps` as keyword
+    arguments (keyed by stage name). When `fallback` is set, a failure or
+    timeout yields `fallback()` instead of aborting the run.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    fallback: Optional[Callable[[], Any]] = None
+
+
+@dataclass
+class StageTiming:
+    name: str
+    started: float
+    finished: float
+    status: str  # "ok", "failed" or "timeout"
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class PipelineReport:
+    results: Dict[str, Any]
+    timings: Dict[str, StageTiming]
+    critical_path: List[str]
+    wall_time: float
+    stage_time_total: float = 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"⏱️ Pipeline finished in {self.wall_time:.2f}s "
+            f"(sum of stages {self.stage_time_total:.2f}s)"
+        ]
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1].started):
+            marker = "*" if name in self.critical_path else " "
+            lines.append(f" {marker} {name:<12} {timing.duration:6.2f}s  {timing.status}")
+        lines.append("   critical path: " + " → ".join(self.critical_path))
+        return "\n".join(lines)
+
+
+class StageError(RuntimeError):
+    """Raised when a stage without a fallback fails or times out."""
+
+
+def _validate(stages: Sequence[Stage]) -> Dict[str, Stage]:
+    by_name: Dict[str, Stage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage {stage.name!r} depends on unknown stage {dep!r}")
+
+    # Kahn's algorithm purely to reject cycles up front.
+    indegree = {name: len(stage.deps) for name, stage in by_name.items()}
+    ready = [name for name, degree in indegree.items() if degree == 0]
+    visited = 0
+    while ready:
+        current = ready.pop()
+        visited += 1
+        for stage in stages:
+            if current in stage.deps:
+                indegree[stage.name] -= 1
+                if indegree[stage.name] == 0:
+                    ready.append(stage.name)
+    if visited != len(by_name):
+        raise ValueError("Pipeline stages contain a dependency cycle")
+
+    return by_name
+
+
+def _critical_path(stages: Dict[str, Stage], timings: Dict[str, StageTiming]) -> List[str]:
+    """
+    Walk back from the last stage to finish, always following the dependency
+    that released it (the one that finished last).
+    """
+    if not timings:
+        return []
+    current = max(timings.values(), key=lambda timing: timing.finished).name
+    path = [current]
+    while stages[current].deps:
+        current = max(stages[current].deps, key=lambda dep: timings[dep].finished)
+        path.append(current)
+    path.reverse()
+    return path
+
+
+def run_pipeline(stages: Sequence[Stage], max_workers: int = MAX_PARALLEL_STAGES) -> PipelineReport:
+    """
+    Run stages as a dependency graph, starting each one as soon as all of its
+    dependencies have produced a result.
+    """
+    by_name = _validate(stages)
+    results: Dict[str, Any] = {}
+    timings: Dict[str, StageTiming] = {}
+    running: Dict[Future, Tuple[str, float]] = {}
+    pipeline_start = time.monotonic()
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage")
+
+    def finish(name: str, started: float, status: str, value: Any = None, error: Optional[BaseException] = None):
+        stage = by_name[name]
+        timings[name] = StageTiming(name, started - pipeline_start, time.monotonic() - pipeline_start, status)
+        if status == "ok":
+            results[name] = value
+            return
+        reason = "timed out" if status == "timeout" else f"failed: {error}"
+        if stage.fallback is None:
+            raise StageError(f"Stage {name!r} {reason}") from error
+        print(f"⚠️ Stage {name!r} {reason}; using fallback.")
+        results[name] = stage.fallback()
+
+    try:
+        while len(timings) < len(by_name):
+            scheduled = set(timings) | {name for name, _ in running.values()}
+            for name, stage in by_name.items():
+                if name not in scheduled and all(dep in results for dep in stage.deps):
+                    kwargs = {dep: results[dep] for dep in stage.deps}
+                    future = executor.submit(stage.func, **kwargs)
+                    running[future] = (name, time.monotonic())
+
+            deadlines = [
+                started + by_name[name].timeout
+                for name, started in running.values()
+                if by_name[name].timeout is not None
+            ]
+            wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name, started = running.pop(future)
+                error = future.exception()
+                if error is None:
+                    finish(name, started, "ok", value=future.result())
+                else:
+                    finish(name, started, "failed", error=error)
+
+            now = time.monotonic()
+            for future, (name, started) in list(running.items()):
+                timeout = by_name[name].timeout
+                if timeout is not None and now - started >= timeout:
+                    # Threads cannot be killed; abandon the result and move on.
+                    running.pop(future)
+                    future.cancel()
+                    finish(name, started, "timeout")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    wall_time = time.monotonic() - pipeline_start
+    return PipelineReport(
+        results=results,
+        timings=timings,
+        critical_path=_critical_path(by_name, timings),
+        wall_time=wall_time,
+        stage_time_total=sum(timing.duration for timing in timings.values()),
+    )
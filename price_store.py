@@ -0,0 +1,163 @@
+# price_store.py
+
+import math
+import os
+import struct
+from array import array
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+
+# File layout: magic, record count, then two columns (day ordinals as int32,
+# closes as float64), each stored contiguously so a load is two array reads.
+# A NaN close marks a day upstream has no price for (before the coin was
+# listed, or a hole in its data), so it is not requested again.
+MAGIC = b"PXSTORE1"
+HEADER = struct.Struct("<8sI")
+
+
+def _store_path(coin_id: str) -> Path:
+    return DATA_DIR / f"prices_{coin_id}.bin"
+
+
+class PriceStore:
+    """
+    Persistent daily close series for one coin, kept in a compact columnar
+    binary file under data/.
+    """
+
+    def __init__(self, coin_id: str = "bitcoin", path: Optional[Path] = None):
+        self.coin_id = coin_id
+        self.path = path or _store_path(coin_id)
+        self._prices: Optional[Dict[int, float]] = None
+
+    def _load(self) -> Dict[int, float]:
+        if self._prices is not None:
+            return self._prices
+
+        prices: Dict[int, float] = {}
+        try:
+            raw = self.path.read_bytes()
+        except OSError:
+            raw = b""
+
+        if len(raw) >= HEADER.size:
+            magic, count = HEADER.unpack_from(raw)
+            days_end = HEADER.size + count * 4
+            closes_end = days_end + count * 8
+            if magic == MAGIC and len(raw) == closes_end:
+                days = array("i")
+                days.frombytes(raw[HEADER.size:days_end])
+                closes = array("d")
+                closes.frombytes(raw[days_end:closes_end])
+                prices = dict(zip(days, closes))
+            else:
+                print(f"⚠️ Ignoring corrupt price store {self.path.name}; it will be rebuilt.")
+
+        self._prices = prices
+        return prices
+
+    def save(self) -> None:
+        prices = self._load()
+        ordinals = sorted(prices)
+        days = array("i", ordinals)
+        closes = array("d", (prices[day] for day in ordinals))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(days)))
+            f.write(days.tobytes())
+            f.write(closes.tobytes())
+        tmp_path.replace(self.path)
+
+    def _priced_days(self) -> List[int]:
+        return [day for day, price in self._load().items() if not math.isnan(price)]
+
+    def __len__(self) -> int:
+        return len(self._priced_days())
+
+    @property
+    def first_date(self) -> Optional[date]:
+        days = self._priced_days()
+        return date.fromordinal(min(days)) if days else None
+
+    @property
+    def last_date(self) -> Optional[date]:
+        days = self._priced_days()
+        return date.fromordinal(max(days)) if days else None
+
+    def missing_dates(self, start: date, end: date) -> List[date]:
+        """
+        Days in [start, end] with neither a close nor an unavailable marker.
+        """
+        prices = self._load()
+        return [
+            date.fromordinal(day)
+            for day in range(start.toordinal(), end.toordinal() + 1)
+            if day not in prices
+        ]
+
+    def merge(self, points: Dict[str, float]) -> int:
+        """
+        Upsert {"YYYY-MM-DD": close} points; returns how many dates were new.
+        """
+        prices = self._load()
+        added = 0
+        for date_str, price in points.items():
+            day = datetime.strptime(date_str, "%Y-%m-%d").date().toordinal()
+            if day not in prices or math.isnan(prices[day]):
+                added += 1
+            prices[day] = float(price)
+        return added
+
+    def mark_unavailable(self, start: date, end: date) -> int:
+        """
+        Record every day in [start, end) still missing as having no upstream
+        price; returns how many were marked.
+        """
+        prices = self._load()
+        marked = 0
+        for day in range(start.toordinal(), end.toordinal()):
+            if day not in prices:
+                prices[day] = math.nan
+                marked += 1
+        return marked
+
+    def series(self, start: Optional[date] = None, end: Optional[date] = None) -> List[Tuple[str, float]]:
+        """
+        Return the stored closes between start and end (inclusive), oldest first.
+        """
+        prices = self._load()
+        low = start.toordinal() if start else None
+        high = end.toordinal() if end else None
+        return [
+            (date.fromordinal(day).isoformat(), prices[day])
+            for day in sorted(prices)
+            if (low is None or day >= low) and (high is None or day <= high) and not math.isnan(prices[day])
+        ]
+
+
+def fetch_window(store: PriceStore, days: int, today: Optional[date] = None) -> int:
+    """
+    Number of trailing days to request so the store covers the last `days` days.
+    The latest stored day is always refetched since it may have been an
+    intraday snapshot; earlier gaps inside the window are healed too, except
+    days already marked unavailable.
+    """
+    today = today or datetime.utcnow().date()
+    window_start = today - timedelta(days=days)
+
+    fetch_from = today
+    missing = store.missing_dates(window_start, today)
+    if missing:
+        fetch_from = min(fetch_from, missing[0])
+    last = store.last_date
+    if last is not None and last >= window_start:
+        fetch_from = min(fetch_from, last)
+
+    # CoinGecko needs at least two days to return a daily close plus the live price.
+    return max(2, (today - fetch_from).days + 1)
@@ -0,0 +1,152 @@
+# prompt_builder.py
+
+import json
+import math
+from typing import Dict, List, Tuple
+
+PROMPT_TOKEN_BUDGET = 2500  # whole user prompt, instructions included
+CHARS_PER_TOKEN = 4  # rough average for English + JSON with OpenAI tokenizers
+
+# Highlight text lengths handed out in rounds, most important highlights first,
+# once every kept highlight has its title in the prompt.
+TEXT_LIMITS = (80, 150, 250, 400)
+HIGHLIGHT_SECTIONS = {"macro_highlights": "summary", "reddit_highlights": "body"}
+
+PROMPT_INSTRUCTIONS = (
+    "Evaluate the following structured {asset_name} market data and produce a JSON decision.\n"
+    "Your output must include:\n"
+    '  - "recommendation": one of ["buy", "hold", "avoid"]\n'
+    '  - "confidence": integer 0-100 expressing conviction\n'
+    '  - "reasoning": array of 3-5 concise bullet strings culminating in a summary item\n'
+    "Rules:\n"
+    "- Tie your reasoning to quantitative signals (trend, momentum, volatility) and sentiment cues provided.\n"
+    "- Reference continuation or change relative to recent recommendations when applicable.\n"
+    "- Use track_record (hit rates and confidence calibration of past calls) to temper your confidence.\n"
+    "- sentiment holds locally scored news/Reddit sentiment (-1 bearish to +1 bullish, Reddit weighted by "
+    "engagement); highlights are the strongest items, each with its own score.\n"
+    "- coverage counts near-duplicate items merged into one highlight; seen_before marks stories already "
+    "reported in earlier runs, so weigh them as old news.\n"
+    "- Be explicit about conflicting data or uncertainties.\n"
+    "- Keep reasoning items under 160 characters each.\n"
+    "\n"
+    "Structured data:\n"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _minify(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _rank_highlights(section: str, items: List[Dict]) -> List[Dict]:
+    """
+    Most valuable first. Sentiment-scored highlights arrive already ranked by
+    top_snippets (weight x |sentiment|) and keep that order; unscored Reddit
+    posts are ranked by engagement, articles keep feed order (newest first).
+    """
+    if any(item.get("sentiment") is not None for item in items):
+        return list(items)
+    if section == "reddit_highlights":
+        return sorted(
+            items,
+            key=lambda item: (item.get("upvotes") or 0) + 2 * (item.get("comments") or 0),
+            reverse=True,
+        )
+    return list(items)
+
+
+def _dedupe(items: List[Dict]) -> List[Dict]:
+    seen = set()
+    unique = []
+    for item in items:
+        title = str(item.get("title", "")).strip().lower()
+        if title in seen:
+            continue
+        seen.add(title)
+        unique.append(item)
+    return unique
+
+
+def _with_text_limit(item: Dict, field: str, limit: int) -> Dict:
+    item = dict(item)
+    if limit:
+        item[field] = str(item.get(field, ""))[:limit]
+    else:
+        item.pop(field, None)
+    return item
+
+
+def _section_tokens(payload: Dict) -> Dict[str, int]:
+    return {key: estimate_tokens(_minify(value)) for key, value in payload.items()}
+
+
+def _interleave(ranked: Dict[str, List[Dict]]) -> List[Tuple[str, int]]:
+    """
+    Round-robin (section, index) order so both sources share the budget.
+    """
+    order = []
+    depth = max((len(items) for items in ranked.values()), default=0)
+    for index in range(depth):
+        for section, items in ranked.items():
+            if index < len(items):
+                order.append((section, index))
+    return order
+
+
+def build_prompt(
+    structured_payload: Dict,
+    budget: int = PROMPT_TOKEN_BUDGET,
+    asset_name: str = "Bitcoin",
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Render the analysis prompt as minified, deduplicated JSON that fits
+    `budget` tokens. Fixed sections (price metrics, recommendations) are always
+    kept. Highlights are ranked; the lowest-ranked are dropped until every
+    remaining title fits, then the spare budget buys highlight text for the
+    top-ranked items first. Returns the prompt and estimated tokens per section.
+    """
+    instructions = PROMPT_INSTRUCTIONS.format(asset_name=asset_name)
+    ranked = {
+        section: _dedupe(_rank_highlights(section, structured_payload.get(section, [])))
+        for section in HIGHLIGHT_SECTIONS
+    }
+    order = _interleave(ranked)
+    fixed = {key: value for key, value in structured_payload.items() if key not in HIGHLIGHT_SECTIONS}
+    fixed.update({section: [] for section in HIGHLIGHT_SECTIONS})
+    budget_chars = (budget - estimate_tokens(instructions)) * CHARS_PER_TOKEN
+
+    def item_chars(section: str, index: int, limit: int) -> int:
+        item = _with_text_limit(ranked[section][index], HIGHLIGHT_SECTIONS[section], limit)
+        return len(_minify(item)) + 1  # trailing comma
+
+    limits = {key: 0 for key in order}
+    costs = {key: item_chars(*key, 0) for key in order}
+    used = len(_minify(fixed)) + sum(costs.values())
+    while order and used > budget_chars:
+        used -= costs.pop(order[-1])
+        limits.pop(order.pop())
+
+    for limit in TEXT_LIMITS:
+        for key in order:
+            cost = item_chars(*key, limit)
+            if used - costs[key] + cost <= budget_chars:
+                used += cost - costs[key]
+                costs[key], limits[key] = cost, limit
+
+    payload = dict(fixed)
+    for section, index in order:
+        field = HIGHLIGHT_SECTIONS[section]
+        payload[section].append(_with_text_limit(ranked[section][index], field, limits[(section, index)]))
+
+    rendered = _minify(payload)
+    tokens = {"instructions": estimate_tokens(instructions), **_section_tokens(payload)}
+    tokens["total"] = tokens["instructions"] + estimate_tokens(rendered)
+    return instructions + rendered, tokens
+
+
+def format_token_report(tokens: Dict[str, int], budget: int = PROMPT_TOKEN_BUDGET) -> str:
+    sections = ", ".join(f"{name} {count}" for name, count in tokens.items() if name != "total")
+    return f"🧮 Prompt ≈{tokens['total']} tokens of {budget} budget ({sections})"
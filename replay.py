@@ -0,0 +1,476 @@
+# replay.py
+#
+# Record/replay proxy for end-to-end runs without the network. Every
+# upstream call (CoinGecko, CoinDesk, Reddit, OpenAI, Telegram) is routed to
+# http://127.0.0.1:<port>/<host><path>. In record mode the proxy forwards to
+# the real host and appends each exchange to a gzip cassette; in replay mode
+# it answers from the cassette with optional injected latency and failures.
+#
+#   python replay.py record --cassette data/cassettes/baseline.jsonl.gz
+#   python replay.py serve --cassette data/cassettes/baseline.jsonl.gz [--latency 0.05] [--fail-rate 0.1]
+#   python replay.py run --cassette data/cassettes/baseline.jsonl.gz [--record] [--runs 5]
+#
+# record/serve print the environment to start main.py with; run starts the
+# proxy in-process and runs the pipeline against it, on a scratch copy of
+# data/ with the response caches off.
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+CASSETTE_DIR = DATA_DIR / "cassettes"
+DEFAULT_CASSETTE = CASSETTE_DIR / "default.jsonl.gz"
+DEFAULT_PORT = 8899
+UPSTREAM_TIMEOUT = 120  # seconds; model calls are the slow ones
+
+# Never forwarded back to the client (the body is re-sent decoded and whole).
+_HOP_HEADERS = frozenset({
+    "connection", "keep-alive", "transfer-encoding", "content-encoding", "content-length",
+    "proxy-authenticate", "proxy-authorization", "te", "trailer", "upgrade", "host",
+})
+# Never written to a cassette.
+_SECRET_HEADERS = frozenset({"authorization", "cookie", "set-cookie", "x-api-key", "openai-organization", "openai-project"})
+_BOT_TOKEN = re.compile(r"^/bot[^/]+/")
+# Left out of the scratch data directory: cassettes are read from here, and
+# the response caches would answer requests the cassette is meant to serve.
+_SCRATCH_SKIP = ("cassettes", "http_cache", "llm_cache.json", "article_cache.json")
+
+Key = Tuple[str, str, str, str]
+
+
+def client_env(base_url: str, replay: bool = True) -> Dict[str, str]:
+    """
+    Environment that points http_client, the OpenAI SDK and the Telegram bot
+    at the proxy. Response caches are off in both modes, so every exchange is
+    recorded and every replayed request reaches the cassette. Rate limits are
+    kept while recording against real hosts.
+    """
+    env = {
+        "UPSTREAM_PROXY": base_url,
+        "OPENAI_BASE_URL": f"{base_url}/api.openai.com/v1",
+        "TELEGRAM_BASE_URL": f"{base_url}/api.telegram.org/bot",
+        "RESPONSE_CACHES": "off",
+    }
+    if replay:
+        env["UPSTREAM_RATE_LIMITS"] = "off"
+    return env
+
+
+def _split_target(raw_path: str) -> Tuple[str, str, str]:
+    """
+    "/api.coingecko.com/api/v3/ping?x=1" -> ("api.coingecko.com", "/api/v3/ping", "x=1")
+    """
+    parts = urlsplit(raw_path)
+    host, _, path = parts.path.lstrip("/").partition("/")
+    return host, "/" + path, parts.query
+
+
+def _redact_path(path: str) -> str:
+    # Telegram puts the bot token in the path.
+    return _BOT_TOKEN.sub("/bot<token>/", path)
+
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(entry: Dict) -> bytes:
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+class Cassette:
+    """
+    Recorded exchanges, matched on method + host + path + query and, failing
+    that, on method + host + path alone (for time-dependent query strings and
+    POST bodies such as prompts). Repeated requests get the recorded
+    responses in order and wrap around, so a cassette can be replayed any
+    number of times.
+    """
+
+    def __init__(self, entries: List[Dict]):
+        self.entries = entries
+        self._lock = threading.Lock()
+        self._exact: Dict[Key, Deque[Dict]] = defaultdict(deque)
+        self._loose: Dict[Tuple[str, str, str], Deque[Dict]] = defaultdict(deque)
+        for entry in entries:
+            self._exact[(entry["method"], entry["host"], entry["path"], entry["query"])].append(entry)
+            self._loose[(entry["method"], entry["host"], entry["path"])].append(entry)
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        entries = []
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+        return cls(entries)
+
+    def match(self, method: str, host: str, path: str, query: str) -> Optional[Dict]:
+        with self._lock:
+            for queue in (self._exact.get((method, host, path, query)), self._loose.get((method, host, path))):
+                if queue:
+                    entry = queue.popleft()
+                    queue.append(entry)
+                    return entry
+        return None
+
+
+class CassetteWriter:
+    """
+    Streams entries into <path>.tmp as they arrive and moves the finished
+    archive into place on close(), so an interrupted recording never
+    replaces a good cassette.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = path.with_suffix(path.suffix + ".tmp")
+        self._file = gzip.open(self._tmp_path, "wt", encoding="utf-8")
+
+    def write(self, entry: Dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+            self._tmp_path.replace(self.path)
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real hosts
+
+    # Configured per server by make_server().
+    cassette: Optional[Cassette] = None
+    writer: Optional[CassetteWriter] = None
+    upstream: Optional[requests.Session] = None
+    latency = 0.0
+    jitter = 0.0
+    recorded_latency = 0.0
+    fail_rate = 0.0
+    fail_status = 503
+    fail_hosts: tuple = ()
+    rng: random.Random = random.Random()
+    lock = threading.Lock()
+    stats: Counter = Counter()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _bump(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _send(self, status: int, headers: Dict[str, str], body: bytes) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            if name.lower() not in _HOP_HEADERS:
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_error_json(self, status: int, message: str) -> None:
+        body = json.dumps({"ok": False, "error": {"message": message}, "description": message}).encode("utf-8")
+        self._send(status, {"Content-Type": "application/json"}, body)
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        request_body = self.rfile.read(length) if length else b""
+        host, path, query = _split_target(self.path)
+        if not host:
+            self._send_error_json(400, "expected /<host>/<path>")
+            return
+        if self.writer is not None:
+            self._record(host, path, query, request_body)
+        else:
+            self._replay(host, path, query)
+
+    def _record(self, host: str, path: str, query: str, request_body: bytes) -> None:
+        headers = {
+            name: value for name, value in self.headers.items()
+            if name.lower() not in _HOP_HEADERS and name.lower() != "accept-encoding"
+        }
+        url = f"https://{host}{path}" + (f"?{query}" if query else "")
+        started = time.perf_counter()
+        try:
+            response = self.upstream.request(
+                self.command, url, headers=headers, data=request_body or None, timeout=UPSTREAM_TIMEOUT,
+            )
+            body = response.content
+        except requests.RequestException as exc:
+            self._bump("upstream_errors")
+            print(f"⚠️ {self.command} {host}{path} failed upstream: {exc}")
+            self._send_error_json(502, f"upstream error: {exc}")
+            return
+        elapsed = time.perf_counter() - started
+
+        response_headers = {
+            name: value for name, value in response.headers.items()
+            if name.lower() not in _HOP_HEADERS and name.lower() not in _SECRET_HEADERS
+        }
+        self.writer.write({
+            "method": self.command,
+            "host": host,
+            "path": _redact_path(path),
+            "query": query,
+            "status": response.status_code,
+            "headers": response_headers,
+            "elapsed": round(elapsed, 4),
+            "recorded_at": round(time.time(), 3),
+            **_encode_body(body),
+        })
+        self._bump("recorded")
+        self._send(response.status_code, response_headers, body)
+
+    def _replay(self, host: str, path: str, query: str) -> None:
+        with self.lock:
+            failing = self.fail_rate > 0 and (not self.fail_hosts or host in self.fail_hosts) \
+                and self.rng.random() < self.fail_rate
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+        if failing:
+            time.sleep(delay)
+            self._bump("injected_failures")
+            self._send_error_json(self.fail_status, "injected failure")
+            return
+
+        entry = self.cassette.match(self.command, host, _redact_path(path), query)
+        if entry is None:
+            self._bump("misses")
+            print(f"⚠️ No recorded response for {self.command} {host}{path}")
+            self._send_error_json(404, f"no recorded response for {self.command} {host}{path}")
+            return
+
+        time.sleep(delay + self.recorded_latency * entry.get("elapsed", 0.0))
+        self._bump("served")
+        self._send(entry["status"], entry.get("headers", {}), _decode_body(entry))
+
+
+def make_server(
+    port: int = DEFAULT_PORT,
+    cassette: Optional[Cassette] = None,
+    writer: Optional[CassetteWriter] = None,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    recorded_latency: float = 0.0,
+    fail_rate: float = 0.0,
+    fail_status: int = 503,
+    fail_hosts: tuple = (),
+    seed: Optional[int] = None,
+) -> ThreadingHTTPServer:
+    """
+    Build a recording proxy (writer given) or a replay server (cassette
+    given); port 0 picks a free port (see server.server_address).
+    """
+    if (cassette is None) == (writer is None):
+        raise ValueError("pass exactly one of cassette (replay) or writer (record)")
+    handler = type("ConfiguredReplayHandler", (ReplayHandler,), {
+        "cassette": cassette,
+        "writer": writer,
+        "upstream": requests.Session() if writer is not None else None,
+        "latency": latency,
+        "jitter": jitter,
+        "recorded_latency": recorded_latency,
+        "fail_rate": fail_rate,
+        "fail_status": fail_status,
+        "fail_hosts": tuple(fail_hosts),
+        "rng": random.Random(seed),
+        "lock": threading.Lock(),
+        "stats": Counter(),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(**kwargs) -> ThreadingHTTPServer:
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def format_stats(server: ThreadingHTTPServer) -> str:
+    handler = server.RequestHandlerClass
+    counts = ", ".join(f"{count} {name}" for name, count in sorted(handler.stats.items())) or "no requests"
+    return f"📼 Proxy: {counts}"
+
+
+def _server_kwargs(args: argparse.Namespace) -> Dict:
+    path = Path(args.cassette)
+    if args.command == "record" or getattr(args, "record", False):
+        return {"port": args.port, "writer": CassetteWriter(path)}
+    if not path.exists():
+        sys.exit(f"❌ Cassette not found: {path}")
+    cassette = Cassette.load(path)
+    print(f"📼 Loaded {len(cassette.entries)} recorded exchanges from {path}")
+    return {
+        "port": args.port,
+        "cassette": cassette,
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "recorded_latency": args.recorded_latency,
+        "fail_rate": args.fail_rate,
+        "fail_status": args.fail_status,
+        "fail_hosts": tuple(args.fail_host),
+        "seed": args.seed,
+    }
+
+
+def _close(server: ThreadingHTTPServer) -> None:
+    server.shutdown()
+    server.server_close()
+    writer = server.RequestHandlerClass.writer
+    if writer is not None:
+        writer.close()
+        print(f"💾 Wrote {writer.count} exchanges to {writer.path}")
+    print(format_stats(server))
+
+
+def _serve(args: argparse.Namespace) -> None:
+    server = start_in_background(**_server_kwargs(args))
+    # A bot started by hand must not write into the real data/ either.
+    scratch = scratch_data_dir()
+    mode = "Recording" if args.command == "record" else "Replaying"
+    print(f"📼 {mode} on {base_url(server)}; start the bot with:")
+    env = {**client_env(base_url(server), replay=args.command != "record"), "DATA_DIR": str(scratch)}
+    for name, value in env.items():
+        print(f"  export {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _close(server)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def scratch_data_dir(source: Path = DATA_DIR) -> Path:
+    """
+    Copy the stored state (price series, history, scoring, seen stories) into
+    a temporary directory so a replayed run starts where production is but
+    never writes back to it.
+    """
+    scratch = Path(tempfile.mkdtemp(prefix="btc_bot_replay_"))
+    if source.is_dir():
+        for item in source.iterdir():
+            if item.name in _SCRATCH_SKIP or item.suffix == ".tmp":
+                continue
+            if item.is_dir():
+                shutil.copytree(item, scratch / item.name)
+            else:
+                shutil.copy2(item, scratch / item.name)
+    return scratch
+
+
+def _run(args: argparse.Namespace) -> None:
+    server = start_in_background(**_server_kwargs(args))
+    os.environ.update(client_env(base_url(server), replay=not args.record))
+    # No run may touch the real data/.
+    scratch = scratch_data_dir()
+    os.environ["DATA_DIR"] = str(scratch)
+    print(f"📂 Running against a scratch copy of {DATA_DIR} at {scratch}")
+    if not args.record:
+        # The proxy ignores credentials; these only get the clients built.
+        os.environ.setdefault("OPENAI_API_KEY", "replay")
+        os.environ.setdefault("TELEGRAM_BOT_TOKEN", "replay")
+
+    # Imported only now: http_client reads UPSTREAM_PROXY, and the stores
+    # DATA_DIR, at import time.
+    from main import run_btc_analysis_pipeline
+
+    durations = []
+    try:
+        for run in range(1, args.runs + 1):
+            started = time.perf_counter()
+            run_btc_analysis_pipeline()
+            durations.append(time.perf_counter() - started)
+            print(f"⏱️ Run {run}/{args.runs}: {durations[-1]:.2f}s")
+    finally:
+        _close(server)
+        shutil.rmtree(scratch, ignore_errors=True)
+    if len(durations) > 1:
+        print(f"⏱️ {len(durations)} runs: min {min(durations):.2f}s, mean {sum(durations) / len(durations):.2f}s, "
+              f"max {max(durations):.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record or replay upstream traffic for offline end-to-end runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(command: argparse.ArgumentParser) -> None:
+        command.add_argument("--cassette", default=str(DEFAULT_CASSETTE))
+        command.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 picks a free port")
+
+    def add_replay_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+        command.add_argument("--jitter", type=float, default=0.0, help="extra uniform(0, JITTER) seconds")
+        command.add_argument("--recorded-latency", type=float, default=0.0, metavar="FACTOR",
+                             help="also wait FACTOR x the recorded upstream time (1 = as recorded)")
+        command.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with --fail-status")
+        command.add_argument("--fail-status", type=int, default=503)
+        command.add_argument("--fail-host", action="append", default=[], metavar="HOST",
+                             help="only inject failures for this host (repeatable)")
+        command.add_argument("--seed", type=int, default=None, help="seed for latency jitter and failures")
+
+    add_common(commands.add_parser("record", help="forward to the real hosts and write a cassette"))
+    serve = commands.add_parser("serve", help="answer from a cassette")
+    add_common(serve)
+    add_replay_options(serve)
+    run = commands.add_parser("run", help="run the pipeline against an in-process proxy")
+    add_common(run)
+    add_replay_options(run)
+    run.add_argument("--record", action="store_true", help="record against the real hosts instead of replaying")
+    run.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        _run(args)
+    else:
+        _serve(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# scoring.py
+
+import bisect
+import json
+import os
+import threading
+from datetime import date as Date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from assets import DEFAULT_ASSET, asset_path
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path(os.getenv("DATA_DIR") or BASE_DIR / "data")
+SCORING_STATE_FILE = DATA_DIR / "scoring_state.json"
+
+HORIZONS = (1, 7, 30)  # days after the decision
+# A "hold" counts as a hit while the absolute move stays inside this band (percent).
+HOLD_BAND_PCT = {1: 1.5, 7: 4.0, 30: 8.0}
+CALIBRATION_BIN = 10  # confidence points per calibration bucket
+MAX_RECENT_OUTCOMES = 60  # decision dates whose individual outcomes are kept
+RECOMMENDATIONS = ("buy", "hold", "avoid")
+
+
+def _is_hit(recommendation: str, change_pct: float, horizon: int) -> bool:
+    if recommendation == "buy":
+        return change_pct > 0
+    if recommendation == "avoid":
+        return change_pct < 0
+    return abs(change_pct) < HOLD_BAND_PCT[horizon]
+
+
+def _confidence(value) -> Optional[float]:
+    try:
+        confidence = float(value)
+    except (TypeError, ValueError):
+        return None
+    return confidence if 0 <= confidence <= 100 else None
+
+
+def _shift(iso_date: str, days: int) -> str:
+    return (Date.fromisoformat(iso_date) + timedelta(days=days)).isoformat()
+
+
+def _price_on(series: Sequence[Tuple[str, float]], iso_date: str) -> Optional[float]:
+    index = bisect.bisect_left(series, iso_date, key=lambda item: item[0])
+    if index < len(series) and series[index][0] == iso_date:
+        return series[index][1]
+    return None
+
+
+def _empty_horizon() -> Dict:
+    return {
+        "scored_through": None,  # every decision dated <= this has been scored
+        "by_recommendation": {name: {"n": 0, "hits": 0, "return_sum": 0.0} for name in RECOMMENDATIONS},
+        "calibration": {},  # bucket floor -> {"n", "hits"}
+        "brier_sum": 0.0,
+        "brier_n": 0,
+        "unscorable": 0,
+        "pending": [],  # decision dates at or before the watermark still missing a close
+    }
+
+
+class Scoreboard:
+    """
+    Running accuracy and calibration of stored decisions at each horizon.
+    A per-horizon watermark means each run only reads the decisions that have
+    matured since the last one, so the cost is O(new entries). Decisions whose
+    start or end close is missing stay pending and are retried on later runs
+    until the gap is healed or their date leaves the price window.
+    """
+
+    def __init__(self, path: Optional[Path] = None, asset: str = DEFAULT_ASSET):
+        self.asset = asset
+        self.path = path or asset_path(SCORING_STATE_FILE, asset)
+        self.horizons: Dict[str, Dict] = {str(h): _empty_horizon() for h in HORIZONS}
+        self.recent_outcomes: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        for key, state in (data.get("horizons") or {}).items():
+            if key in self.horizons and isinstance(state, dict):
+                self.horizons[key].update(state)
+        outcomes = data.get("recent_outcomes")
+        if isinstance(outcomes, dict):
+            self.recent_outcomes = outcomes
+
+    def save(self) -> None:
+        with self._lock:
+            snapshot = {"horizons": self.horizons, "recent_outcomes": self.recent_outcomes}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            tmp_path.replace(self.path)
+
+    def _score(self, horizon: int, entry: Dict, start_price: float, end_price: float) -> None:
+        state = self.horizons[str(horizon)]
+        recommendation = str(entry.get("recommendation", "")).lower()
+        if recommendation not in RECOMMENDATIONS:
+            state["unscorable"] += 1
+            return
+
+        change_pct = (end_price / start_price - 1) * 100
+        hit = _is_hit(recommendation, change_pct, horizon)
+        bucket = state["by_recommendation"][recommendation]
+        bucket["n"] += 1
+        bucket["hits"] += int(hit)
+        bucket["return_sum"] += change_pct
+
+        confidence = _confidence(entry.get("confidence"))
+        if confidence is not None:
+            floor = str(min(int(confidence) // CALIBRATION_BIN * CALIBRATION_BIN, 100 - CALIBRATION_BIN))
+            calibration = state["calibration"].setdefault(floor, {"n": 0, "hits": 0})
+            calibration["n"] += 1
+            calibration["hits"] += int(hit)
+            state["brier_sum"] += (confidence / 100 - int(hit)) ** 2
+            state["brier_n"] += 1
+
+        outcomes = self.recent_outcomes.setdefault(entry["date"], {})
+        outcomes[f"{horizon}d"] = {"change_pct": round(change_pct, 2), "hit": hit}
+
+    def update(self, history_store, series: Sequence[Tuple[str, float]]) -> int:
+        """
+        Score every decision that matured since the last update against the
+        (date-sorted) daily close series. The newest point is a live snapshot
+        rather than a settled close, so only the points before it count.
+        Returns the number of new scores.
+        """
+        if len(series) < 2:
+            return 0
+        closes = series[:-1]
+        first_close_date, last_close_date = closes[0][0], closes[-1][0]
+        scored = 0
+        with self._lock:
+            for horizon in HORIZONS:
+                state = self.horizons[str(horizon)]
+                matured_through = _shift(last_close_date, -horizon)
+                watermark = state["scored_through"]
+                pending = [day for day in state["pending"] if day <= matured_through]
+                entries: List[Dict] = []
+                for day in pending:
+                    entries.extend(history_store.range(start=day, end=day, asset=self.asset))
+                if watermark is None or watermark < matured_through:
+                    start = _shift(watermark, 1) if watermark else None
+                    entries.extend(history_store.range(start=start, end=matured_through, asset=self.asset))
+                    state["scored_through"] = matured_through
+
+                still_pending = {day for day in state["pending"] if day > matured_through}
+                for entry in entries:
+                    start_price = _price_on(closes, entry["date"])
+                    end_price = _price_on(closes, _shift(entry["date"], horizon))
+                    if start_price is None or end_price is None:
+                        if entry["date"] >= first_close_date:
+                            # A gap inside the stored window; the price store heals those.
+                            still_pending.add(entry["date"])
+                        else:
+                            state["unscorable"] += 1
+                    elif not start_price:
+                        state["unscorable"] += 1
+                    else:
+                        self._score(horizon, entry, start_price, end_price)
+                        scored += 1
+                state["pending"] = sorted(still_pending)
+
+            for stale in sorted(self.recent_outcomes)[:-MAX_RECENT_OUTCOMES]:
+                del self.recent_outcomes[stale]
+        return scored
+
+    def outcome(self, iso_date: str) -> Dict[str, Dict]:
+        with self._lock:
+            return dict(self.recent_outcomes.get(iso_date, {}))
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Compact per-horizon track record for the prompt.
+        """
+        summary = {}
+        with self._lock:
+            for key, state in self.horizons.items():
+                totals = state["by_recommendation"]
+                n = sum(bucket["n"] for bucket in totals.values())
+                if not n:
+                    continue
+                horizon = {
+                    "n": n,
+                    "hit_rate_pct": round(sum(bucket["hits"] for bucket in totals.values()) / n * 100, 1),
+                    "by_recommendation": {
+                        name: {
+                            "n": bucket["n"],
+                            "hit_rate_pct": round(bucket["hits"] / bucket["n"] * 100, 1),
+                            "avg_change_pct": round(bucket["return_sum"] / bucket["n"], 2),
+                        }
+                        for name, bucket in totals.items() if bucket["n"]
+                    },
+                    "calibration": [
+                        {
+                            "confidence": f"{floor}-{int(floor) + CALIBRATION_BIN - 1}",
+                            "n": bucket["n"],
+                            "hit_rate_pct": round(bucket["hits"] / bucket["n"] * 100, 1),
+                        }
+                        for floor, bucket in sorted(state["calibration"].items(), key=lambda item: int(item[0]))
+                    ],
+                }
+                if state["brier_n"]:
+                    horizon["brier"] = round(state["brier_sum"] / state["brier_n"], 3)
+                summary[f"{key}d"] = horizon
+        return summary
+
+    def recap_line(self) -> str:
+        parts = [
+            f"{horizon} {stats['hit_rate_pct']:.0f}% (n={stats['n']})"
+            for horizon, stats in self.summary().items()
+        ]
+        return "🎯 Hit rate: " + ", ".join(parts) if parts else "🎯 No matured recommendations scored yet."
+
+
+_scoreboards: Dict[str, Scoreboard] = {}
+_scoreboard_lock = threading.Lock()
+
+
+def get_scoreboard(asset: str = DEFAULT_ASSET) -> Scoreboard:
+    with _scoreboard_lock:
+        if asset not in _scoreboards:
+            _scoreboards[asset] = Scoreboard(asset=asset)
+        return _scoreboards[asset]
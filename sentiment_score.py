@@ -0,0 +1,219 @@
+# sentiment_score.py
+
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Valence of single tokens, roughly -3 (very bearish) to +3 (very bullish),
+# tuned for crypto/markets headlines rather than general English.
+LEXICON: Dict[str, float] = {
+    # bullish
+    "bullish": 2.5, "bull": 1.5, "bulls": 1.5, "rally": 2.0, "rallies": 2.0, "rallied": 2.0,
+    "surge": 2.0, "surges": 2.0, "surged": 2.0, "surging": 2.0, "soar": 2.5, "soars": 2.5, "soared": 2.5,
+    "jump": 1.5, "jumps": 1.5, "jumped": 1.5, "gain": 1.5, "gains": 1.5, "gained": 1.5,
+    "rise": 1.0, "rises": 1.0, "rising": 1.0, "rose": 1.0, "climb": 1.5, "climbs": 1.5, "climbed": 1.5,
+    "record": 1.2, "breakout": 2.0, "rebound": 1.5, "rebounds": 1.5, "rebounded": 1.5,
+    "recover": 1.5, "recovers": 1.5, "recovered": 1.5, "recovery": 1.5,
+    "inflow": 2.0, "inflows": 2.0, "adoption": 1.5, "approve": 2.0, "approves": 2.0, "approved": 2.0,
+    "approval": 2.0, "upgrade": 1.5, "upgraded": 1.5, "optimism": 2.0, "optimistic": 2.0,
+    "strong": 1.5, "strength": 1.2, "support": 0.8, "accumulate": 1.5, "accumulation": 1.5,
+    "accumulating": 1.5, "buy": 1.0, "buying": 1.0, "outperform": 1.5, "outperforms": 1.5,
+    "profit": 1.2, "profits": 1.2, "boost": 1.5, "boosts": 1.5, "boosted": 1.5, "milestone": 1.5,
+    "growth": 1.5, "win": 1.5, "wins": 1.5, "moon": 2.0, "hodl": 1.0, "pump": 1.2, "green": 0.8,
+    # bearish
+    "bearish": -2.5, "bear": -1.5, "bears": -1.5, "crash": -3.0, "crashes": -3.0, "crashed": -3.0,
+    "plunge": -2.5, "plunges": -2.5, "plunged": -2.5, "tumble": -2.0, "tumbles": -2.0, "tumbled": -2.0,
+    "slump": -2.0, "slumps": -2.0, "slumped": -2.0, "drop": -1.5, "drops": -1.5, "dropped": -1.5,
+    "fall": -1.5, "falls": -1.5, "fell": -1.5, "falling": -1.5, "decline": -1.5, "declines": -1.5,
+    "declined": -1.5, "sink": -2.0, "sinks": -2.0, "sank": -2.0, "selloff": -2.5,
+    "liquidation": -2.0, "liquidations": -2.0, "liquidated": -2.0, "outflow": -2.0, "outflows": -2.0,
+    "hack": -3.0, "hacked": -3.0, "exploit": -2.5, "exploited": -2.5, "scam": -3.0, "fraud": -3.0,
+    "lawsuit": -2.0, "sued": -2.0, "sues": -2.0, "ban": -2.5, "bans": -2.5, "banned": -2.5,
+    "crackdown": -2.5, "reject": -2.0, "rejects": -2.0, "rejected": -2.0, "delay": -1.0,
+    "delays": -1.0, "delayed": -1.0, "fear": -2.0, "fears": -2.0, "panic": -2.5, "weak": -1.5,
+    "weakness": -1.5, "risk": -1.0, "risks": -1.0, "loss": -1.5, "losses": -1.5, "lost": -1.2,
+    "bankrupt": -3.0, "bankruptcy": -3.0, "insolvent": -3.0, "collapse": -3.0, "collapsed": -3.0,
+    "dump": -2.0, "dumps": -2.0, "dumped": -2.0, "capitulation": -2.0, "uncertainty": -1.5,
+    "warning": -1.5, "warns": -1.5, "concern": -1.0, "concerns": -1.0, "investigation": -1.5,
+    "probe": -1.5, "stall": -1.0, "stalls": -1.0, "stalled": -1.0, "red": -0.8, "volatile": -0.5,
+}
+
+# Multi-word terms win over their parts ("record high" is not "record" + "high").
+PHRASES: Dict[Tuple[str, ...], float] = {
+    ("all", "time", "high"): 2.5, ("record", "high"): 2.5, ("bull", "market"): 2.5, ("bull", "run"): 2.5,
+    ("golden", "cross"): 2.0, ("short", "squeeze"): 2.0, ("rate", "cut"): 1.5, ("rate", "cuts"): 1.5,
+    ("etf", "approval"): 2.5, ("etf", "inflows"): 2.5, ("to", "the", "moon"): 2.0,
+    ("sell", "off"): -2.5, ("bear", "market"): -2.5, ("death", "cross"): -2.0, ("rate", "hike"): -1.5,
+    ("rate", "hikes"): -1.5, ("etf", "outflows"): -2.5, ("record", "low"): -2.5,
+}
+_MAX_PHRASE = max(len(phrase) for phrase in PHRASES)
+
+NEGATIONS = frozenset({"not", "no", "never", "without", "nor", "hardly", "neither", "cannot"})
+NEGATION_WINDOW = 3  # tokens before a term that can negate it
+NEGATION_FACTOR = -0.5
+MODIFIERS = {
+    "very": 1.3, "extremely": 1.5, "sharply": 1.4, "massive": 1.4, "huge": 1.3, "strongly": 1.3,
+    "significantly": 1.3, "big": 1.2, "slightly": 0.6, "somewhat": 0.7, "modest": 0.6, "marginally": 0.5,
+}
+TITLE_WEIGHT = 1.5  # headline terms count more than body text
+NORMALIZATION_ALPHA = 15.0  # compound = s / sqrt(s^2 + alpha), as in VADER
+
+NEUTRAL_BAND = 0.05  # |score| below this counts as neither bullish nor bearish
+LABEL_THRESHOLD = 0.15  # overall score needed for a bullish/bearish label
+SOURCE_WEIGHTS = {"news": 0.6, "reddit": 0.4}  # blend of the per-source means into "overall"
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+# News copy uses typographic apostrophes ("won’t"); fold them so negations still match.
+_APOSTROPHES = str.maketrans({"\u2019": "'", "\u2018": "'", "\u02bc": "'", "\uff07": "'"})
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower().translate(_APOSTROPHES))
+
+
+def _valence(tokens: List[str]) -> float:
+    total = 0.0
+    index = 0
+    while index < len(tokens):
+        value, width = 0.0, 1
+        for size in range(min(_MAX_PHRASE, len(tokens) - index), 1, -1):
+            phrase = tuple(tokens[index:index + size])
+            if phrase in PHRASES:
+                value, width = PHRASES[phrase], size
+                break
+        else:
+            value = LEXICON.get(tokens[index], 0.0)
+
+        if value:
+            previous = tokens[max(0, index - NEGATION_WINDOW):index]
+            if previous:
+                value *= MODIFIERS.get(previous[-1], 1.0)
+            if any(token in NEGATIONS or token.endswith("n't") for token in previous):
+                value *= NEGATION_FACTOR
+            total += value
+        index += width
+    return total
+
+
+def score_text(title: str, body: str = "") -> float:
+    """
+    Compound sentiment in [-1, 1] of a headline plus optional body text.
+    """
+    raw = TITLE_WEIGHT * _valence(_tokens(title)) + _valence(_tokens(body))
+    return raw / math.sqrt(raw * raw + NORMALIZATION_ALPHA)
+
+
+def score_texts(pairs: Sequence[Tuple[str, str]]) -> List[float]:
+    """
+    score_text for each (title, body) pair, in order.
+    """
+    return [score_text(title, body) for title, body in pairs]
+
+
+def engagement_weight(post: Dict) -> float:
+    """
+    1 for a post nobody engaged with, growing with the log of upvotes +
+    2 x comments (the same engagement measure the prompt ranks Reddit by).
+    """
+    engagement = max(0, post.get("upvotes") or 0) + 2 * max(0, post.get("comments") or 0)
+    return 1.0 + math.log1p(engagement)
+
+
+def score_articles(articles: Sequence[Dict]) -> List[Dict]:
+    """
+    Copies of the articles with "sentiment" and "weight" added; the weight
+    is 1 unless dedupe marked the story as old news ("novelty").
+    """
+    scores = score_texts([(article.get("title") or "", article.get("content") or "") for article in articles])
+    return [
+        {**article, "sentiment": round(score, 3), "weight": article.get("novelty", 1.0)}
+        for article, score in zip(articles, scores)
+    ]
+
+
+def score_posts(posts: Sequence[Dict]) -> List[Dict]:
+    """
+    Copies of the posts with "sentiment" and an engagement "weight" (times
+    any dedupe "novelty") added. Placeholders for a failed fetch are left
+    unscored.
+    """
+    scorable = [post for post in posts if not post.get("error")]
+    scores = score_texts([(post.get("title") or "", post.get("body") or "") for post in scorable])
+    return [
+        {**post, "sentiment": round(score, 3), "weight": round(engagement_weight(post) * post.get("novelty", 1.0), 3)}
+        for post, score in zip(scorable, scores)
+    ]
+
+
+def _source_features(items: Sequence[Dict]) -> Dict:
+    scored = [item for item in items if "sentiment" in item]
+    total = sum(item["weight"] for item in scored)
+    if not total:
+        return {"n": 0}
+    mean = sum(item["sentiment"] * item["weight"] for item in scored) / total
+    variance = sum(item["weight"] * (item["sentiment"] - mean) ** 2 for item in scored) / total
+    return {
+        "n": len(scored),
+        "mean": round(mean, 3),
+        "bullish": round(sum(item["weight"] for item in scored if item["sentiment"] >= NEUTRAL_BAND) / total, 2),
+        "bearish": round(sum(item["weight"] for item in scored if item["sentiment"] <= -NEUTRAL_BAND) / total, 2),
+        "spread": round(math.sqrt(variance), 3),
+    }
+
+
+def sentiment_features(scored_articles: Sequence[Dict], scored_posts: Sequence[Dict]) -> Dict:
+    """
+    Compact numeric summary for the prompt and for rule-based checks:
+    weighted mean, bullish/bearish weight shares and spread per source, plus
+    an overall blend and label.
+    """
+    sources = {"news": _source_features(scored_articles), "reddit": _source_features(scored_posts)}
+    present = {name: features for name, features in sources.items() if features["n"]}
+    weight = sum(SOURCE_WEIGHTS[name] for name in present)
+    overall = sum(SOURCE_WEIGHTS[name] * features["mean"] for name, features in present.items()) / weight if weight else 0.0
+    label = "neutral"
+    if overall >= LABEL_THRESHOLD:
+        label = "bullish"
+    elif overall <= -LABEL_THRESHOLD:
+        label = "bearish"
+    return {"overall": round(overall, 3), "label": label, **sources}
+
+
+def score_sentiment_context(articles: Sequence[Dict], posts: Sequence[Dict]) -> Dict:
+    """
+    Score every article and post once per run. Returns the scraped lists
+    with scores attached and the aggregate features under "features".
+    """
+    scored_articles = score_articles(articles)
+    scored_posts = score_posts(posts)
+    return {
+        "coindesk_articles": scored_articles,
+        "reddit_posts": scored_posts,
+        "features": sentiment_features(scored_articles, scored_posts),
+    }
+
+
+def top_snippets(items: Sequence[Dict], limit: int, keep_order: bool = False) -> List[Dict]:
+    """
+    The `limit` items with the highest weight x |sentiment|, strongest first,
+    or in their original order with keep_order (e.g. newest-first news).
+    """
+    ranked = sorted(
+        range(len(items)),
+        key=lambda index: items[index].get("weight", 1.0) * abs(items[index].get("sentiment", 0.0)),
+        reverse=True,
+    )[:limit]
+    if keep_order:
+        ranked.sort()
+    return [items[index] for index in ranked]
+
+
+def format_features(features: Optional[Dict]) -> str:
+    if not features:
+        return "🗞️ Sentiment: not scored"
+    parts = [
+        f"{name} {values['mean']:+.2f} (n={values['n']})"
+        for name, values in features.items()
+        if isinstance(values, dict) and values.get("n")
+    ]
+    return f"🗞️ Sentiment: {features['overall']:+.2f} {features['label']}" + (f" — {', '.join(parts)}" if parts else "")
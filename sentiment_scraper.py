@@ -1,16 +1,21 @@
 # sentiment_scraper.py
 
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Dict, List, Optional
 
 import requests
 from bs4 import BeautifulSoup
 
-DEFAULT_TIMEOUT = 10  # seconds
-MAX_RETRIES = 3
-BACKOFF_BASE = 2
-MAX_ARTICLES = 5
+from article_cache import content_hash, get_article_cache
+from article_extract import extract_article_text
+from http_client import get_http_client
+from metrics import incr, span
+
+MAX_ARTICLES = 50
 MAX_REDDIT_POSTS = 10
+ARTICLE_FETCH_WORKERS = 8
+ARTICLE_STAGE_DEADLINE = 30  # seconds for the whole article-body stage
 
 
 def _request_with_retries(
@@ -21,47 +26,10 @@ def _request_with_retries(
     expect_json: bool = False,
 ) -> requests.Response:
     """
-    Generic GET helper with retries/backoff that returns a Response instance.
-    """
-    headers = headers or {}
-    last_error: Optional[Exception] = None
-
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            response = requests.get(
-                url,
-                headers=headers,
-                params=params,
-                timeout=DEFAULT_TIMEOUT,
-            )
-        except requests.RequestException as exc:
-            last_error = exc
-        else:
-            if response.status_code in (429, 503):
-                wait_seconds = BACKOFF_BASE ** attempt
-                time.sleep(wait_seconds)
-                continue
-
-            if response.ok:
-                if expect_json:
-                    try:
-                        # Touch response.json() so JSON decoding errors surface here.
-                        response.json()
-                    except ValueError as exc:
-                        last_error = exc
-                    else:
-                        return response
-                else:
-                    return response
-
-            last_error = requests.HTTPError(
-                f"Failed request {url}: {response.status_code}"
-            )
-
-        if attempt < MAX_RETRIES:
-            time.sleep(BACKOFF_BASE ** attempt)
-
-    raise RuntimeError(f"Unable to fetch {url} after {MAX_RETRIES} attempts") from last_error
+    GET through the shared HTTP client (cache, per-host rate limit, retries,
+    circuit breaker); returns a Response instance.
+    """
+    return get_http_client().get(url, headers=headers, params=params, expect_json=expect_json)
 
 
 def _trim_text(text: str, limit: int = 1200) -> str:
@@ -77,43 +45,109 @@ def _trim_text(text: str, limit: int = 1200) -> str:
     return truncated + "..."
 
 
-def get_coindesk_articles() -> List[Dict]:
+def _fetch_article_bodies(
+    links: List[str],
+    max_workers: int = ARTICLE_FETCH_WORKERS,
+    deadline: float = ARTICLE_STAGE_DEADLINE,
+) -> Dict[int, str]:
     """
-    Fetch CoinDesk RSS, then visit a limited set of articles to get body text.
+    Fetch article bodies concurrently, returning {index: text} for those that
+    finished before the stage deadline. Stragglers are dropped.
     """
-    url = "https://www.coindesk.com/arc/outboundfeeds/rss/"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) BTCBot/1.1"
-    }
+    if not links:
+        return {}
+
+    bodies: Dict[int, str] = {}
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(links))),
+        thread_name_prefix="article-fetch",
+    )
+    futures = {executor.submit(fetch_article_body, link): index for index, link in enumerate(links)}
+    stage_deadline = time.monotonic() + deadline
+    pending = set(futures)
 
-    rss_response = _request_with_retries(url, headers=headers)
-    soup = BeautifulSoup(rss_response.text, "xml")
-    articles: List[Dict] = []
-
-    for item in soup.find_all("item")[:MAX_ARTICLES]:
+    try:
+        while pending:
+            remaining = stage_deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    bodies[futures[future]] = future.result()
+                except Exception as exc:
+                    print(f"⚠️ Article fetch failed for {links[futures[future]]}: {exc}")
+    finally:
+        # Don't block on stragglers; queued fetches are cancelled outright.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if pending:
+        print(f"⚠️ Dropped {len(pending)} article(s) that missed the {deadline}s deadline.")
+    return bodies
+
+
+def _parse_rss_items(xml_text: str, limit: int = MAX_ARTICLES) -> List[Dict]:
+    """
+    Title/link/published for the first `limit` items of an RSS feed.
+    """
+    soup = BeautifulSoup(xml_text, "xml")
+    items = []
+    for item in soup.find_all("item")[:limit]:
         title_tag = item.find("title")
         link_tag = item.find("link")
         pub_date_tag = item.find("pubDate")
         if not title_tag or not link_tag:
             continue
-
-        link = link_tag.text.strip()
-        article_text = fetch_article_body(link)
-
-        articles.append({
+        items.append({
             "title": title_tag.text.strip(),
-            "link": link,
+            "link": link_tag.text.strip(),
             "published": pub_date_tag.text.strip() if pub_date_tag else "",
-            "content": _trim_text(article_text),
         })
+    return items
+
 
+def get_coindesk_articles() -> List[Dict]:
+    """
+    Fetch CoinDesk RSS, then visit a limited set of articles to get body text.
+    """
+    url = "https://www.coindesk.com/arc/outboundfeeds/rss/"
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) BTCBot/1.1"
+    }
+
+    rss_response = _request_with_retries(url, headers=headers)
+    with span("parse_rss"):
+        items = _parse_rss_items(rss_response.text)
+
+    bodies = _fetch_article_bodies([item["link"] for item in items])
+
+    articles: List[Dict] = []
+    for index, item in enumerate(items):
+        if index not in bodies:
+            continue
+        articles.append({**item, "content": bodies[index]})
+
+    cache = get_article_cache()
+    cache.save()
+    stats = cache.stats()
+    print(
+        f"🗂️ Article cache: {stats['url_hits']} URL hit(s), {stats['content_hits']} unchanged page(s), "
+        f"{stats['misses']} parsed, {stats['entries']} cached."
+    )
     return articles
 
 
 def fetch_article_body(url: str) -> str:
     """
-    Get the full text from a CoinDesk article page with fallback.
+    Get the trimmed text from a CoinDesk article page with fallback.
+    Recently seen URLs and unchanged pages are served from the article cache.
     """
+    cache = get_article_cache()
+    cached_text = cache.lookup_url(url)
+    if cached_text is not None:
+        incr("article_cache", result="url_hit")
+        return cached_text
+
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) BTCBot/1.1"
     }
@@ -123,28 +157,38 @@ def fetch_article_body(url: str) -> str:
     except RuntimeError:
         return "Unable to fetch article content."
 
-    page = BeautifulSoup(response.text, "html.parser")
-
-    # first try article
-    article_block = page.find("article")
-    if article_block:
-        paragraphs = [p.get_text(strip=True) for p in article_block.find_all("p")]
-        if paragraphs:
-            return " ".join(paragraphs)
+    body_hash = content_hash(response.content)
+    cached_text = cache.lookup_content(url, body_hash)
+    if cached_text is not None:
+        incr("article_cache", result="content_hit")
+        return cached_text
 
-    # fallback: div with common article class
-    hero_block = page.find("div", class_="article-hero-content")
-    if hero_block:
-        paragraphs = [p.get_text(strip=True) for p in hero_block.find_all("p")]
-        if paragraphs:
-            return " ".join(paragraphs)
+    incr("article_cache", result="miss")
+    with span("parse_article"):
+        text = _trim_text(extract_article_text(response.text))
+    cache.store(url, body_hash, text)
+    return text
 
-    # fallback: any large text block
-    paragraphs = [p.get_text(strip=True) for p in page.find_all("p")]
-    if paragraphs:
-        return " ".join(paragraphs)
 
-    return "No article content found."
+def _parse_reddit_listing(data: Dict) -> List[Dict]:
+    """
+    Posts (title, trimmed body, votes, comments, timestamp) from a Reddit listing JSON.
+    """
+    posts = []
+    for post in data.get("data", {}).get("children", []):
+        post_data = post.get("data", {})
+        title = post_data.get("title", "").strip()
+        body = post_data.get("selftext", "").strip()
+        if not title:
+            continue
+        posts.append({
+            "title": title,
+            "body": _trim_text(body or "No post body provided.", limit=600),
+            "upvotes": post_data.get("ups", 0),
+            "comments": post_data.get("num_comments", 0),
+            "created_utc": post_data.get("created_utc", 0),
+        })
+    return posts
 
 
 def get_reddit_bitcoin_posts(limit: int = MAX_REDDIT_POSTS) -> List[Dict]:
@@ -163,24 +207,11 @@ def get_reddit_bitcoin_posts(limit: int = MAX_REDDIT_POSTS) -> List[Dict]:
         return [{
             "title": "Failed to fetch Reddit posts",
             "body": str(exc),
+            "error": True,
         }]
 
-    data = response.json()
-    posts = []
-    for post in data.get("data", {}).get("children", []):
-        post_data = post.get("data", {})
-        title = post_data.get("title", "").strip()
-        body = post_data.get("selftext", "").strip()
-        if not title:
-            continue
-        posts.append({
-            "title": title,
-            "body": _trim_text(body or "No post body provided.", limit=600),
-            "upvotes": post_data.get("ups", 0),
-            "comments": post_data.get("num_comments", 0),
-            "created_utc": post_data.get("created_utc", 0),
-        })
-    return posts
+    with span("parse_reddit"):
+        return _parse_reddit_listing(response.json())
 
 
 def get_sentiment_context() -> Dict[str, List[Dict]]:
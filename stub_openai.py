@@ -0,0 +1,239 @@
+# stub_openai.py
+#
+# Minimal local stand-in for the OpenAI HTTP API that speaks the same
+# server-sent-event wire format as /v1/responses and /v1/chat/completions,
+# so the streaming path can be exercised without network access or a key.
+#
+#   python stub_openai.py --port 8765 [--ttft 0.5] [--chunk-delay 0.02] [--mode valid|invalid|truncated]
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub python analyze.py
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List
+
+DEFAULT_PORT = 8765
+DEFAULT_CHUNK_SIZE = 8  # characters per streamed delta
+
+STUB_DECISION = {
+    "recommendation": "hold",
+    "confidence": 62,
+    "reasoning": [
+        "Price holds above the 30-day average while momentum cools.",
+        "RSI near neutral; no overbought or oversold signal.",
+        "Headlines are mixed between ETF flows and macro caution.",
+        "Summary: maintain exposure and wait for a clearer trend.",
+    ],
+}
+
+# Body served per mode: a valid object, one followed by trailing prose (the
+# client should abort at the first prose character), and one that ends unclosed.
+_DECISION_TEXT = json.dumps(STUB_DECISION)
+MODE_BODIES = {
+    "valid": _DECISION_TEXT,
+    "invalid": _DECISION_TEXT + "\n\nLet me know if you would like a deeper breakdown of any of these signals.",
+    "truncated": _DECISION_TEXT[: len(_DECISION_TEXT) // 2],
+}
+
+
+def _chunks(text: str, size: int) -> List[str]:
+    return [text[offset:offset + size] for offset in range(0, len(text), size)]
+
+
+def _usage_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _responses_object(text: str, model: str) -> Dict:
+    return {
+        "id": "resp_stub",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": "completed",
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "output": [{
+            "type": "message",
+            "id": "msg_stub",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "usage": {
+            "input_tokens": 0,
+            "output_tokens": _usage_tokens(text),
+            "total_tokens": _usage_tokens(text),
+        },
+    }
+
+
+def _responses_events(text: str, model: str, chunk_size: int) -> Iterator[Dict]:
+    sequence = 0
+    created = _responses_object("", model)
+    created["status"] = "in_progress"
+    created["output"] = []
+    yield {"type": "response.created", "sequence_number": sequence, "response": created}
+    for delta in _chunks(text, chunk_size):
+        sequence += 1
+        yield {
+            "type": "response.output_text.delta",
+            "sequence_number": sequence,
+            "item_id": "msg_stub",
+            "output_index": 0,
+            "content_index": 0,
+            "delta": delta,
+            "logprobs": [],
+        }
+    yield {"type": "response.completed", "sequence_number": sequence + 1, "response": _responses_object(text, model)}
+
+
+def _chat_object(text: str, model: str) -> Dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": _usage_tokens(text), "total_tokens": _usage_tokens(text)},
+    }
+
+
+def _chat_events(text: str, model: str, chunk_size: int) -> Iterator[Dict]:
+    base = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+    yield {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]}
+    for delta in _chunks(text, chunk_size):
+        yield {**base, "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]}
+    yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+    yield {
+        **base,
+        "choices": [],
+        "usage": {"prompt_tokens": 0, "completion_tokens": _usage_tokens(text), "total_tokens": _usage_tokens(text)},
+    }
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    # Overridden per server via make_server().
+    body_text = MODE_BODIES["valid"]
+    ttft = 0.0
+    chunk_delay = 0.0
+    chunk_size = DEFAULT_CHUNK_SIZE
+    disabled_paths: tuple = ()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_events(self, events: Iterator[Dict], named: bool, done_marker: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        time.sleep(self.ttft)
+        try:
+            for event in events:
+                lines = f"event: {event['type']}\n" if named else ""
+                lines += f"data: {json.dumps(event)}\n\n"
+                self.wfile.write(lines.encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(self.chunk_delay)
+            if done_marker:
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client aborted the stream; nothing left to do.
+            pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        path = self.path.rstrip("/")
+        if any(path.endswith(disabled) for disabled in self.disabled_paths):
+            self._send_json(404, {"error": {"message": f"{path} disabled on this stub"}})
+            return
+
+        model = request.get("model", "stub-model")
+        streaming = bool(request.get("stream"))
+        if path.endswith("/responses"):
+            if streaming:
+                self._send_events(_responses_events(self.body_text, model, self.chunk_size), named=True, done_marker=False)
+            else:
+                time.sleep(self.ttft)
+                self._send_json(200, _responses_object(self.body_text, model))
+        elif path.endswith("/chat/completions"):
+            if streaming:
+                self._send_events(_chat_events(self.body_text, model, self.chunk_size), named=False, done_marker=True)
+            else:
+                time.sleep(self.ttft)
+                self._send_json(200, _chat_object(self.body_text, model))
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+
+
+def make_server(
+    port: int = DEFAULT_PORT,
+    mode: str = "valid",
+    ttft: float = 0.0,
+    chunk_delay: float = 0.0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    disabled_paths: tuple = (),
+) -> ThreadingHTTPServer:
+    """
+    Build a stub server; port 0 picks a free port (see server.server_address).
+    """
+    handler = type("ConfiguredStubHandler", (StubOpenAIHandler,), {
+        "body_text": MODE_BODIES[mode],
+        "ttft": ttft,
+        "chunk_delay": chunk_delay,
+        "chunk_size": chunk_size,
+        "disabled_paths": tuple(disabled_paths),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(**kwargs) -> ThreadingHTTPServer:
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenAI streaming stub.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--mode", choices=sorted(MODE_BODIES), default="valid")
+    parser.add_argument("--ttft", type=float, default=0.3, help="seconds before the first event")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="seconds between events")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--disable", action="append", default=[], metavar="PATH",
+                        help="answer 404 for a path suffix, e.g. /responses to force the Chat fallback")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.mode, args.ttft, args.chunk_delay, args.chunk_size, tuple(args.disable))
+    print(f"🧪 OpenAI stub ({args.mode}) on http://127.0.0.1:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
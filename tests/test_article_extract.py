@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from article_extract import extract_article_text
+from benchmarks.bench_extract import reference_extract
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+
+@pytest.mark.parametrize("path", sorted(FIXTURES_DIR.glob("coindesk_*.html")), ids=lambda path: path.name)
+def test_well_formed_pages_match_the_bs4_extraction(path):
+    html = path.read_text(encoding="utf-8")
+    assert extract_article_text(html) == reference_extract(html)
+
+
+@pytest.mark.parametrize("html", [
+    "<article><p>Analysts said <span>renewed <b>institutional</b> buying</span> lifted prices.</p></article>",
+    "<p>Price <script>var x = 1;</script>held <!-- note --> steady<style>p{}</style>.</p>",
+    "<div class='article-hero-content'><p>Hero <em>only</em></p></div><p>outside</p>",
+    "<html><body><p>One</p><p>  </p><p>Two</p></body></html>",
+    "",
+])
+def test_inline_markup_matches_the_bs4_extraction(html):
+    assert extract_article_text(html) == reference_extract(html)
+
+
+# Malformed markup is repaired the way browsers do, so the output differs
+# from html.parser's nesting; these pin what the extractor returns instead.
+@pytest.mark.parametrize("name, expected", [
+    (
+        "malformed_block_in_paragraph.html",
+        "Spot bitcoin ETFs took in $420 million on Tuesday "
+        "Analysts said the inflowsreflect renewedinstitutionaldemand.",
+    ),
+    (
+        "malformed_nested_paragraphs.html",
+        "Outer paragraph opens an inner one Closing remarks",
+    ),
+    (
+        "malformed_unclosed_paragraphs.html",
+        "Ether slipped 3% overnight Traders pointed toliquidationson perpetual futures "
+        "Funding rates turned negative & open interest fell\xa0sharply",
+    ),
+])
+def test_malformed_pages(name, expected):
+    html = (FIXTURES_DIR / name).read_text(encoding="utf-8")
+    assert extract_article_text(html) == expected
@@ -0,0 +1,28 @@
+import numpy as np
+
+import backtest
+
+
+def _closes(length=400, seed=5):
+    rng = np.random.default_rng(seed)
+    return 30_000 * np.cumprod(1 + rng.normal(0, 0.03, length))
+
+
+def test_sweep_matches_individual_runs():
+    closes = _closes()
+    grid = {"fast": range(3, 12, 2), "slow": range(10, 40, 5)}
+    results = backtest.sweep(closes, "ma_crossover", grid, workers=1, valid=lambda p: p["fast"] < p["slow"])
+    assert len(results) == sum(fast < slow for fast in grid["fast"] for slow in grid["slow"])
+    for swept in results:
+        assert swept == backtest.run_strategy(closes, "ma_crossover", **swept.params)
+    returns = [result.total_return_pct for result in results]
+    assert returns == sorted(returns, reverse=True)
+
+
+def test_sweep_does_not_leak_cached_series():
+    closes = _closes()
+    backtest.sweep(closes, "rsi_reversion", {"period": [7, 14]}, workers=1)
+    assert backtest._worker_closes is None and not backtest._worker_series
+    closes[-50:] *= 2  # a caller reusing its array must not get stale indicators
+    expected = backtest.rsi_reversion(closes.copy(), 14)
+    np.testing.assert_array_equal(backtest.rsi_reversion(closes, 14), expected)
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from telegram.error import RetryAfter
+
+import broadcast
+from broadcast import AsyncRateLimiter, Broadcaster
+
+
+class FakeBot:
+    def __init__(self, flood_once_for=(), retry_after=0.2):
+        self.sent = []
+        self.flood_once_for = set(flood_once_for)
+        self.retry_after = retry_after
+
+    async def send_message(self, chat_id, text, parse_mode=None, disable_web_page_preview=None):
+        if chat_id in self.flood_once_for:
+            self.flood_once_for.discard(chat_id)
+            raise RetryAfter(self.retry_after)
+        self.sent.append((chat_id, text, time.monotonic()))
+
+
+def test_limiter_burst_then_rate():
+    async def run():
+        limiter = AsyncRateLimiter(per_second=20, burst=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+        return time.monotonic() - started
+
+    assert 0.08 <= asyncio.run(run()) < 0.5
+
+
+def test_limiter_pause_holds_back_acquire():
+    async def run():
+        limiter = AsyncRateLimiter(per_second=100, burst=10)
+        limiter.pause(0.2)
+        started = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.18
+
+
+def test_messages_arrive_in_order_per_chat(monkeypatch):
+    monkeypatch.setattr(broadcast, "PRIVATE_CHAT_INTERVAL", 0.01)
+    bot = FakeBot()
+    messages = [("one", None), ("two", None)]
+    stats = asyncio.run(Broadcaster(bot).broadcast(["1", "2", "3"], messages))
+    assert stats.sent == 6 and stats.failed == 0
+    for chat_id in ("1", "2", "3"):
+        assert [text for chat, text, _ in bot.sent if chat == chat_id] == ["one", "two"]
+
+
+def test_retry_after_only_delays_the_throttled_chat(monkeypatch):
+    monkeypatch.setattr(broadcast, "PRIVATE_CHAT_INTERVAL", 0.0)
+    monkeypatch.setattr(broadcast, "GROUP_CHAT_INTERVAL", 0.0)
+    bot = FakeBot(flood_once_for={"-100"}, retry_after=0.3)
+    messages = [("one", None), ("two", None)]
+    started = time.monotonic()
+    stats = asyncio.run(Broadcaster(bot, concurrency=1).broadcast(["-100", "2", "3"], messages))
+    assert stats.sent == 6 and stats.rate_limited == 1
+    # A busy group's per-chat limit must not hold back unrelated chats.
+    others = [sent_at - started for chat, _, sent_at in bot.sent if chat != "-100"]
+    assert len(others) == 4 and max(others) < 0.2
+    assert all(sent_at - started >= 0.28 for chat, _, sent_at in bot.sent if chat == "-100")
+
+
+def test_retry_after_from_many_chats_pauses_every_worker(monkeypatch):
+    monkeypatch.setattr(broadcast, "PRIVATE_CHAT_INTERVAL", 0.0)
+    chats = ["1", "2", "3", "4"]
+    bot = FakeBot(flood_once_for=chats[:broadcast.GLOBAL_FLOOD_CHATS], retry_after=0.3)
+    started = time.monotonic()
+    stats = asyncio.run(Broadcaster(bot, concurrency=1).broadcast(chats, [("one", None)]))
+    assert stats.sent == 4 and stats.rate_limited == broadcast.GLOBAL_FLOOD_CHATS
+    # Several chats throttled at once is the bot-wide limit: everyone waits.
+    assert all(sent_at - started >= 0.28 for _, _, sent_at in bot.sent)
@@ -0,0 +1,68 @@
+import time
+
+from dedupe import SeenIndex, cluster, dedupe_context, signatures, similarity
+
+SPOT_ETF = "SEC approves spot Bitcoin ETFs from BlackRock and Fidelity"
+SPOT_ETF_AGAIN = "SEC approves spot bitcoin ETF from BlackRock, Fidelity"
+HALVING = "Miners brace for the halving as hashprice falls to record low"
+
+
+def test_near_duplicate_titles_share_a_cluster():
+    sigs = signatures([SPOT_ETF, HALVING, SPOT_ETF_AGAIN])
+    assert similarity(sigs[0], sigs[2]) >= 0.5
+    assert similarity(sigs[0], sigs[1]) < 0.5
+    assert cluster(sigs) == [0, 1, 0]
+
+
+def test_signatures_are_stable_across_calls():
+    first, second = signatures([SPOT_ETF]), signatures([SPOT_ETF])
+    assert (first == second).all()
+
+
+def test_context_keeps_coindesk_first_with_coverage(tmp_path):
+    articles = [{"title": SPOT_ETF_AGAIN, "url": "https://coindesk.com/a"}]
+    posts = [
+        {"title": SPOT_ETF, "score": 900},
+        {"title": HALVING, "score": 50},
+        {"error": "reddit unavailable"},
+    ]
+    result = dedupe_context(articles, posts, index=SeenIndex(path=tmp_path / "seen.json"), persist=False)
+
+    assert result["coindesk_articles"] == [{
+        "title": SPOT_ETF_AGAIN, "url": "https://coindesk.com/a",
+        "coverage": 2, "sources": ["coindesk_articles", "reddit_posts"],
+    }]
+    assert [post.get("title") for post in result["reddit_posts"]] == [None, HALVING]
+    stats = result["stats"]
+    assert (stats["items"], stats["stories"], stats["in_run_duplicates"], stats["cross_source"]) == (3, 2, 1, 1)
+    assert stats["seen_before"] == 0
+
+
+def test_stories_from_earlier_runs_are_marked_seen(tmp_path):
+    path = tmp_path / "seen.json"
+    dedupe_context([{"title": SPOT_ETF}], [], index=SeenIndex(path=path))
+    assert path.exists()
+
+    result = dedupe_context([{"title": SPOT_ETF_AGAIN}, {"title": HALVING}], [], index=SeenIndex(path=path))
+    seen, fresh = result["coindesk_articles"]
+    assert seen["seen_before"] is True and seen["novelty"] < 1
+    assert "seen_before" not in fresh
+    assert result["stats"]["seen_before"] == 1 and result["stats"]["index_size"] == 2
+
+
+def test_seen_index_evicts_by_age_and_size(tmp_path):
+    index = SeenIndex(path=tmp_path / "seen.json", max_entries=2, max_age=3600)
+    sigs = signatures([SPOT_ETF, HALVING, "Ether staking yields climb after the Dencun upgrade"])
+    now = time.time()
+    index.record(sigs[0], SPOT_ETF, now=now - 7200)
+    index.record(sigs[1], HALVING, now=now - 60)
+    index.record(sigs[2], "staking", now=now)
+    index.record(sigs[1], HALVING, now=now)
+    assert index.evict() == 1
+    assert index.match(sigs[0]) is None
+    assert index.match(sigs[1])["runs"] == 2
+
+    index.max_entries = 1
+    index.save()
+    reloaded = SeenIndex(path=tmp_path / "seen.json")
+    assert len(reloaded) == 1 and reloaded.match(sigs[1]) is not None
@@ -0,0 +1,49 @@
+import history_store
+from history_store import HistoryStore
+
+
+def _store(tmp_path):
+    return HistoryStore(path=tmp_path / "history.db", legacy_path=None, retention_days=None)
+
+
+def test_range_is_inclusive_and_per_asset(tmp_path):
+    store = _store(tmp_path)
+    for day in ("2026-01-01", "2026-01-02", "2026-01-03"):
+        store.append({"date": day, "recommendation": "hold"})
+    store.append({"date": "2026-01-02", "recommendation": "buy"}, asset="ethereum")
+    assert [entry["date"] for entry in store.range("2026-01-02", "2026-01-03")] == ["2026-01-02", "2026-01-03"]
+    assert [entry["recommendation"] for entry in store.range(asset="ethereum")] == ["buy"]
+
+
+def test_recent_cache_follows_appends(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store, "_days_ago", lambda days: "2026-01-02")
+    store = _store(tmp_path)
+    store.append({"date": "2026-01-01", "recommendation": "hold"})
+    assert store.recent(7) == []
+    store.append({"date": "2026-01-03", "recommendation": "buy"})
+    assert [entry["date"] for entry in store.recent(7)] == ["2026-01-03"]
+
+
+def test_recent_cache_drops_windows_from_earlier_days(tmp_path, monkeypatch):
+    store = _store(tmp_path)
+    for day in range(1, 31):
+        monkeypatch.setattr(history_store, "_days_ago", lambda days, day=day: f"2026-01-{day:02d}")
+        store.recent(7)
+        store.recent(7, asset="ethereum")
+    assert sorted(store._recent_cache) == [("bitcoin", 7, "2026-01-30"), ("ethereum", 7, "2026-01-30")]
+
+
+def test_retention_prunes_only_the_appending_asset_through_the_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store, "_days_ago", lambda days: "2026-01-02")
+    store = HistoryStore(path=tmp_path / "history.db", legacy_path=None, retention_days=30)
+    store._conn.execute(
+        "INSERT INTO decisions (asset, date, recorded_at, entry) VALUES "
+        "('bitcoin', '2026-01-01', 0, '{}'), ('ethereum', '2026-01-01', 0, '{}')"
+    )
+    store.append({"date": "2026-01-05", "recommendation": "hold"})
+    assert [entry["date"] for entry in store.range()] == ["2026-01-05"]
+    assert len(store.range(asset="ethereum")) == 1
+    plan = store._conn.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM decisions WHERE asset = ? AND date < ?", ("bitcoin", "2026-01-02"),
+    ).fetchall()
+    assert "decisions_asset_date" in plan[0][-1]
@@ -0,0 +1,101 @@
+import pytest
+import requests
+
+import http_cache
+import http_client
+from http_cache import HttpCache
+from http_client import HttpClient
+
+URL = "https://example.com/feed"
+
+
+def _response(status: int, body: bytes = b"", headers=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = URL
+    return response
+
+
+class ScriptedSession:
+    """Answers GETs from a list and records the headers of each request."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def _client(monkeypatch, tmp_path, responses):
+    cache = HttpCache(directory=tmp_path, enabled=True)
+    monkeypatch.setattr(http_client, "get_http_cache", lambda: cache)
+    client = HttpClient()
+    client.session = ScriptedSession(responses)
+    return client, cache
+
+
+def test_stale_entry_is_revalidated(monkeypatch, tmp_path):
+    client, cache = _client(monkeypatch, tmp_path, [_response(304)])
+    cache.store(URL, _response(200, b"cached", {"ETag": '"v1"'}))
+    response = client.get(URL)
+    assert response.content == b"cached" and response.from_cache
+    assert client.session.requests[0]["If-None-Match"] == '"v1"'
+    assert cache.stats["revalidated"] == 1
+
+
+def _evict_after_lookup(monkeypatch, cache):
+    original_lookup = cache.lookup
+
+    def lookup_then_evict(url):
+        found = original_lookup(url)
+        if found is not None:
+            found.body_path.unlink()  # a concurrent store() evicts it right after
+        return found
+
+    monkeypatch.setattr(cache, "lookup", lookup_then_evict)
+
+
+def test_304_after_eviction_refetches_unconditionally(monkeypatch, tmp_path):
+    client, cache = _client(monkeypatch, tmp_path, [_response(304), _response(200, b"fresh")])
+    cache.store(URL, _response(200, b"cached", {"ETag": '"v1"'}))
+    entry = cache.lookup(URL)
+    _evict_after_lookup(monkeypatch, cache)
+    response = client.get(URL)
+    assert response.content == b"fresh"
+    assert "If-None-Match" in client.session.requests[0]
+    assert "If-None-Match" not in client.session.requests[1]
+    assert not entry.body_path.exists() or entry.body_path.read_bytes() == b"fresh"
+    # One logical GET: counted once, refetched within the same attempt budget.
+    assert client.metrics()["example.com"]["requests"] == 1
+
+
+def test_304_after_eviction_shares_the_retry_budget(monkeypatch, tmp_path):
+    monkeypatch.setattr(http_client, "_backoff", lambda attempt: 0)
+    client, cache = _client(monkeypatch, tmp_path, [_response(304)] + [_response(503)] * 3)
+    cache.store(URL, _response(200, b"cached", {"ETag": '"v1"'}))
+    _evict_after_lookup(monkeypatch, cache)
+    with pytest.raises(RuntimeError):
+        client.get(URL, max_retries=2)
+    assert len(client.session.requests) == 2
+
+
+def test_fresh_hit_with_missing_body_is_a_miss(monkeypatch, tmp_path):
+    monkeypatch.setitem(http_cache.SOURCE_TTLS, "example.com", 3600)
+    client, cache = _client(monkeypatch, tmp_path, [_response(200, b"fresh")])
+    cache.store(URL, _response(200, b"cached", {"ETag": '"v1"'}))
+    entry = cache.lookup(URL)
+    assert entry.is_fresh()
+    entry.body_path.unlink()
+    assert cache.hit(entry) is None
+    assert client.get(URL).content == b"fresh"
+
+
+def test_disabled_cache_never_stores(tmp_path):
+    cache = HttpCache(directory=tmp_path, enabled=False)
+    cache.store(URL, _response(200, b"body"))
+    assert cache.lookup(URL) is None
+    assert not list(tmp_path.iterdir())
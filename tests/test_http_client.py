@@ -0,0 +1,79 @@
+import pytest
+
+import http_client
+from http_client import CircuitBreaker, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(http_client.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(http_client.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_bucket_serves_burst_then_rate(clock):
+    bucket = TokenBucket(per_minute=60, burst=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(1.0)
+    clock.now += 5
+    # Refill is capped at the burst size.
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+def test_bucket_pause_blocks_until_retry_after(clock):
+    bucket = TokenBucket(per_minute=60, burst=3)
+    bucket.pause(7)
+    assert bucket.acquire() == pytest.approx(7)
+    bucket.pause(2)
+    bucket.pause(1)  # a shorter pause never cuts an existing one short
+    assert bucket.acquire() == pytest.approx(2)
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(threshold=3, reset_after=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+
+def test_half_open_admits_a_single_probe(clock):
+    breaker = CircuitBreaker(threshold=1, reset_after=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(threshold=3, reset_after=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
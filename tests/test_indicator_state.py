@@ -0,0 +1,93 @@
+import math
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import indicators
+from indicator_state import RESYNC_EVERY, IndicatorState
+
+
+def _series(seed: int, length: int):
+    rng = random.Random(seed)
+    price = rng.uniform(100, 50_000)
+    start = date(2024, 1, 1)
+    points = []
+    for offset in range(length):
+        price *= 1 + rng.gauss(0, 0.03)
+        points.append(((start + timedelta(days=offset)).isoformat(), round(price, 2)))
+    return points
+
+
+def _batch_latest(series):
+    closes = [close for _, close in series]
+    return {name: indicators.latest(values) for name, values in indicators.compute_indicators(closes).items()}
+
+
+def _assert_close(streamed, batch):
+    assert streamed.keys() == batch.keys()
+    for name, value in batch.items():
+        if value is None:
+            assert streamed[name] is None, name
+        else:
+            # Running sums and Welford updates round differently from the
+            # exact window sums, but only in the last few bits.
+            assert streamed[name] == pytest.approx(value, rel=1e-9, abs=1e-9), name
+
+
+@pytest.mark.parametrize("length", [5, 31, 91, 400, RESYNC_EVERY + 50])
+def test_streaming_values_match_the_batch_series(length):
+    series = _series(length, length)
+    state = IndicatorState()
+    state.sync(series)
+    _assert_close(state.values(), _batch_latest(series))
+
+
+def test_incremental_sync_matches_a_full_rebuild(tmp_path):
+    series = _series(3, 300)
+    state = IndicatorState()
+    state.sync(series[:200])
+    path = tmp_path / "state.json"
+    state.save(path)
+
+    resumed = IndicatorState.load(path)
+    assert resumed.sync(series) == 101  # the last stored day is re-sent, then 100 new ones
+    fresh = IndicatorState()
+    fresh.sync(series)
+    _assert_close(resumed.values(), fresh.values())
+
+
+def test_revised_latest_close_replaces_the_live_snapshot():
+    series = _series(4, 120)
+    state = IndicatorState()
+    state.sync(series)
+    revised = series[:-1] + [(series[-1][0], series[-1][1] * 1.05)]
+    state.sync(revised)
+    _assert_close(state.values(), _batch_latest(revised))
+    assert state.count == len(series)
+
+
+def test_changed_history_triggers_a_rebuild():
+    series = _series(5, 150)
+    state = IndicatorState()
+    state.sync(series)
+    healed = list(series)
+    healed[140] = (healed[140][0], healed[140][1] + 10)
+    assert state.sync(healed) == len(healed)
+    _assert_close(state.values(), _batch_latest(healed))
+
+
+def test_rewind_is_rejected():
+    state = IndicatorState()
+    state.advance("2024-02-01", 100.0)
+    with pytest.raises(ValueError):
+        state.advance("2024-01-31", 99.0)
+
+
+def test_state_for_another_config_is_ignored(tmp_path):
+    path = tmp_path / "state.json"
+    state = IndicatorState(ma_windows=(5,))
+    state.sync(_series(6, 20))
+    state.save(path)
+    assert IndicatorState.load(path).count == 0
+    assert math.isclose(IndicatorState.load(path, ma_windows=(5,)).values()["ma_5"], state.values()["ma_5"])
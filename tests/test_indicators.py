@@ -0,0 +1,111 @@
+import random
+import warnings
+from statistics import mean, pstdev
+
+import numpy as np
+import pytest
+
+import indicators
+
+
+def _random_walk(seed: int, length: int):
+    rng = random.Random(seed)
+    price = rng.uniform(10, 100_000)
+    closes = []
+    for _ in range(length):
+        price *= 1 + rng.gauss(0, 0.03)
+        closes.append(round(price, rng.choice([2, 6, 10])))
+    return closes
+
+
+# The list-based helpers analyze.py used before the vectorized series.
+def _reference_rsi(values, period=14):
+    deltas = [values[i] - values[i - 1] for i in range(1, len(values))][-period:]
+    gains = [delta for delta in deltas if delta > 0]
+    losses = [-delta for delta in deltas if delta < 0]
+    if not gains and not losses:
+        return 50.0
+    average_gain = mean(gains) if gains else 0.0
+    average_loss = mean(losses) if losses else 0.0
+    if average_loss == 0:
+        return 100.0
+    if average_gain == 0:
+        return 0.0
+    return 100 - (100 / (1 + average_gain / average_loss))
+
+
+def _reference_volatility(values, window=30):
+    recent = values[-window:]
+    returns = [
+        (recent[i] - recent[i - 1]) / recent[i - 1]
+        for i in range(1, len(recent))
+        if recent[i - 1] != 0
+    ]
+    return pstdev(returns) * (252 ** 0.5)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_latest_values_are_bit_identical_to_statistics(seed):
+    closes = _random_walk(seed, random.Random(seed).randint(95, 400))
+    series = indicators.compute_indicators(closes)
+    for window in (7, 30, 90):
+        assert indicators.latest(series[f"ma_{window}"]) == mean(closes[-window:])
+    assert indicators.latest(series["rsi_14"]) == _reference_rsi(closes)
+    assert indicators.latest(series["volatility_30d"]) == _reference_volatility(closes)
+    for days in (7, 30, 90):
+        expected = (closes[-1] - closes[-(days + 1)]) / closes[-(days + 1)] * 100
+        assert indicators.latest(series[f"change_{days}d_pct"]) == expected
+
+
+def test_stacked_rows_get_exact_latest_values():
+    rows = np.array([_random_walk(3, 120), _random_walk(4, 120)])
+    series = indicators.compute_indicators(rows)
+    for row_index, row in enumerate(rows.tolist()):
+        assert series["ma_30"][row_index, -1] == mean(row[-30:])
+        assert series["volatility_30d"][row_index, -1] == _reference_volatility(row)
+
+
+def test_every_sma_point_matches_its_window():
+    closes = _random_walk(7, 120)
+    series = indicators.sma(closes, 30)
+    assert np.isnan(series[:29]).all()
+    expected = [mean(closes[end - 30:end]) for end in range(30, len(closes) + 1)]
+    np.testing.assert_allclose(series[29:], expected, rtol=1e-12)
+    exact = indicators.compute_indicators(closes, ma_windows=(30,))["ma_30"]
+    np.testing.assert_array_equal(exact[:-1], series[:-1])
+    assert exact[-1] == expected[-1]
+
+
+def test_rows_are_independent():
+    rows = np.array([_random_walk(1, 100), _random_walk(2, 100)])
+    stacked = indicators.compute_indicators(rows)
+    for row_index, row in enumerate(rows):
+        single = indicators.compute_indicators(row)
+        for name, values in single.items():
+            np.testing.assert_array_equal(stacked[name][row_index], values)
+
+
+def test_nan_windows_stay_missing():
+    closes = [1.0, 2.0, float("nan"), 4.0, 5.0, 6.0, 7.0]
+    series = indicators.sma(closes, 3)
+    assert np.isnan(series[:5]).all()
+    assert series[5] == 5.0 and series[6] == 6.0
+
+
+def test_zero_close_is_skipped_in_volatility():
+    closes = [1.0, 2.0, 0.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+    assert indicators.latest(indicators.volatility(closes, 4)) == pytest.approx(_reference_volatility(closes, 4))
+    series = indicators.compute_indicators(closes, ma_windows=(), change_periods=(), volatility_window=4)
+    assert indicators.latest(series["volatility_4d"]) == _reference_volatility(closes, 4)
+
+
+def test_flat_series_rsi_is_neutral():
+    assert indicators.latest(indicators.rsi([100.0] * 20, 14)) == 50.0
+
+
+def test_wilder_rsi_does_not_warn_when_the_gain_loss_ratio_overflows():
+    closes = [0.0, 1e-300, 0.0] + [1e10 * i for i in range(1, 30)]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        series = indicators.wilder_rsi(closes, 14)
+    assert indicators.latest(series) == 100.0
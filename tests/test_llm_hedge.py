@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from llm_hedge import LATENCY_BUCKETS, LatencyHistograms, hedged_call
+from llm_stream import CallStats
+
+
+def _path(name: str, seconds: float, text: str = '{"recommendation": "hold"}', error: Exception = None):
+    def call(token):
+        started = time.monotonic()
+        deadline = started + seconds
+        while time.monotonic() < deadline:
+            if token.is_set():
+                raise RuntimeError("cancelled")
+            time.sleep(0.005)
+        if error is not None:
+            raise error
+        return text, CallStats(name, started, finished_at=time.monotonic())
+    return call
+
+
+def _bucket(seconds: float) -> int:
+    return next(index for index, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound)
+
+
+@pytest.fixture
+def histograms(tmp_path):
+    return LatencyHistograms(tmp_path / "latency.json")
+
+
+def test_fast_primary_wins_without_hedging(histograms):
+    result, winner = hedged_call(("responses", _path("responses", 0.01)), ("chat", _path("chat", 0.01)), histograms, delay=1.0)
+    assert winner == "responses" and "hold" in result
+    assert histograms.samples("responses") == 1 and histograms.samples("chat") == 0
+
+
+def test_slow_primary_is_recorded_as_censored_when_chat_wins(histograms):
+    result, winner = hedged_call(
+        ("responses", _path("responses", 3.0)), ("chat", _path("chat", 0.05)), histograms, delay=0.6,
+    )
+    assert winner == "chat"
+    # The primary ran for at least the hedge delay, so its sample must not
+    # land in a faster bucket than that.
+    counts = histograms.counts["responses"]
+    assert sum(counts) == 1
+    assert counts.index(1.0) >= _bucket(0.6)
+
+
+def test_failed_primary_hedges_immediately(histograms):
+    started = time.monotonic()
+    _, winner = hedged_call(
+        ("responses", _path("responses", 0.0, error=RuntimeError("400"))), ("chat", _path("chat", 0.01)),
+        histograms, delay=5.0,
+    )
+    assert winner == "chat" and time.monotonic() - started < 1.0
+    assert histograms.samples("responses") == 0
+
+
+def test_invalid_json_counts_as_failure(histograms):
+    with pytest.raises(RuntimeError, match="both"):
+        hedged_call(
+            ("responses", _path("responses", 0.0, text="not json")), ("chat", _path("chat", 0.0, text="{")),
+            histograms, delay=5.0,
+        )
+
+
+def test_hedge_delay_tracks_the_p95(histograms):
+    # Older samples decay, so the outlier goes first to stay under 5% of the weight.
+    histograms.record("responses", 20)
+    for _ in range(19):
+        histograms.record("responses", 2.5)
+    assert histograms.hedge_delay("responses") == 3
+    histograms.save()
+    assert LatencyHistograms(histograms.path).hedge_delay("responses") == 3
@@ -0,0 +1,134 @@
+import json
+
+import httpx
+import pytest
+from openai import OpenAI
+
+import llm_stream
+import stub_openai
+from llm_stream import CancelToken, InvalidJSONStream, JsonPrefixValidator, stream_chat, stream_responses
+
+
+def _feed(text: str, chunk: int = 3) -> JsonPrefixValidator:
+    validator = JsonPrefixValidator()
+    for offset in range(0, len(text), chunk):
+        validator.feed(text[offset:offset + chunk])
+    return validator
+
+
+@pytest.mark.parametrize("text", [
+    '{"recommendation": "buy", "confidence": 72, "reasoning": ["a", "b"]}',
+    '  \n{"nested": {"list": [1, -2.5e3, true, false, null]}, "s": "brace } in [string]"}\n',
+    '{"escaped": "quote \\" and backslash \\\\"}',
+])
+def test_valid_objects_are_accepted_in_any_chunking(text):
+    json.loads(text)
+    for chunk in (1, 2, 7, len(text)):
+        assert _feed(text, chunk).finished
+
+
+@pytest.mark.parametrize("text", [
+    "Sure! Here is the JSON:",
+    "```json\n{}",
+    '{"a": [1, 2}',
+    '{"a": 1}}',
+    '{"a": 1} trailing',
+    '{"a": "line\nbreak"}',
+    '{"a": buy}',
+])
+def test_invalid_prefixes_fail_early(text):
+    with pytest.raises(InvalidJSONStream):
+        _feed(text)
+
+
+def test_unfinished_object_is_not_finished():
+    validator = _feed('{"recommendation": "hold", "reasoning": [')
+    assert validator.started and not validator.finished
+
+
+def test_cancel_closes_a_bound_stream_once():
+    closed = []
+    token = CancelToken()
+    token.bind(lambda: closed.append(True))
+    token.cancel()
+    assert token.is_set() and closed == [True]
+
+    late = CancelToken()
+    late.cancel()
+    late.bind(lambda: closed.append("late"))
+    assert closed == [True, "late"]
+
+
+# --------------------------------------------------- against the local stub
+
+STREAMS = {"responses": stream_responses, "chat": stream_chat}
+MESSAGES = [{"role": "user", "content": "Return a JSON decision."}]
+TTFT = 0.05
+
+
+@pytest.fixture
+def stub_client():
+    servers = []
+
+    def start(mode):
+        server = stub_openai.start_in_background(port=0, mode=mode, ttft=TTFT, chunk_delay=0.001)
+        servers.append(server)
+        return OpenAI(
+            base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+            api_key="stub",
+            max_retries=0,
+            http_client=httpx.Client(trust_env=False),
+        )
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def recorded_stats(monkeypatch):
+    # Failed streams raise before returning their stats; keep a handle on them.
+    recorded = []
+
+    class RecordingStats(llm_stream.CallStats):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            recorded.append(self)
+
+    monkeypatch.setattr(llm_stream, "CallStats", RecordingStats)
+    return recorded
+
+
+@pytest.mark.parametrize("path", sorted(STREAMS))
+def test_stub_stream_returns_the_decision_with_timings(stub_client, path):
+    text, stats = STREAMS[path](stub_client("valid"), MESSAGES)
+    assert json.loads(text) == stub_openai.STUB_DECISION
+    assert stats.path == path and not stats.aborted
+    assert stats.chunks == len(stub_openai._chunks(stub_openai.MODE_BODIES["valid"], stub_openai.DEFAULT_CHUNK_SIZE))
+    assert stats.output_tokens == stub_openai._usage_tokens(stub_openai.MODE_BODIES["valid"])
+    assert stats.time_to_first_token >= TTFT * 0.9
+    assert stats.total_latency >= stats.time_to_first_token
+    assert stats.tokens_per_second > 0
+    assert path in stats.summary() and "n/a" not in stats.summary()
+
+
+@pytest.mark.parametrize("path", sorted(STREAMS))
+def test_stub_stream_aborts_at_the_first_invalid_character(stub_client, recorded_stats, path):
+    with pytest.raises(InvalidJSONStream, match="after the JSON object closed"):
+        STREAMS[path](stub_client("invalid"), MESSAGES)
+    (stats,) = recorded_stats
+    total_chunks = len(stub_openai._chunks(stub_openai.MODE_BODIES["invalid"], stub_openai.DEFAULT_CHUNK_SIZE))
+    assert stats.aborted and stats.chunks < total_chunks
+    assert stats.output_tokens is None  # never read as far as the usage event
+    assert stats.time_to_first_token is not None and stats.finished_at is not None
+
+
+@pytest.mark.parametrize("path", sorted(STREAMS))
+def test_stub_stream_rejects_a_truncated_object(stub_client, recorded_stats, path):
+    with pytest.raises(InvalidJSONStream, match="ended before the JSON object closed"):
+        STREAMS[path](stub_client("truncated"), MESSAGES)
+    (stats,) = recorded_stats
+    assert not stats.aborted
+    assert stats.chunks == len(stub_openai._chunks(stub_openai.MODE_BODIES["truncated"], stub_openai.DEFAULT_CHUNK_SIZE))
+    assert stats.total_latency is not None
@@ -0,0 +1,72 @@
+import json
+import warnings
+
+import pytest
+
+from metrics import Metrics
+
+
+@pytest.fixture
+def metrics():
+    metrics = Metrics()
+    metrics.run_started = 1_767_225_600.0  # 2026-01-01 00:00:00 UTC
+    return metrics
+
+
+def test_prometheus_text_types_and_counters(metrics):
+    metrics.incr("http_requests", host="api.coingecko.com")
+    metrics.incr("http_requests", 2, host="api.coingecko.com")
+    metrics.incr("http_requests", host="www.reddit.com")
+    lines = metrics.prometheus_text().splitlines()
+
+    assert lines.count("# TYPE btc_bot_http_requests_total counter") == 1
+    assert 'btc_bot_http_requests_total{host="api.coingecko.com"} 3' in lines
+    assert 'btc_bot_http_requests_total{host="www.reddit.com"} 1' in lines
+    assert lines[-2:] == [
+        "# TYPE btc_bot_last_run_timestamp_seconds gauge",
+        "btc_bot_last_run_timestamp_seconds 1767225600",
+    ]
+
+
+def test_prometheus_spans_have_sum_count_and_escaped_labels(metrics):
+    metrics.observe("stage", 0.5, stage='fetch "news"\\n')
+    metrics.observe("stage", 1.5, error=True, stage='fetch "news"\\n')
+    metrics.observe("stage", 0.25, stage="line\nbreak")
+    lines = metrics.prometheus_text().splitlines()
+
+    escaped = '{stage="fetch \\"news\\"\\\\n",span="stage"}'
+    assert "# TYPE btc_bot_span_seconds summary" in lines
+    assert f"btc_bot_span_seconds_sum{escaped} 2.000000" in lines
+    assert f"btc_bot_span_seconds_count{escaped} 2" in lines
+    assert f"btc_bot_span_seconds_max{escaped} 1.500000" in lines
+    assert f"btc_bot_span_errors_total{escaped} 1" in lines
+    assert 'btc_bot_span_seconds_count{stage="line\\nbreak",span="stage"} 1' in lines
+    assert "# TYPE btc_bot_span_seconds_max gauge" in lines
+    assert "# TYPE btc_bot_span_errors_total counter" in lines
+
+
+def test_begin_run_resets_the_run_report_but_not_process_totals(metrics):
+    metrics.incr("runs")
+    with metrics.span("pipeline"):
+        pass
+    metrics.annotate(reason="scheduled")
+    assert metrics.run_report()["counters"] == {"runs": 1}
+
+    metrics.begin_run()
+    metrics.incr("runs")
+    report = metrics.run_report()
+    assert report["counters"] == {"runs": 1}
+    assert report["spans"] == {} and "reason" not in report
+    text = metrics.prometheus_text()
+    assert "btc_bot_runs_total 2" in text
+    assert 'btc_bot_span_seconds_count{span="pipeline"} 1' in text
+
+
+def test_run_report_uses_aware_utc_timestamps(metrics, tmp_path):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        report = metrics.run_report({"asset": "bitcoin"})
+        metrics.export(tmp_path / "metrics.prom", tmp_path / "run_report.json")
+    assert report["started_at"] == "2026-01-01 00:00:00" and report["asset"] == "bitcoin"
+    assert json.loads((tmp_path / "run_report.json").read_text())["started_at"] == "2026-01-01 00:00:00"
+    assert (tmp_path / "metrics.prom").read_text().endswith("btc_bot_last_run_timestamp_seconds 1767225600\n")
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from pipeline import Stage, StageError, run_pipeline
+
+
+def _sleep_then(value, seconds):
+    def run(**_):
+        time.sleep(seconds)
+        return value
+    return run
+
+
+def test_independent_stages_run_in_parallel_and_feed_dependents():
+    stages = [
+        Stage("prices", _sleep_then([1, 2], 0.2)),
+        Stage("news", _sleep_then(["headline"], 0.2)),
+        Stage("reddit", _sleep_then(["post"], 0.2)),
+        Stage("analysis", lambda prices, news, reddit: (sum(prices), news + reddit), deps=("prices", "news", "reddit")),
+    ]
+    report = run_pipeline(stages)
+    assert report.results["analysis"] == (3, ["headline", "post"])
+    assert report.wall_time < 0.5 < report.stage_time_total
+    assert all(timing.status == "ok" for timing in report.timings.values())
+
+
+def test_critical_path_follows_the_slowest_dependency():
+    stages = [
+        Stage("fast", _sleep_then(None, 0.01)),
+        Stage("slow", _sleep_then(None, 0.15)),
+        Stage("merge", _sleep_then(None, 0.01), deps=("fast", "slow")),
+        Stage("notify", _sleep_then(None, 0.01), deps=("merge",)),
+    ]
+    assert run_pipeline(stages).critical_path == ["slow", "merge", "notify"]
+
+
+def test_failed_stage_uses_its_fallback():
+    def boom():
+        raise ValueError("no feed")
+
+    stages = [
+        Stage("reddit", boom, fallback=list),
+        Stage("count", lambda reddit: len(reddit), deps=("reddit",)),
+    ]
+    report = run_pipeline(stages)
+    assert report.results == {"reddit": [], "count": 0}
+    assert report.timings["reddit"].status == "failed"
+
+
+def test_timed_out_stage_uses_its_fallback_without_waiting():
+    stages = [Stage("slow", _sleep_then("late", 0.6), timeout=0.1, fallback=lambda: "fallback")]
+    started = time.monotonic()
+    report = run_pipeline(stages)
+    assert time.monotonic() - started < 0.4
+    assert report.results["slow"] == "fallback"
+    assert report.timings["slow"].status == "timeout"
+
+
+def test_failure_without_fallback_raises():
+    def boom():
+        raise ValueError("down")
+
+    with pytest.raises(StageError, match="prices"):
+        run_pipeline([Stage("prices", boom)])
+
+
+@pytest.mark.parametrize("stages, message", [
+    ([Stage("a", lambda: 1), Stage("a", lambda: 2)], "Duplicate"),
+    ([Stage("a", lambda b: 1, deps=("b",))], "unknown"),
+    ([Stage("a", lambda b: 1, deps=("b",)), Stage("b", lambda a: 1, deps=("a",))], "cycle"),
+])
+def test_invalid_graphs_are_rejected(stages, message):
+    with pytest.raises(ValueError, match=message):
+        run_pipeline(stages)
@@ -0,0 +1,80 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+import trend_scraper
+from price_store import PriceStore, fetch_window
+
+TODAY = date(2026, 3, 1)
+
+
+def _closes(start: date, end: date, price: float = 100.0):
+    return {
+        (start + timedelta(days=offset)).isoformat(): price + offset
+        for offset in range((end - start).days + 1)
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore("testcoin", path=tmp_path / "prices_testcoin.bin")
+
+
+def test_complete_store_only_refetches_the_last_day(store):
+    store.merge(_closes(TODAY - timedelta(days=400), TODAY - timedelta(days=1)))
+    assert fetch_window(store, 350, TODAY) == 2
+
+
+def test_gap_inside_the_window_is_healed(store):
+    closes = _closes(TODAY - timedelta(days=400), TODAY - timedelta(days=1))
+    del closes[(TODAY - timedelta(days=20)).isoformat()]
+    store.merge(closes)
+    assert fetch_window(store, 350, TODAY) == 21
+
+
+def test_empty_store_fetches_the_whole_window(store):
+    assert fetch_window(store, 350, TODAY) == 351
+
+
+def test_unavailable_days_are_not_refetched_and_survive_a_reload(store):
+    listed = TODAY - timedelta(days=30)
+    store.merge(_closes(listed, TODAY))
+    assert fetch_window(store, 350, TODAY) == 351
+
+    assert store.mark_unavailable(TODAY - timedelta(days=350), listed) == 320
+    assert fetch_window(store, 350, TODAY) == 2
+    store.save()
+
+    reloaded = PriceStore("testcoin", path=store.path)
+    assert fetch_window(reloaded, 350, TODAY) == 2
+    assert len(reloaded) == 31 and reloaded.first_date == listed and reloaded.last_date == TODAY
+    assert reloaded.series()[0] == (listed.isoformat(), 100.0)
+    # A price that turns up later replaces the marker.
+    assert reloaded.merge({(listed - timedelta(days=1)).isoformat(): 99.0}) == 1
+    assert reloaded.first_date == listed - timedelta(days=1)
+
+
+def _market_chart(points):
+    return {"prices": [
+        [datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000 + 43_200_000, price]
+        for day, price in sorted(points.items())
+    ]}
+
+
+def test_newly_listed_coin_costs_one_full_fetch(monkeypatch, store):
+    today = datetime.utcnow().date()
+    listed = today - timedelta(days=30)
+    history = _closes(listed, today)
+    del history[(today - timedelta(days=10)).isoformat()]  # a day CoinGecko never returns
+    requested = []
+
+    def fake_request(url, params, use_cache=True):
+        requested.append(params["days"])
+        start = today - timedelta(days=params["days"])
+        return _market_chart({day: price for day, price in history.items() if day >= start.isoformat()})
+
+    monkeypatch.setattr(trend_scraper, "_request_with_retries", fake_request)
+    records = trend_scraper.get_coin_historical("testcoin", 350, store=store)
+    assert len(records) == 30
+    trend_scraper.get_coin_historical("testcoin", 350, store=PriceStore("testcoin", path=store.path))
+    assert requested == [351, 2]
@@ -0,0 +1,42 @@
+import json
+
+from prompt_builder import PROMPT_INSTRUCTIONS, build_prompt, estimate_tokens
+
+
+def _reddit(title, upvotes, sentiment=None):
+    post = {"title": title, "body": "x" * 300, "upvotes": upvotes, "comments": 0}
+    if sentiment is not None:
+        post["sentiment"] = sentiment
+    return post
+
+
+def _kept_titles(payload, budget):
+    prompt, _ = build_prompt(payload, budget=budget)
+    rendered = json.loads(prompt[len(PROMPT_INSTRUCTIONS.format(asset_name="Bitcoin")):])
+    return [item["title"] for item in rendered["reddit_highlights"]]
+
+
+def _budget_for_one(post):
+    """Room for the empty sections plus one title-only highlight, not two."""
+    instructions = estimate_tokens(PROMPT_INSTRUCTIONS.format(asset_name="Bitcoin"))
+    empty = len(json.dumps({"macro_highlights": [], "reddit_highlights": []}, separators=(",", ":")))
+    title_only = {key: value for key, value in post.items() if key != "body"}
+    return instructions + estimate_tokens("x" * (empty + len(json.dumps(title_only, separators=(",", ":"))) + 8))
+
+
+def test_scored_highlights_keep_the_sentiment_order_when_trimmed():
+    # top_snippets already put the strongest sentiment first.
+    strongest = _reddit("Exchange halts withdrawals", 12, sentiment=-0.9)
+    payload = {"reddit_highlights": [
+        strongest,
+        _reddit("Daily discussion", 4000, sentiment=0.05),
+        _reddit("Moon soon", 900, sentiment=0.1),
+    ]}
+    assert _kept_titles(payload, _budget_for_one(strongest)) == ["Exchange halts withdrawals"]
+    assert _kept_titles(payload, 10_000)[:2] == ["Exchange halts withdrawals", "Daily discussion"]
+
+
+def test_unscored_reddit_highlights_are_ranked_by_engagement():
+    payload = {"reddit_highlights": [_reddit("Quiet post", 3), _reddit("Busy post", 500)]}
+    assert _kept_titles(payload, 10_000) == ["Busy post", "Quiet post"]
+    assert _kept_titles(payload, _budget_for_one(payload["reddit_highlights"][1])) == ["Busy post"]
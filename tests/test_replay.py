@@ -0,0 +1,104 @@
+import shutil
+
+import pytest
+import requests
+
+from replay import (
+    Cassette, CassetteWriter, _close, _redact_path, _split_target, base_url, client_env, scratch_data_dir,
+    start_in_background,
+)
+
+
+def _entry(path, query="", body="{}", method="GET", host="api.coingecko.com", status=200):
+    return {"method": method, "host": host, "path": path, "query": query, "status": status, "headers": {}, "body": body}
+
+
+def test_client_env_turns_response_caches_off_in_both_modes():
+    for replay in (True, False):
+        env = client_env("http://127.0.0.1:1", replay=replay)
+        assert env["RESPONSE_CACHES"] == "off"
+        assert env["OPENAI_BASE_URL"] == "http://127.0.0.1:1/api.openai.com/v1"
+    assert "UPSTREAM_RATE_LIMITS" not in client_env("http://127.0.0.1:1", replay=False)
+
+
+def test_split_target():
+    assert _split_target("/api.coingecko.com/api/v3/ping?x=1") == ("api.coingecko.com", "/api/v3/ping", "x=1")
+    assert _split_target("/api.telegram.org") == ("api.telegram.org", "/", "")
+    assert _split_target("/")[0] == ""
+
+
+def test_redact_path_hides_the_bot_token():
+    assert _redact_path("/bot123:ABC-def/sendMessage") == "/bot<token>/sendMessage"
+    assert _redact_path("/api/v3/ping") == "/api/v3/ping"
+
+
+def test_exact_match_wins_over_loose():
+    cassette = Cassette([_entry("/price", "ids=btc", body="btc"), _entry("/price", "ids=eth", body="eth")])
+    assert cassette.match("GET", "api.coingecko.com", "/price", "ids=eth")["body"] == "eth"
+    # A query that was never recorded (e.g. a timestamp) falls back to path-only.
+    assert cassette.match("GET", "api.coingecko.com", "/price", "ids=btc&t=9")["body"] in {"btc", "eth"}
+    assert cassette.match("POST", "api.coingecko.com", "/price", "ids=eth") is None
+    assert cassette.match("GET", "other.host", "/price", "ids=eth") is None
+
+
+def test_repeated_requests_replay_in_order_and_wrap():
+    cassette = Cassette([_entry("/v1/responses", body=str(n), method="POST") for n in range(3)])
+    bodies = [cassette.match("POST", "api.coingecko.com", "/v1/responses", "")["body"] for _ in range(5)]
+    assert bodies == ["0", "1", "2", "0", "1"]
+
+
+def test_writer_round_trips_through_load(tmp_path):
+    path = tmp_path / "run.jsonl.gz"
+    writer = CassetteWriter(path)
+    writer.write(_entry("/a", body="é"))
+    assert not path.exists()  # only moved into place on close
+    writer.close()
+    assert Cassette.load(path).entries == [_entry("/a", body="é")]
+
+
+def test_replay_server_serves_recorded_responses():
+    cassette = Cassette([
+        _entry("/api/v3/ping", body='{"gecko_says": "ok"}'),
+        {**_entry("/bin", host="example.com"), "body_b64": "AAEC"},
+    ])
+    server = start_in_background(port=0, cassette=cassette)
+    session = requests.Session()
+    session.trust_env = False
+    try:
+        url = base_url(server)
+        assert session.get(f"{url}/api.coingecko.com/api/v3/ping").json() == {"gecko_says": "ok"}
+        assert session.get(f"{url}/example.com/bin").content == b"\x00\x01\x02"
+        assert session.get(f"{url}/api.coingecko.com/missing").status_code == 404
+        assert session.get(f"{url}/").status_code == 400
+    finally:
+        _close(server)
+    assert dict(server.RequestHandlerClass.stats) == {"served": 2, "misses": 1}
+
+
+def test_replay_server_injects_failures():
+    server = start_in_background(port=0, cassette=Cassette([_entry("/ping")]), fail_rate=1.0, fail_status=429)
+    session = requests.Session()
+    session.trust_env = False
+    try:
+        assert session.get(f"{base_url(server)}/api.coingecko.com/ping").status_code == 429
+    finally:
+        _close(server)
+
+
+def test_make_server_needs_exactly_one_mode():
+    with pytest.raises(ValueError):
+        start_in_background(port=0)
+
+
+def test_scratch_dir_copies_state_but_not_caches(tmp_path):
+    (tmp_path / "history.db").write_text("db")
+    (tmp_path / "llm_cache.json").write_text("{}")
+    (tmp_path / "prices.tmp").write_text("")
+    (tmp_path / "cassettes").mkdir()
+    (tmp_path / "prices").mkdir()
+    (tmp_path / "prices" / "bitcoin.json").write_text("[]")
+    scratch = scratch_data_dir(tmp_path)
+    try:
+        assert sorted(path.name for path in scratch.rglob("*")) == ["bitcoin.json", "history.db", "prices"]
+    finally:
+        shutil.rmtree(scratch)
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+from scoring import Scoreboard
+
+
+class FakeHistory:
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=lambda entry: entry["date"])
+
+    def range(self, start=None, end=None, asset=None):
+        return [
+            dict(entry) for entry in self.entries
+            if (start is None or entry["date"] >= start) and (end is None or entry["date"] <= end)
+        ]
+
+
+def _day(offset: int) -> str:
+    return (date(2026, 1, 1) + timedelta(days=offset)).isoformat()
+
+
+def _series(days, skip=()):
+    return [(_day(offset), 100.0 + offset) for offset in range(days) if offset not in skip]
+
+
+def test_live_snapshot_is_not_used_as_an_outcome(tmp_path):
+    history = FakeHistory([{"date": _day(0), "recommendation": "buy", "confidence": 70}])
+    board = Scoreboard(path=tmp_path / "scores.json")
+    # Day 1 is only the live snapshot, so the 1-day outcome is not settled yet.
+    assert board.update(history, _series(2)) == 0
+    assert board.outcome(_day(0)) == {}
+    assert board.update(history, _series(3)) == 1
+    assert board.outcome(_day(0))["1d"] == {"change_pct": 1.0, "hit": True}
+
+
+def test_price_gap_stays_pending_until_healed(tmp_path):
+    history = FakeHistory([{"date": _day(5), "recommendation": "avoid", "confidence": 60}])
+    board = Scoreboard(path=tmp_path / "scores.json")
+    board.update(history, _series(10, skip={6}))
+    state = board.horizons["1"]
+    assert state["pending"] == [_day(5)] and state["unscorable"] == 0
+    assert "1d" not in board.outcome(_day(5))
+
+    board.save()
+    reloaded = Scoreboard(path=tmp_path / "scores.json")
+    assert reloaded.update(history, _series(11)) >= 1
+    assert reloaded.horizons["1"]["pending"] == []
+    assert reloaded.outcome(_day(5))["1d"]["hit"] is False
+
+
+def test_dates_before_the_price_window_are_unscorable(tmp_path):
+    history = FakeHistory([{"date": _day(-5), "recommendation": "hold", "confidence": 50}])
+    board = Scoreboard(path=tmp_path / "scores.json")
+    board.update(history, _series(10))
+    for horizon in ("1", "7"):
+        assert board.horizons[horizon]["pending"] == []
+        assert board.horizons[horizon]["unscorable"] == 1
+
+
+def test_each_decision_is_scored_once(tmp_path):
+    history = FakeHistory([{"date": _day(offset), "recommendation": "buy"} for offset in range(5)])
+    board = Scoreboard(path=tmp_path / "scores.json")
+    assert board.update(history, _series(20)) == 10  # 1d and 7d for each decision
+    assert board.update(history, _series(20)) == 0
+    assert board.update(history, _series(21)) == 0
+    totals = board.summary()["1d"]
+    assert totals["n"] == 5 and totals["hit_rate_pct"] == 100.0
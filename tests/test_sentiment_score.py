@@ -0,0 +1,39 @@
+import pytest
+
+from sentiment_score import score_articles, score_text, score_texts, sentiment_features
+
+
+@pytest.mark.parametrize("apostrophe", ["'", "’", "ʼ"])
+def test_contracted_negation_flips_the_term(apostrophe):
+    assert score_text(f"Bitcoin won{apostrophe}t crash, analysts say") > 0
+    assert score_text(f"Regulator doesn{apostrophe}t approve the fund") < 0
+
+
+def test_phrase_beats_its_parts():
+    assert score_text("Bitcoin hits record high") > score_text("Bitcoin hits record")
+    assert score_text("Market enters bear market territory") < 0
+
+
+def test_modifier_scales_the_next_term():
+    assert score_text("Bitcoin sharply rallies") > score_text("Bitcoin rallies")
+    assert 0 < score_text("Bitcoin slightly rises") < score_text("Bitcoin rises")
+
+
+def test_scores_are_bounded_and_neutral_without_terms():
+    assert score_text("The committee met on Tuesday") == 0.0
+    assert -1 < score_text("crash " * 50) < 0
+    assert 0 < score_text("rally " * 50) < 1
+
+
+def test_score_texts_matches_score_text():
+    pairs = [("Bitcoin surges", "Inflows hit a record high"), ("Exchange hacked", "")]
+    assert score_texts(pairs) == [score_text(title, body) for title, body in pairs]
+
+
+def test_features_label_follows_the_weighted_mean():
+    articles = score_articles([
+        {"title": "Bitcoin surges to record high", "content": ""},
+        {"title": "ETF inflows boost bitcoin", "content": ""},
+    ])
+    features = sentiment_features(articles, [])
+    assert features["label"] == "bullish" and features["overall"] == features["news"]["mean"]
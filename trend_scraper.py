@@ -1,54 +1,26 @@
 # trend_scraper.py
 
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
 
-import requests
+from http_client import get_http_client
+from price_store import PriceStore, fetch_window
 
-DEFAULT_TIMEOUT = 10  # seconds
-MAX_RETRIES = 3
-BACKOFF_BASE = 2
+COINGECKO_API = "https://api.coingecko.com/api/v3"
+COINGECKO_HEADERS = {"User-Agent": "trend-sentiment-bot/1.1"}
+# Concurrent asset fetches queue on the shared per-host CoinGecko budget in http_client.
+COINGECKO_WORKERS = 4
+SIMPLE_PRICE_BATCH = 100  # ids per /simple/price request
 
 
-def _request_with_retries(url: str, params: Dict) -> Dict:
+def _request_with_retries(url: str, params: Dict, use_cache: bool = True) -> Dict:
     """
-    Issue a GET request with basic retry/backoff handling for flaky upstreams.
+    GET a CoinGecko endpoint through the shared HTTP client and decode the JSON.
     """
-    headers = {"User-Agent": "trend-sentiment-bot/1.1"}
-    last_error = None
-
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            response = requests.get(
-                url,
-                params=params,
-                headers=headers,
-                timeout=DEFAULT_TIMEOUT,
-            )
-        except requests.RequestException as exc:
-            last_error = exc
-        else:
-            if response.status_code == 429:
-                # Respect rate limits with exponential backoff
-                wait_seconds = BACKOFF_BASE ** attempt
-                time.sleep(wait_seconds)
-                continue
-
-            if response.ok:
-                try:
-                    return response.json()
-                except ValueError as exc:
-                    last_error = exc
-            else:
-                last_error = requests.HTTPError(
-                    f"Failed to fetch BTC history: {response.status_code}"
-                )
-
-        if attempt < MAX_RETRIES:
-            time.sleep(BACKOFF_BASE ** attempt)
-
-    raise RuntimeError(f"Unable to fetch BTC history after {MAX_RETRIES} attempts") from last_error
+    return get_http_client().get(
+        url, params=params, headers=COINGECKO_HEADERS, expect_json=True, use_cache=use_cache
+    ).json()
 
 
 def _validate_price_point(point: List) -> bool:
@@ -61,44 +33,172 @@ def _validate_price_point(point: List) -> bool:
     return isinstance(ts_ms, (int, float)) and isinstance(price, (int, float))
 
 
-def get_btc_historical(days=350):
+def _parse_price_points(prices: List) -> Dict[str, float]:
     """
-    Fetch BTC daily closing prices over the past N days from CoinGecko.
-    Returns a list of dicts with date + price.
+    Collapse CoinGecko [timestamp_ms, price] points into {"YYYY-MM-DD": price}.
     """
-    url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart"
-    params = {
-        "vs_currency": "usd",
-        "days": days,
-        "interval": "daily",
-    }
-    data = _request_with_retries(url, params)
-    prices = data.get("prices", [])
-
-    if not isinstance(prices, list) or not prices:
-        raise ValueError("CoinGecko response missing price data")
-
-    # prices: [ [timestamp_ms, price], ... ]
-    result = []
+    result: Dict[str, float] = {}
     for point in prices:
         if not _validate_price_point(point):
             continue
         ts_ms, price = point
         date_str = datetime.utcfromtimestamp(ts_ms / 1000).strftime("%Y-%m-%d")
-        if result and result[-1]["date"] == date_str:
-            # CoinGecko occasionally duplicates the most recent entry; keep the latest price.
-            result[-1]["price_usd"] = price
-            continue
-        result.append({
-            "date": date_str,
-            "price_usd": price
-        })
+        # CoinGecko occasionally duplicates the most recent entry; keep the latest price.
+        result[date_str] = price
+    return result
+
 
+def _series_records(store: PriceStore, days: int) -> List[Dict]:
     # Guard against missing trailing days due to partial data.
-    cutoff_date = datetime.utcnow() - timedelta(days=days + 1)
-    result = [entry for entry in result if datetime.strptime(entry["date"], "%Y-%m-%d") >= cutoff_date]
+    cutoff_date = datetime.utcnow().date() - timedelta(days=days + 1)
+    return [
+        {"date": date_str, "price_usd": price}
+        for date_str, price in store.series(start=cutoff_date)
+    ]
+
+
+def _refresh_from_market_chart(coin_id: str, store: PriceStore, days: int) -> None:
+    today = datetime.utcnow().date()
+    fetch_days = fetch_window(store, days, today)
+    url = f"{COINGECKO_API}/coins/{coin_id}/market_chart"
+    params = {
+        "vs_currency": "usd",
+        "days": fetch_days,
+        "interval": "daily",
+    }
+    try:
+        data = _request_with_retries(url, params)
+        prices = data.get("prices", [])
+        if not isinstance(prices, list) or not prices:
+            raise ValueError("CoinGecko response missing price data")
+    except (RuntimeError, ValueError) as exc:
+        if not len(store):
+            raise
+        print(f"⚠️ CoinGecko refresh failed for {coin_id} ({exc}); using stored prices up to {store.last_date}.")
+    else:
+        points = _parse_price_points(prices)
+        added = store.merge(points)
+        # Days up to the last returned close that CoinGecko left out (before
+        # the listing, or holes in its data) will not appear on a refetch.
+        last_returned = datetime.strptime(max(points), "%Y-%m-%d").date() if points else None
+        unavailable = store.mark_unavailable(today - timedelta(days=fetch_days - 1), last_returned) if last_returned else 0
+        store.save()
+        note = f", {unavailable} unavailable" if unavailable else ""
+        print(
+            f"📦 Price store ({coin_id}): fetched {fetch_days}d from CoinGecko, {added} new day(s){note}, "
+            f"{len(store)} stored."
+        )
+
+
+def get_latest_prices(coin_ids: Sequence[str], use_cache: bool = True) -> Dict[str, float]:
+    """
+    Current USD price for many assets in one /simple/price call per batch.
+    Intraday polling passes use_cache=False so every poll sees a live quote.
+    """
+    prices: Dict[str, float] = {}
+    for offset in range(0, len(coin_ids), SIMPLE_PRICE_BATCH):
+        batch = list(coin_ids[offset:offset + SIMPLE_PRICE_BATCH])
+        data = _request_with_retries(
+            f"{COINGECKO_API}/simple/price",
+            {"ids": ",".join(batch), "vs_currencies": "usd"},
+            use_cache=use_cache,
+        )
+        for coin_id in batch:
+            price = (data.get(coin_id) or {}).get("usd")
+            if isinstance(price, (int, float)):
+                prices[coin_id] = float(price)
+    return prices
+
+
+def get_intraday_prices(coin_id: str) -> List[Tuple[float, float]]:
+    """
+    Last 24h of ~5-minute prices as [(unix_seconds, price)], oldest first.
+    """
+    data = _request_with_retries(
+        f"{COINGECKO_API}/coins/{coin_id}/market_chart",
+        {"vs_currency": "usd", "days": 1},
+    )
+    points = [point for point in data.get("prices", []) if _validate_price_point(point)]
+    return [(ts_ms / 1000, float(price)) for ts_ms, price in sorted(points)]
+
+
+def get_coins_historical(
+    coin_ids: Sequence[str],
+    days: int = 350,
+    stores: Optional[Dict[str, PriceStore]] = None,
+    max_workers: int = COINGECKO_WORKERS,
+) -> Dict[str, List[Dict]]:
+    """
+    Daily closes for several assets at once. Assets whose store already
+    reaches today only need today's live price, which comes from a single
+    batched /simple/price call; the rest refetch their missing window through
+    market_chart concurrently, all under the shared CoinGecko rate budget.
+    Returns {coin_id: [{"date", "price_usd"}, ...]}; assets that fail with no
+    stored data are left out.
+    """
+    stores = dict(stores or {})
+    for coin_id in coin_ids:
+        if stores.get(coin_id) is None:
+            stores[coin_id] = PriceStore(coin_id)
+
+    today = datetime.utcnow().date()
+    live_only = [
+        coin_id for coin_id in coin_ids
+        if stores[coin_id].last_date == today and fetch_window(stores[coin_id], days, today) == 2
+    ]
+    needs_chart = [coin_id for coin_id in coin_ids if coin_id not in live_only]
+
+    if live_only:
+        try:
+            latest = get_latest_prices(live_only)
+        except (RuntimeError, ValueError) as exc:
+            print(f"⚠️ Batched CoinGecko price refresh failed ({exc}); using stored prices.")
+            latest = {}
+        today_str = today.strftime("%Y-%m-%d")
+        for coin_id, price in latest.items():
+            stores[coin_id].merge({today_str: price})
+            stores[coin_id].save()
+        print(f"📦 Price store: refreshed {len(latest)}/{len(live_only)} asset(s) from one batched price call.")
+
+    failed = []
+    if needs_chart:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(needs_chart)))) as executor:
+            futures = {
+                coin_id: executor.submit(_refresh_from_market_chart, coin_id, stores[coin_id], days)
+                for coin_id in needs_chart
+            }
+            for coin_id, future in futures.items():
+                try:
+                    future.result()
+                except (RuntimeError, ValueError) as exc:
+                    print(f"⚠️ No price data for {coin_id}: {exc}")
+                    failed.append(coin_id)
+
+    return {
+        coin_id: _series_records(stores[coin_id], days)
+        for coin_id in coin_ids if coin_id not in failed
+    }
+
+
+def get_coin_historical(coin_id: str, days: int = 350, store: Optional[PriceStore] = None) -> List[Dict]:
+    """
+    Fetch one asset's daily closing prices over the past N days.
+    Only the days missing from the local price store are requested from
+    CoinGecko; the rest are served from disk.
+    Returns a list of dicts with date + price.
+    """
+    if store is None:
+        store = PriceStore(coin_id)
+    _refresh_from_market_chart(coin_id, store, days)
+    return _series_records(store, days)
+
+
+def get_btc_historical(days=350, store: Optional[PriceStore] = None):
+    """
+    Fetch BTC daily closing prices over the past N days.
+    """
+    return get_coin_historical("bitcoin", days, store)
 
-    return result
 
 if __name__ == "__main__":
     history = get_btc_historical()